@@ -0,0 +1,289 @@
+"""Rolling-origin backtesting with cached fold models
+
+    python src/backtesting.py [featured.csv] [--backend logistic] [--min-train-years 3]
+                              [--window-years N] [--workers N] [--no-cache]
+
+Each fold trains on the history up to the end of year N and is scored on
+year N+1 (expanding window, or the last --window-years only). Folds are
+fitted in parallel across a process pool.
+
+A fitted fold model is saved as a normal model artifact under
+data/backtests/cache/<key>/. The key hashes the fold's training rows, the
+backend and its config. On a rerun, any fold whose training data and config
+are unchanged is only re-scored, never refitted; appending new data only
+adds folds. Per-fold Brier score, ROC AUC, log loss and hit / false alarm
+rates at the 40% and 70% risk thresholds are printed and appended to
+data/backtests/backtest_results.jsonl.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import as_completed
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import FEATURED_PATH
+from model_artifact import load_artifact, save_artifact
+from model_training import DEFAULT_BACKEND, fit_model, load_training_frame, training_pool
+from models import BACKENDS, get_backend
+
+BACKTEST_DIR = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/backtests'
+BACKTEST_LOG = 'backtest_results.jsonl'
+
+MIN_TRAIN_YEARS = 3
+# Probability cut-offs of the moderate and high risk bands (see prediction.risk_status)
+RISK_THRESHOLDS = (0.40, 0.70)
+EPS = 1e-12
+
+# train: [train_start, train_end), test: [train_end, test_end)
+Fold = namedtuple('Fold', ['name', 'train_start', 'train_end', 'test_end'])
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def roc_auc(y, p):
+    """Probability that a random storm hour scores above a random calm one (ties count half)"""
+    positives = y == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+    ranks = pd.Series(p).rank().to_numpy()
+    return float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def score(y, p, thresholds=RISK_THRESHOLDS):
+    """Probabilistic and threshold metrics of predicted probabilities p against 0/1 labels y"""
+    y = np.asarray(y, dtype='float64')
+    p = np.asarray(p, dtype='float64')
+    clipped = np.clip(p, EPS, 1 - EPS)
+    metrics = {
+        'rows': int(len(y)),
+        'storms': int(y.sum()),
+        'brier': float(np.mean((p - y) ** 2)) if len(y) else float('nan'),
+        'log_loss': float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))) if len(y) else float('nan'),
+        'auc': roc_auc(y, p),
+    }
+    storms = y == 1
+    for threshold in thresholds:
+        flagged = p > threshold
+        hits = int((flagged & storms).sum())
+        label = int(round(threshold * 100))
+        # Share of storm hours flagged, and share of flagged hours that were calm
+        metrics[f'hit_rate_{label}'] = hits / storms.sum() if storms.any() else float('nan')
+        metrics[f'false_alarm_{label}'] = 1 - hits / flagged.sum() if flagged.any() else float('nan')
+    return metrics
+
+
+# ---------------------------------------------------------------------------
+# Folds and cache keys
+# ---------------------------------------------------------------------------
+
+def yearly_folds(featured, min_train_years=MIN_TRAIN_YEARS, window_years=None):
+    """Train through year N, test on year N+1, for every N with enough history before it"""
+    times = featured['date_time']
+    first, last = times.min().year, times.max().year
+    folds = []
+    for test_year in range(first + min_train_years, last + 1):
+        train_from = first if window_years is None else max(first, test_year - window_years)
+        folds.append(Fold(str(test_year), pd.Timestamp(f'{train_from}-01-01'),
+                          pd.Timestamp(f'{test_year}-01-01'), pd.Timestamp(f'{test_year + 1}-01-01')))
+    return folds
+
+
+def row_hashes(featured):
+    """One 64-bit content hash per row, so any fold's data hash is a cheap slice"""
+    return pd.util.hash_pandas_object(featured, index=False).to_numpy()
+
+
+def fold_key(hashes, fold_mask, backend, config):
+    """Cache key from the training rows' content plus the backend and its full config"""
+    digest = hashlib.sha256(hashes[fold_mask].tobytes())
+    digest.update(json.dumps({'backend': backend, 'config': config}, sort_keys=True, default=str).encode())
+    return f"{backend}-{digest.hexdigest()[:16]}"
+
+
+def effective_config(backend, config=None):
+    """The config a backend actually fits with (defaults filled in), as hashed into fold keys"""
+    return get_backend(backend)(config).config
+
+
+# ---------------------------------------------------------------------------
+# Fold execution
+# ---------------------------------------------------------------------------
+
+_frames = {}
+
+
+def _load_snapshot(path):
+    """Featured data snapshot, read once per worker process"""
+    if path not in _frames:
+        _frames[path] = pd.read_parquet(path)
+    return _frames[path]
+
+
+def _split(featured, fold):
+    times = featured['date_time']
+    train = featured[(times >= fold.train_start) & (times < fold.train_end)].reset_index(drop=True)
+    test = featured[(times >= fold.train_end) & (times < fold.test_end)].reset_index(drop=True)
+    return train, test
+
+
+def run_fold(fold, snapshot_path, key, backend, config, cache_dir):
+    """Fit (or load from the cache) one fold's model and score it on the fold's test year"""
+    train, test = _split(_load_snapshot(snapshot_path), fold)
+    model_dir = os.path.join(cache_dir, key) if cache_dir else None
+    start = time.perf_counter()
+    if model_dir and os.path.exists(os.path.join(model_dir, 'manifest.json')):
+        model, cached, fit_seconds = load_artifact(model_dir), True, 0.0
+    else:
+        model, fit_seconds = fit_model(train, config, backend)
+        if model_dir:
+            save_artifact(model, cache_dir, key, metadata={'fold': fold.name, 'training_rows': len(train),
+                                                           'fit_seconds': round(fit_seconds, 3)})
+        cached = False
+    return {
+        'fold': fold.name,
+        'train_start': str(fold.train_start.date()),
+        'train_end': str(fold.train_end.date()),
+        'train_rows': len(train),
+        'cached': cached,
+        'fit_seconds': round(fit_seconds, 3),
+        'key': key,
+        **score(test['thunderstorm'], model.predict_proba(test)),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def fold_mask(times, fold):
+    return ((times >= fold.train_start) & (times < fold.train_end)).to_numpy()
+
+
+def evaluate(featured, jobs, cache_dir, workers=None, label="Evaluating"):
+    """Fit and score (fold, backend, config) jobs, returns one result per job in job order
+
+    Jobs whose model is already cached are re-scored in-process; the rest are
+    fitted across a process pool.
+    """
+    hashes = row_hashes(featured)
+    times = featured['date_time']
+    keys = [fold_key(hashes, fold_mask(times, fold), backend, config) for fold, backend, config in jobs]
+    pending = [i for i, key in enumerate(keys)
+               if not (cache_dir and os.path.exists(os.path.join(cache_dir, key, 'manifest.json')))]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    print(f"🧪 {label}: {len(jobs)} fits, {len(jobs) - len(pending)} cached, "
+          f"{len(pending)} to fit on {workers} workers...")
+
+    results = [None] * len(jobs)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Workers read one Parquet snapshot of the data instead of each receiving pickled frames
+        snapshot_dir = cache_dir or tmp
+        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshot_path = os.path.join(snapshot_dir, f"data-{hashlib.sha256(hashes.tobytes()).hexdigest()[:16]}.parquet")
+        if pending and not os.path.exists(snapshot_path):
+            featured.to_parquet(snapshot_path, index=False)
+        _frames[snapshot_path] = featured
+
+        for i, (fold, backend, config) in enumerate(jobs):
+            if i not in pending:
+                results[i] = run_fold(fold, snapshot_path, keys[i], backend, config, cache_dir)
+        if pending:
+            with training_pool(workers) as pool:
+                futures = {pool.submit(run_fold, jobs[i][0], snapshot_path, keys[i], jobs[i][1], jobs[i][2],
+                                       cache_dir): i
+                           for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        results[i] = {'fold': jobs[i][0].name, 'key': keys[i], 'error': f"{type(e).__name__}: {e}"}
+    return results
+
+
+def backtest(featured, backend=DEFAULT_BACKEND, config=None, min_train_years=MIN_TRAIN_YEARS,
+             window_years=None, workers=None, cache_dir=os.path.join(BACKTEST_DIR, 'cache')):
+    """Run every yearly fold of one backend and config, returns per-fold results"""
+    config = effective_config(backend, config)
+    folds = yearly_folds(featured, min_train_years, window_years)
+    if not folds:
+        raise ValueError(f"Need more than {min_train_years} years of data for a rolling-origin backtest")
+
+    start = time.perf_counter()
+    results = evaluate(featured, [(fold, backend, config) for fold in folds], cache_dir, workers,
+                       label=f"Backtesting {backend} over {len(folds)} folds")
+    print(f"✅ Backtest finished in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def summarize(results):
+    """Mean of every metric over the folds that ran"""
+    ok = [r for r in results if 'error' not in r]
+    columns = ['brier', 'log_loss', 'auc'] + [f'{kind}_{int(round(t * 100))}' for t in RISK_THRESHOLDS
+                                              for kind in ('hit_rate', 'false_alarm')]
+    return {c: float(np.nanmean([r[c] for r in ok])) if ok else float('nan') for c in columns}
+
+
+def print_results(results):
+    labels = [int(round(t * 100)) for t in RISK_THRESHOLDS]
+    threshold_headers = ''.join(f"{f'hit@{l}':>8}{f'FA@{l}':>7}" for l in labels)
+    print(f"\n{'fold':<6} {'train rows':>11} {'storms':>7} {'fit (s)':>9} {'Brier':>8} {'AUC':>6}{threshold_headers}")
+    print("-" * (52 + 15 * len(labels)))
+
+    def fmt(value, width, spec):
+        return f"{'-':>{width}}" if value is None or np.isnan(value) else f"{value:>{width}{spec}}"
+
+    for r in results:
+        if 'error' in r:
+            print(f"{r['fold']:<6} ❌ {r['error']}")
+            continue
+        fit = 'cached' if r['cached'] else f"{r['fit_seconds']:.2f}"
+        thresholds = ''.join(fmt(r[f'hit_rate_{l}'], 8, '.1%') + fmt(r[f'false_alarm_{l}'], 7, '.1%') for l in labels)
+        print(f"{r['fold']:<6} {r['train_rows']:>11,} {r['storms']:>7,} {fit:>9} "
+              f"{fmt(r['brier'], 8, '.4f')} {fmt(r['auc'], 6, '.3f')}{thresholds}")
+
+    mean = summarize(results)
+    thresholds = ''.join(fmt(mean[f'hit_rate_{l}'], 8, '.1%') + fmt(mean[f'false_alarm_{l}'], 7, '.1%') for l in labels)
+    print(f"{'mean':<6} {'':>11} {'':>7} {'':>9} {fmt(mean['brier'], 8, '.4f')} {fmt(mean['auc'], 6, '.3f')}{thresholds}")
+
+
+def log_results(results, backend, out_dir=BACKTEST_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    run_at = datetime.now(timezone.utc).isoformat()
+    path = os.path.join(out_dir, BACKTEST_LOG)
+    with open(path, 'a') as f:
+        for r in results:
+            f.write(json.dumps({'run_at': run_at, 'backend': backend, **r}) + '\n')
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of a model backend")
+    parser.add_argument('featured', nargs='?', default=FEATURED_PATH)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument('--min-train-years', type=int, default=MIN_TRAIN_YEARS)
+    parser.add_argument('--window-years', type=int, default=None, help="sliding training window (default: expanding)")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--out-dir', default=BACKTEST_DIR, help="results log and fold model cache location")
+    parser.add_argument('--no-cache', action='store_true', help="refit every fold and keep nothing")
+    args = parser.parse_args(argv)
+
+    featured = load_training_frame(args.featured)
+    cache_dir = None if args.no_cache else os.path.join(args.out_dir, 'cache')
+    results = backtest(featured, args.backend, None, args.min_train_years, args.window_years,
+                       args.workers, cache_dir)
+    print_results(results)
+    print(f"\n💾 Results appended to {log_results(results, args.backend, args.out_dir)}")
+    return 1 if any('error' in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
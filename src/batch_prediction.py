@@ -0,0 +1,286 @@
+"""Batch forecasts for every location x every forecast hour
+
+    python src/batch_prediction.py [locations.json] [--hours 48] [--no-feed]
+    OPENWEATHER_FORECAST_URL=http://127.0.0.1:8081/data/3.0/onecall python src/batch_prediction.py locations.json
+
+prediction.py forecasts one location and copies its latest reading into
+every future hour. Here the future regressors come from an hourly forecast
+feed (OpenWeatherMap One Call `hourly`, or owm_stub.py offline), fetched
+concurrently for all locations. Recent readings and forecast hours of every
+location go into one frame that runs through the feature pipeline once,
+each model scores its locations with a single predict_proba call, and all
+rows are written with one bulk insert.
+
+Hours the feed doesn't cover (past its end, or a location whose request
+failed) take the nearest known values: a forecast hour or the latest reading.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+from data_collection import DEFAULT_LOCATION, MAX_WORKERS, OPENWEATHER_API_KEY, build_session, load_locations
+from feature_engineering import PIPELINE, REGRESSORS, weather_records_to_frame
+from model_artifact import CURRENT_FILE, MODELS_DIR, load_current
+from prediction import risk_status
+from storage import get_store
+from metrics import API_FETCH_SECONDS, API_FETCH_ERRORS, PREDICT_SECONDS
+
+OPENWEATHER_FORECAST_URL = os.getenv("OPENWEATHER_FORECAST_URL", "https://api.openweathermap.org/data/3.0/onecall")
+
+FORECAST_HOURS = 48
+
+
+def fetch_forecast(location, session=requests):
+    """Hourly forecast for one location as weather_data style records (plus precipitation)"""
+    params = {
+        'lat': location['lat'],
+        'lon': location['lon'],
+        'appid': OPENWEATHER_API_KEY,
+        'units': 'metric',
+        'exclude': 'current,minutely,daily,alerts'
+    }
+
+    try:
+        with API_FETCH_SECONDS.time():
+            response = session.get(OPENWEATHER_FORECAST_URL, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+    except Exception:
+        API_FETCH_ERRORS.inc()
+        raise
+
+    return [
+        {
+            'timestamp': datetime.fromtimestamp(hour['dt'], timezone.utc).isoformat(),
+            'temperature': hour['temp'],
+            'humidity': hour['humidity'],
+            'pressure': hour['pressure'],
+            'wind_speed': hour['wind_speed'],
+            'cloud_cover': hour['clouds'],
+            'precipitation': hour.get('rain', {}).get('1h', 0.0) + hour.get('snow', {}).get('1h', 0.0),
+            'location': location['city']
+        }
+        for hour in data['hourly']
+    ]
+
+
+def fetch_forecasts(locations, session=None, max_workers=MAX_WORKERS):
+    """Fetch every location's forecast concurrently, returns {city: records}
+
+    Failed locations are reported and left out; their hours fall back to the
+    latest reading in build_batch_frame.
+    """
+    workers = max(1, min(max_workers, len(locations)))
+    forecasts = {}
+
+    own_session = session is None
+    session = session or build_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(loc, pool.submit(fetch_forecast, loc, session)) for loc in locations]
+            for loc, future in futures:
+                try:
+                    forecasts[loc['city']] = future.result()
+                except Exception as e:
+                    print(f"❌ Error fetching the forecast for {loc['city']}: {e}")
+    finally:
+        if own_session:
+            session.close()
+    return forecasts
+
+
+def load_histories(store, cities):
+    """Newest-first readings per city, enough for the lag and rolling features"""
+    return {city: store.fetch('weather_data', order_by='timestamp', desc=True,
+                              limit=PIPELINE.lookback + 1, location=city)
+            for city in cities}
+
+
+def _records_frame(records_by_city, cities):
+    """Raw frame (date_time + regressors) of many cities' records, with `loc` indexing into cities"""
+    counts = [len(records_by_city.get(city) or []) for city in cities]
+    records = [r for city in cities for r in records_by_city.get(city) or []]
+    if records:
+        frame = weather_records_to_frame(records)
+    else:
+        frame = pd.DataFrame({'date_time': [], **{c: [] for c in REGRESSORS}})
+    frame['date_time'] = frame['date_time'].astype('datetime64[ns]')
+    frame['loc'] = np.repeat(np.arange(len(cities)), counts)
+    return frame
+
+
+def build_batch_frame(cities, histories, forecasts=None, hours=FORECAST_HOURS, start=None):
+    """Featured column arrays for every city x hour from `start` (default: this hour), city by city
+
+    `histories` maps city -> newest-first weather_data rows and `forecasts`
+    city -> fetch_forecast() records. Each city becomes a block of exactly
+    PIPELINE.lookback readings (padded with missing values) followed by its
+    forecast hours, so a single feature pass over all blocks never lets a lag
+    or rolling window reach into the neighbouring city. Cities with neither
+    readings nor a forecast are left out. Adds a `location` column.
+    """
+    forecasts = forecasts or {}
+    cities = [city for city in cities if histories.get(city) or forecasts.get(city)]
+    start = pd.Timestamp(start) if start is not None else pd.Timestamp.now(tz='UTC')
+    if start.tz is not None:
+        start = start.tz_convert(None)
+    start = start.floor('h')
+    lookback, n = PIPELINE.lookback, len(cities)
+    block = lookback + hours
+
+    # Last `lookback` readings per city, oldest first, right-aligned in the city's block
+    observed = _records_frame({city: histories.get(city, [])[:lookback][::-1] for city in cities}, cities)
+    loc = observed['loc'].to_numpy()
+    counts = np.bincount(loc, minlength=n)
+    rank = np.arange(len(loc)) - np.repeat(np.cumsum(counts) - counts, counts)
+    tail_index = loc * block + lookback - counts[loc] + rank
+
+    # Forecast hours take the regressors of the nearest known hour: a forecast hour or the latest reading
+    times = pd.date_range(start, periods=hours, freq='h').to_numpy().astype('datetime64[ns]')
+    grid = pd.DataFrame({'date_time': np.tile(times, n), 'loc': np.repeat(np.arange(n), hours)})
+    latest = observed[rank == counts[loc] - 1]
+    known = pd.concat([latest, _records_frame(forecasts, cities)], ignore_index=True)
+    future = pd.merge_asof(grid.sort_values('date_time', kind='stable'),
+                           known.sort_values('date_time', kind='stable'),
+                           on='date_time', by='loc', direction='nearest').sort_values(['loc', 'date_time'])
+    future_index = np.repeat(np.arange(n) * block, hours) + lookback + np.tile(np.arange(hours), n)
+
+    # Padding rows keep hourly timestamps so the time features stay defined
+    padding = start.to_datetime64() - np.arange(block, 0, -1).astype('timedelta64[h]')
+    columns = {'date_time': np.tile(padding, n).astype('datetime64[ns]')}
+    columns['date_time'][tail_index] = observed['date_time'].to_numpy()
+    columns['date_time'][future_index] = future['date_time'].to_numpy()
+    for col in REGRESSORS:
+        values = np.full(n * block, np.nan)
+        values[tail_index] = observed[col].to_numpy()
+        values[future_index] = future[col].to_numpy()
+        columns[col] = values
+
+    featured = PIPELINE.transform_arrays(columns)
+    batch = {name: values[future_index] for name, values in featured.items()}
+    batch['location'] = np.asarray(cities, dtype=object)[future['loc'].to_numpy()]
+    return batch
+
+
+def load_models(cities, models_dir=MODELS_DIR):
+    """Model per city: its own models_dir/{city} artifact when trained per location, else the shared one"""
+    loaded, models = {}, {}
+    for city in cities:
+        root = os.path.join(models_dir, city)
+        if not os.path.exists(os.path.join(root, CURRENT_FILE)):
+            root = models_dir
+        if root not in loaded:
+            loaded[root] = load_current(root)
+        models[city] = loaded[root]
+    return models
+
+
+def predict_batch(batch, models):
+    """Probabilities for every row with one predict_proba call per distinct model, returns (p, versions)"""
+    codes, cities = pd.factorize(batch['location'])
+    probabilities = np.empty(len(codes))
+    versions = np.empty(len(codes), dtype=object)
+    distinct = list({id(model): model for model in models.values()}.values())
+    index = {id(model): i for i, model in enumerate(distinct)}
+    group = np.array([index[id(models[city])] for city in cities], dtype='int64')[codes]
+    for i, model in enumerate(distinct):
+        mask = group == i
+        if not mask.any():
+            continue
+        with PREDICT_SECONDS.labels('batch').time():
+            probabilities[mask] = model.predict_proba({name: values[mask] for name, values in batch.items()})
+        versions[mask] = model.model_version
+    return probabilities, versions
+
+
+def batch_prediction_rows(batch, probabilities, model_versions):
+    """Rows for the predictions table, formatted column-wise; model_versions is one version or one per row"""
+    prediction_time = datetime.now(timezone.utc).isoformat()
+    forecast_times = np.char.add(np.datetime_as_string(batch['date_time'].astype('datetime64[s]'), unit='s'), '+00:00')
+    percentages = np.clip(np.asarray(probabilities) * 100, 0, 100)
+    versions = np.broadcast_to(np.asarray(model_versions, dtype=object), percentages.shape)
+    return [
+        {
+            'prediction_time': prediction_time,
+            'forecast_time': forecast_time,
+            'thunderstorm_probability': probability,
+            'location': location,
+            'model_version': version
+        }
+        for forecast_time, probability, location, version in zip(
+            forecast_times.tolist(), percentages.tolist(), batch['location'].tolist(), versions.tolist())
+    ]
+
+
+def run_batch(locations, hours=FORECAST_HOURS, store=None, models_dir=MODELS_DIR, use_feed=True, session=None):
+    """Forecast every location x hour and save all predictions in one insert, returns the rows"""
+    store = store or get_store()
+    cities = [loc['city'] for loc in locations]
+    timings = {}
+    start = lap = time.perf_counter()
+
+    def mark(name):
+        nonlocal lap
+        now = time.perf_counter()
+        timings[name], lap = now - lap, now
+
+    forecasts = fetch_forecasts(locations, session) if use_feed else {}
+    mark('feed')
+    histories = load_histories(store, cities)
+    mark('history')
+    batch = build_batch_frame(cities, histories, forecasts, hours)
+    mark('features')
+    if not len(batch['location']):
+        return []
+    models = load_models(sorted(set(batch['location'])), models_dir)
+    mark('models')
+    probabilities, versions = predict_batch(batch, models)
+    mark('predict')
+    rows = batch_prediction_rows(batch, probabilities, versions)
+    store.insert('predictions', rows)
+    mark('insert')
+
+    total = time.perf_counter() - start
+    n = len(set(batch['location']))
+    print(f"✅ {len(rows):,} predictions ({n} locations x {hours}h, {len(forecasts)} with a forecast feed, "
+          f"{len(set(map(id, models.values())))} model(s)) in {total:.2f}s "
+          f"({len(rows) / total if total else 0:,.0f} location-hours/s)")
+    for name, seconds in timings.items():
+        print(f"   {name:<10} {seconds:>9.3f}s")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast many locations and hours in one batch")
+    parser.add_argument('locations', nargs='?', help="JSON list of {city, lat, lon} (default: Pimpri-Chinchwad)")
+    parser.add_argument('--hours', type=int, default=FORECAST_HOURS, help="forecast horizon in hours")
+    parser.add_argument('--no-feed', action='store_true',
+                        help="skip the forecast feed and carry the latest readings forward")
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    args = parser.parse_args(argv)
+
+    print("🔮 ThunderCast Batch Prediction")
+    print("=" * 80)
+    locations = load_locations(args.locations) if args.locations else [DEFAULT_LOCATION]
+    rows = run_batch(locations, args.hours, models_dir=args.models_dir, use_feed=not args.no_feed)
+    if not rows:
+        print("❌ No weather data or forecasts available. Run data_collection.py first!")
+        return 1
+
+    print("\n⚡ Highest thunderstorm risk:")
+    print("-" * 80)
+    for row in sorted(rows, key=lambda r: r['thunderstorm_probability'], reverse=True)[:10]:
+        probability = row['thunderstorm_probability']
+        print(f"{row['location']:<24} {row['forecast_time']}: {probability:.1f}% {risk_status(probability)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Parity check and speed benchmark: ProphetPointForecaster vs Prophet.predict
+
+    python src/benchmark_inference.py model.pkl
+
+Takes any pickled, fitted Prophet model. Builds future frames of increasing
+size with random regressor values, checks that the fast engine reproduces
+Prophet's yhat, and times both paths. Also compares unpickling the full
+model with loading the same fit from a model_artifact directory.
+"""
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from fast_inference import ProphetPointForecaster
+from model_artifact import load_artifact, save_artifact
+
+BATCH_SIZES = [100, 1_000, 10_000, 100_000]
+PARITY_TOLERANCE = 1e-9
+
+
+def random_future(model, n, seed=0):
+    """n hourly rows from the end of the training history with random regressors"""
+    rng = np.random.default_rng(seed)
+    history = model.history
+    future = pd.DataFrame({'ds': pd.date_range(history['ds'].max(), periods=n, freq='h')})
+    for name in model.extra_regressors:
+        values = history[name].to_numpy()
+        future[name] = rng.normal(values.mean(), values.std() + 1e-9, n)
+    return future
+
+
+def check_parity(model, engine, n=2_000):
+    """Largest absolute yhat difference between the two engines"""
+    future = random_future(model, n, seed=42)
+    expected = model.predict(future)['yhat'].to_numpy()
+    actual = engine.predict(future)['yhat'].to_numpy()
+    return float(np.max(np.abs(expected - actual)))
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_load(model, repeat=5):
+    """Unpickle time vs artifact load time for the same fitted model"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, 'model.pkl')
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(model, f)
+        artifact_path = save_artifact(model, tmp, 'benchmark')
+
+        def unpickle():
+            with open(pickle_path, 'rb') as f:
+                pickle.load(f)
+
+        # A fresh process also pays for importing whatever the format needs (prophet vs numpy)
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        cold_pickle = timed(lambda: subprocess.run(
+            [sys.executable, '-c', f"import pickle; pickle.load(open({pickle_path!r}, 'rb'))"], check=True), 1)
+        cold_artifact = timed(lambda: subprocess.run(
+            [sys.executable, '-c', f"import sys; sys.path.insert(0, {src_dir!r}); "
+                                   f"from model_artifact import load_artifact; load_artifact({artifact_path!r})"],
+            check=True), 1)
+
+        pickle_size = os.path.getsize(pickle_path)
+        artifact_size = sum(os.path.getsize(os.path.join(artifact_path, name)) for name in os.listdir(artifact_path))
+        pickle_time = timed(unpickle, repeat)
+        artifact_time = timed(lambda: load_artifact(artifact_path), repeat)
+
+    print(f"\n{'Format':<12} {'Size (KB)':>12} {'Warm load (ms)':>16} {'Cold process (s)':>18}")
+    print("-" * 61)
+    print(f"{'pickle':<12} {pickle_size / 1024:>12.1f} {pickle_time * 1000:>16.2f} {cold_pickle:>18.2f}")
+    print(f"{'artifact':<12} {artifact_size / 1024:>12.1f} {artifact_time * 1000:>16.2f} {cold_artifact:>18.2f}")
+    print(f"Artifact is {artifact_size / pickle_size:.1%} of the pickle size; "
+          f"warm load {pickle_time / artifact_time:.1f}x, cold load {cold_pickle / cold_artifact:.1f}x faster")
+
+
+def main(model_path):
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    engine = ProphetPointForecaster.from_prophet(model)
+
+    print("⚡ Fast inference benchmark")
+    print("=" * 80)
+
+    max_diff = check_parity(model, engine)
+    status = "✅" if max_diff <= PARITY_TOLERANCE else "❌"
+    print(f"{status} Parity vs Prophet.predict: max |Δyhat| = {max_diff:.2e} (tolerance {PARITY_TOLERANCE:.0e})")
+    if max_diff > PARITY_TOLERANCE:
+        raise SystemExit(1)
+
+    print(f"\n{'Rows':>10} {'Prophet (s)':>14} {'Fast (s)':>12} {'Fast+PI (s)':>13} {'Speedup':>10}")
+    print("-" * 63)
+    for n in BATCH_SIZES:
+        future = random_future(model, n)
+        prophet_time = timed(lambda: model.predict(future), repeat=1)
+        fast_time = timed(lambda: engine.predict(future))
+        interval_time = timed(lambda: engine.predict(future, interval_width=0.95))
+        print(f"{n:>10,} {prophet_time:>14.3f} {fast_time:>12.4f} {interval_time:>13.4f} {prophet_time / fast_time:>9.0f}x")
+
+    benchmark_load(model)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        raise SystemExit("usage: python src/benchmark_inference.py model.pkl")
+    main(sys.argv[1])
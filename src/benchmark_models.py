@@ -0,0 +1,106 @@
+"""Side-by-side benchmark of the model backends: fit time, scoring speed, holdout quality
+
+    python src/benchmark_models.py [featured.csv] [--backends prophet logistic] [--years 5] [--holdout-days 365]
+
+Without a featured CSV, `--years` of synthetic Pune data (synthetic_data.py)
+is cleaned and featured in a temp directory first. Every backend is fitted
+on everything before the last `--holdout-days` and scored on the rest:
+Brier score, log loss and ROC AUC of predict_proba against the thunderstorm
+label, plus scoring throughput in rows per millisecond at several batch sizes.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtesting import score
+from model_training import fit_model, load_training_frame
+from models import BACKENDS
+
+BATCH_SIZES = [1_000, 10_000, 100_000]
+
+
+def synthetic_featured(years, out_dir):
+    """Featured Pune-like dataset built with the real cleaning and feature code"""
+    from data_cleaning import clean_csv
+    from feature_engineering import build_featured_dataset
+    from synthetic_data import generate
+
+    raw_path = generate(os.path.join(out_dir, 'raw'), years)['pune']
+    clean_path = os.path.join(out_dir, 'pune_clean.csv')
+    featured_path = os.path.join(out_dir, 'pune_featured.csv')
+    with contextlib.redirect_stdout(io.StringIO()):
+        clean_csv(raw_path, clean_path)
+        build_featured_dataset(clean_path, featured_path)
+    return featured_path
+
+
+def split(featured, holdout_days):
+    cutoff = featured['date_time'].max() - pd.Timedelta(days=holdout_days)
+    train = featured[featured['date_time'] <= cutoff].reset_index(drop=True)
+    test = featured[featured['date_time'] > cutoff].reset_index(drop=True)
+    return train, test
+
+
+def scoring_rate(model, test, n, repeat=5):
+    """Rows per millisecond for one predict_proba call on n rows (best of `repeat`)"""
+    columns = {c: np.resize(test[c].to_numpy(), n) for c in test.columns}
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model.predict_proba(columns)
+        best = min(best, time.perf_counter() - start)
+    return n / (best * 1000)
+
+
+def benchmark(featured, backends, holdout_days):
+    train, test = split(featured, holdout_days)
+    print(f"📊 {len(train):,} training rows, {len(test):,} holdout rows "
+          f"({train['thunderstorm'].mean():.2%} / {test['thunderstorm'].mean():.2%} storms)")
+
+    results = []
+    for backend in backends:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, fit_seconds = fit_model(train, backend=backend)
+        result = {'backend': backend, 'fit_seconds': fit_seconds,
+                  **score(test['thunderstorm'], model.predict_proba(test))}
+        for n in BATCH_SIZES:
+            result[f'rows_per_ms_{n}'] = scoring_rate(model, test, n)
+        results.append(result)
+
+    rate_headers = ''.join(f"{f'rows/ms@{n:,}':>16}" for n in BATCH_SIZES)
+    print(f"\n{'backend':<10} {'fit (s)':>9}{rate_headers} {'Brier':>8} {'log loss':>9} {'AUC':>6}")
+    print("-" * (47 + 16 * len(BATCH_SIZES)))
+    for r in results:
+        rates = ''.join(f"{r[f'rows_per_ms_{n}']:>16,.0f}" for n in BATCH_SIZES)
+        print(f"{r['backend']:<10} {r['fit_seconds']:>9.2f}{rates} {r['brier']:>8.4f} {r['log_loss']:>9.4f} {r['auc']:>6.3f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the model backends side by side")
+    parser.add_argument('featured', nargs='?', help="featured CSV (default: synthetic data)")
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=sorted(BACKENDS, reverse=True))
+    parser.add_argument('--years', type=int, default=5, help="years of synthetic data without a featured CSV")
+    parser.add_argument('--holdout-days', type=int, default=365)
+    args = parser.parse_args()
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    print("🤖 Model backend benchmark")
+    print("=" * 80)
+    with tempfile.TemporaryDirectory() as tmp:
+        featured_path = args.featured or synthetic_featured(args.years, tmp)
+        featured = load_training_frame(featured_path)
+    benchmark(featured, args.backends, args.holdout_days)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Pipeline benchmark suite on synthetic data: time and peak memory per stage
+
+    python src/benchmark_pipeline.py [--sizes 1x1 5x1 10x2] [--stages clean features ...] [--backend logistic]
+                                     [--baseline previous.jsonl] [--out results.jsonl]
+
+Each size is YEARSxLOCATIONS of hourly data from synthetic_data.py. The
+stages run in order on files in a scratch directory: clean, features, train,
+predict (scoring the whole featured history), eda, store_load (SQLite insert
+plus rollup backfill) and dashboard (the dashboard's data queries). Every
+stage runs in a freshly spawned process with its modules imported before the
+clock starts. Peak memory is the max RSS reached above that post-import
+baseline (tracemalloc peak where the OS doesn't report RSS).
+
+Results are appended to a JSONL log. With --baseline, any stage that is more
+than REGRESSION_TOLERANCE slower or larger than the last matching run in that
+file fails the run, so regressions surface before deployment.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+# Results log; defaults to data/benchmarks/ in the repository this script lives in
+BENCHMARK_LOG = os.getenv("THUNDERCAST_BENCHMARK_LOG", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'benchmarks', 'pipeline.jsonl'))
+
+DEFAULT_SIZES = ['1x1', '5x1', '10x2']
+STAGES = ['clean', 'features', 'train', 'predict', 'eda', 'store_load', 'dashboard']
+
+# Prophet fit time grows quickly with history; larger sizes skip its training
+TRAIN_MAX_ROWS = 50_000
+
+REGRESSION_TOLERANCE = 0.25
+# Differences below these are noise, not regressions
+MIN_SECONDS_DELTA = 0.05
+MIN_MB_DELTA = 5.0
+
+# Dashboard ranges, as in dashboard/app.py
+DASHBOARD_RANGES = {'24h': 24, '30d': 720, '1y': 8760, 'all': None}
+
+STAGE_MODULES = {
+    'clean': ['data_cleaning'],
+    'features': ['feature_engineering'],
+    'train': ['model_training', 'prophet'],
+    'predict': ['model_artifact', 'model_training'],
+    'eda': ['eda_engine'],
+    'store_load': ['storage', 'rollups'],
+    'dashboard': ['storage', 'rollups', 'downsampling'],
+}
+
+
+def paths_for(work_dir, city):
+    return {
+        'raw': os.path.join(work_dir, 'raw', f"{city}.csv"),
+        'clean': os.path.join(work_dir, 'processed', f"{city}_clean.csv"),
+        'featured': os.path.join(work_dir, 'processed', f"{city}_featured.csv"),
+        'models': os.path.join(work_dir, 'models', city),
+        'db': os.path.join(work_dir, 'thundercast.db'),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Stages (run inside the spawned worker)
+# ---------------------------------------------------------------------------
+
+def stage_clean(work_dir, cities):
+    from data_cleaning import clean_csv
+    for city in cities:
+        p = paths_for(work_dir, city)
+        os.makedirs(os.path.dirname(p['clean']), exist_ok=True)
+        clean_csv(p['raw'], p['clean'])
+
+
+def stage_features(work_dir, cities):
+    from feature_engineering import build_featured_dataset
+    for city in cities:
+        p = paths_for(work_dir, city)
+        build_featured_dataset(p['clean'], p['featured'])
+
+
+def stage_train(work_dir, cities):
+    from model_training import fit_model, load_training_frame, save_model
+    for city in cities:
+        p = paths_for(work_dir, city)
+        featured = load_training_frame(p['featured'])
+        model, fit_seconds = fit_model(featured)
+        save_model(model, featured, p['models'], city=city, fit_seconds=round(fit_seconds, 2))
+
+
+def stage_predict(work_dir, cities):
+    from model_artifact import load_current
+    from model_training import load_training_frame
+    for city in cities:
+        p = paths_for(work_dir, city)
+        engine = load_current(p['models'])
+        engine.predict_proba(load_training_frame(p['featured']))
+
+
+def stage_eda(work_dir, cities):
+    from eda_engine import compute_stats
+    for city in cities:
+        compute_stats(paths_for(work_dir, city)['clean'], workers=1)
+
+
+def stage_store_load(work_dir, cities):
+    import pandas as pd
+    from storage import SQLiteStore
+    from rollups import backfill_rollups, clean_to_readings
+    store = SQLiteStore(paths_for(work_dir, cities[0])['db'])
+    for city in cities:
+        clean_path = paths_for(work_dir, city)['clean']
+        for chunk in pd.read_csv(clean_path, chunksize=100_000):
+            readings = clean_to_readings(chunk, city).drop(columns='thunderstorm')
+            readings['timestamp'] = readings['timestamp'].astype(str)
+            store.insert('weather_data', readings.to_dict('records'))
+        backfill_rollups(clean_path, city, store)
+
+
+def stage_dashboard(work_dir, cities):
+    """The dashboard's data queries (for the first location) against the loaded store, returns per-query seconds"""
+    import pandas as pd
+    from downsampling import CHART_POINTS, bucket_seconds_for
+    from rollups import grain_for, load_rollups, summarize
+    from storage import SQLiteStore
+    store = SQLiteStore(paths_for(work_dir, cities[0])['db'])
+    location = cities[0]
+    metrics = ['temperature', 'humidity', 'pressure', 'wind_speed']
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = round(time.perf_counter() - start, 4)
+        return result
+
+    marker = timed('newest_marker', lambda: store.fetch('weather_data', columns='timestamp', order_by='timestamp',
+                                                        desc=True, limit=1, location=location))[0]['timestamp']
+    timed('latest_weather', lambda: store.fetch('weather_data', order_by='timestamp', desc=True, limit=1,
+                                                location=location))
+    oldest = store.fetch('weather_data', columns='timestamp', order_by='timestamp', desc=False, limit=1,
+                         location=location)[0]['timestamp']
+    for label, hours in DASHBOARD_RANGES.items():
+        since = None if hours is None else (pd.Timestamp(marker) - pd.Timedelta(hours=hours)).isoformat()
+        if hours is not None and hours <= CHART_POINTS:
+            timed(f'history_{label}', lambda: store.fetch('weather_data', order_by='timestamp', desc=True, since=since,
+                                                          location=location))
+        else:
+            seconds = bucket_seconds_for(since or oldest, marker)
+            timed(f'history_{label}', lambda: store.fetch_buckets('weather_data', metrics, seconds, since=since,
+                                                                  location=location))
+        timed(f'summary_{label}', lambda: summarize(load_rollups(grain_for(hours), since=since,
+                                                                 location=location, store=store), metrics))
+    return timings
+
+
+STAGE_FUNCTIONS = {
+    'clean': stage_clean, 'features': stage_features, 'train': stage_train, 'predict': stage_predict,
+    'eda': stage_eda, 'store_load': stage_store_load, 'dashboard': stage_dashboard,
+}
+
+
+def _max_rss_mb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def measure(stage, work_dir, cities, backend='prophet'):
+    """Run one stage in this (fresh) process, returns (seconds, peak MB, memory source, detail)"""
+    import importlib
+    import logging
+    os.environ['THUNDERCAST_MODEL'] = backend  # read by models.py on import
+    for module in STAGE_MODULES[stage]:
+        importlib.import_module(module)
+    for logger in ('cmdstanpy', 'prophet'):
+        logging.getLogger(logger).setLevel(logging.ERROR)
+
+    try:
+        baseline, source = _max_rss_mb(), 'rss'
+    except ImportError:
+        import tracemalloc
+        tracemalloc.start()
+        baseline, source = 0.0, 'tracemalloc'
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        detail = STAGE_FUNCTIONS[stage](work_dir, cities)
+    seconds = time.perf_counter() - start
+
+    if source == 'rss':
+        peak = _max_rss_mb() - baseline
+    else:
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+    return seconds, peak, source, detail
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def parse_size(size):
+    years, _, locations = size.partition('x')
+    return int(years), int(locations or 1)
+
+
+def run_size(size, stages, work_root, train_max_rows=TRAIN_MAX_ROWS, backend='prophet'):
+    """Generate one data size and benchmark every stage on it, returns result rows"""
+    from synthetic_data import city_names, generate, hours_in
+
+    years, locations = parse_size(size)
+    rows = hours_in('2009-01-01', years)
+    cities = city_names(locations)
+    work_dir = os.path.join(work_root, size)
+    generate(os.path.join(work_dir, 'raw'), years, locations)
+
+    results = []
+    spawn = multiprocessing.get_context('spawn')
+    for stage in stages:
+        result = {'stage': stage, 'size': size, 'backend': backend, 'years': years, 'locations': locations,
+                  'rows': rows * locations, 'status': 'ok', 'seconds': None, 'peak_mb': None}
+        if stage == 'train' and backend == 'prophet' and rows > train_max_rows:
+            result['status'] = 'skipped'
+        elif stage == 'predict' and not os.path.exists(paths_for(work_dir, cities[0])['models']):
+            result['status'] = 'skipped'
+        else:
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    seconds, peak, source, detail = pool.submit(measure, stage, work_dir, cities, backend).result()
+                result.update(seconds=round(seconds, 3), peak_mb=round(peak, 1), memory=source)
+                if detail:
+                    result['detail'] = detail
+            except Exception as e:
+                result.update(status='failed', error=f"{type(e).__name__}: {e}")
+        print_result(result)
+        results.append(result)
+    return results
+
+
+def print_result(r):
+    seconds = f"{r['seconds']:.3f}" if r['seconds'] is not None else '-'
+    peak = f"{r['peak_mb']:.1f}" if r['peak_mb'] is not None else '-'
+    note = r.get('error', '') if r['status'] == 'failed' else ('' if r['status'] == 'ok' else r['status'])
+    print(f"{r['size']:>7} {r['rows']:>10,} {r['stage']:<11} {seconds:>9} {peak:>9}  {note}")
+
+
+def load_baseline(path):
+    """Latest result per (stage, size, backend) from an earlier log"""
+    baseline = {}
+    with open(path) as f:
+        for line in f:
+            r = json.loads(line)
+            if r.get('status') == 'ok':
+                baseline[(r['stage'], r['size'], r.get('backend', 'prophet'))] = r
+    return baseline
+
+
+def regressions(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    found = []
+    for r in results:
+        old = baseline.get((r['stage'], r['size'], r['backend']))
+        if r['status'] != 'ok' or old is None:
+            continue
+        for key, min_delta in (('seconds', MIN_SECONDS_DELTA), ('peak_mb', MIN_MB_DELTA)):
+            if r[key] > old[key] * (1 + tolerance) and r[key] - old[key] > min_delta:
+                found.append(f"{r['stage']} @ {r['size']}: {key} {old[key]:g} -> {r[key]:g}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="YEARSxLOCATIONS, e.g. 10x4")
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--backend', choices=['prophet', 'logistic'], default='prophet',
+                        help="model backend for the train and predict stages")
+    parser.add_argument('--train-max-rows', type=int, default=TRAIN_MAX_ROWS,
+                        help="skip Prophet training above this many rows per location")
+    parser.add_argument('--out', default=BENCHMARK_LOG, help="JSONL log the results are appended to")
+    parser.add_argument('--baseline', help="earlier JSONL log to compare against")
+    parser.add_argument('--work-dir', help="keep generated data here instead of a temp dir")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    work_root = args.work_dir or tempfile.mkdtemp(prefix='thundercast-bench-')
+    run_at = datetime.now(timezone.utc).isoformat()
+
+    print(f"{'size':>7} {'rows':>10} {'stage':<11} {'seconds':>9} {'peak MB':>9}")
+    print("-" * 60)
+    results = []
+    try:
+        for size in args.sizes:
+            results.extend(run_size(size, args.stages, work_root, args.train_max_rows, args.backend))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'a') as f:
+        for r in results:
+            f.write(json.dumps({'run_at': run_at, **r}) + '\n')
+    print(f"\n✅ {len(results)} results appended to {args.out}")
+
+    failed = [r for r in results if r['status'] == 'failed']
+    found = regressions(results, baseline) if baseline else []
+    for line in found:
+        print(f"❌ Regression: {line}")
+    return 1 if failed or found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
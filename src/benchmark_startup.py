@@ -0,0 +1,88 @@
+"""Cold-start budget check: import time of the CLI and the pipeline modules
+
+    python src/benchmark_startup.py [--budget-ms 150] [module ...]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+module and sums the cumulative time of its top-level imports (interpreter
+startup and `site` excluded), listing the heavy libraries each one pulls in.
+Also times `thundercast.py --help` end to end. Exits non-zero if the CLI
+goes over the budget or pulls in a heavy library, so a stray top-level
+import shows up before it ships.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = ['thundercast', 'storage', 'data_collection', 'spool', 'prediction', 'pipeline',
+           'scheduler', 'model_training', 'visualizations']
+
+# Libraries the CLI itself must never import before a command needs them
+HEAVY = ['pandas', 'numpy', 'prophet', 'plotly', 'supabase', 'requests', 'apscheduler']
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "150"))
+HELP_RUNS = 5
+
+
+def import_profile(module):
+    """(total ms, {heavy library: cumulative ms}) for importing module cold"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    total, heavy = 0.0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        ms = int(cumulative) / 1000
+        # Nesting is shown by indentation: sum only what the run imported directly
+        if not name.startswith('  ') and name.strip() != 'site':
+            total += ms
+        if name.strip() in HEAVY:
+            heavy[name.strip()] = ms
+    return total, heavy
+
+
+def help_wall_ms(runs=HELP_RUNS):
+    """Best-of-N wall time of `thundercast.py --help`, interpreter startup included"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(SRC_DIR, 'thundercast.py'), '--help'],
+                       capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help="import-time budget for the CLI module")
+    args = parser.parse_args()
+
+    print(f"{'module':<18} {'import ms':>10}  heavy libraries loaded (cumulative ms)")
+    print("-" * 80)
+    cli_ms, cli_heavy = None, []
+    for module in args.modules:
+        total, heavy = import_profile(module)
+        loaded = ', '.join(f"{name} {ms:.0f}" for name, ms in sorted(heavy.items(), key=lambda kv: -kv[1]))
+        print(f"{module:<18} {total:>10.1f}  {loaded or '-'}")
+        if module == 'thundercast':
+            cli_ms, cli_heavy = total, list(heavy)
+
+    print(f"\nthundercast.py --help wall time: {help_wall_ms():.0f} ms (best of {HELP_RUNS})")
+
+    if cli_ms is None:
+        return 0
+    if cli_heavy or cli_ms > args.budget_ms:
+        print(f"❌ CLI import {cli_ms:.1f} ms (budget {args.budget_ms:.0f} ms), heavy: {cli_heavy or 'none'}")
+        return 1
+    print(f"✅ CLI import {cli_ms:.1f} ms within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
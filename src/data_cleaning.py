@@ -1,41 +1,148 @@
 import pandas as pd
 import numpy as np
+import os
+import shutil
+import sys
 
-# Load data
-df = pd.read_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/raw/pune.csv')
-
-print("🧹 Starting data cleaning...")
-
-# Convert date_time to datetime
-df['date_time'] = pd.to_datetime(df['date_time'])
+RAW_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/raw/pune.csv'
+CLEAN_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_clean.csv'
+CLEAN_DATASET_DIR = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/clean'
 
 # Select relevant columns for thunderstorm prediction
 columns_needed = ['date_time', 'tempC', 'humidity', 'pressure', 
                   'windspeedKmph', 'cloudcover', 'precipMM']
 
-df_clean = df[columns_needed].copy()
+# Compact dtypes for the streaming reader (float32 keeps NaN support at half the memory)
+COLUMN_DTYPES = {
+    'tempC': 'float32',
+    'humidity': 'float32',
+    'pressure': 'float32',
+    'windspeedKmph': 'float32',
+    'cloudcover': 'float32',
+    'precipMM': 'float32',
+}
+
+CHUNK_SIZE = 1_000_000
+
+def add_thunderstorm_label(df):
+    """Create target variable: Thunderstorm indicator"""
+    # High precipitation + high humidity + low pressure = likely thunderstorm
+    df['thunderstorm'] = (
+        (df['precipMM'] > 5) & 
+        (df['humidity'] > 70) & 
+        (df['pressure'] < 1010)
+    ).astype('int8')
+    return df
+
+def clean_csv(raw_path=RAW_PATH, clean_path=CLEAN_PATH):
+    """Clean the whole raw CSV in memory and write it back as one CSV"""
+    # Load data
+    df = pd.read_csv(raw_path)
+
+    print("🧹 Starting data cleaning...")
+
+    # Convert date_time to datetime
+    df['date_time'] = pd.to_datetime(df['date_time'])
+
+    df_clean = add_thunderstorm_label(df[columns_needed].copy())
+
+    # Check for missing values
+    print("\n📊 Missing values:")
+    print(df_clean.isnull().sum())
+
+    # Basic statistics
+    print("\n📈 Dataset Statistics:")
+    print(df_clean.describe())
+
+
+    # Save cleaned data
+    df_clean.to_csv(clean_path, index=False)
+
+    print("\n✅ Cleaned data saved to data/processed/pune_clean.csv")
+    print(f"Total rows: {len(df_clean)}")
+    print(f"Thunderstorm cases: {df_clean['thunderstorm'].sum()}")
+    print(f"Thunderstorm percentage: {(df_clean['thunderstorm'].sum() / len(df_clean) * 100):.2f}%")
+
+    return df_clean
+
+def clean_streaming(raw_path=RAW_PATH, out_dir=CLEAN_DATASET_DIR, city=None, chunksize=CHUNK_SIZE):
+    """Clean a raw CSV of any size into a city/year partitioned Parquet dataset
+    
+    Only columns_needed are parsed, with the compact dtypes above, and each
+    chunk is labelled and written out before the next is read, so memory stays
+    bounded by the chunk size rather than the file size.
+
+    The city's partition is written to a hidden directory and swapped in once
+    complete, replacing every part of an earlier run, so a re-run on a shorter
+    input or with another chunksize never leaves stale parts behind.
+    """
+    city = city or os.path.splitext(os.path.basename(raw_path))[0]
+    print(f"🧹 Streaming data cleaning for {city} (chunks of {chunksize:,} rows)...")
+
+    # Dot-prefixed directories are skipped by glob and by pyarrow datasets
+    city_dir = os.path.join(out_dir, f"city={city}")
+    tmp_dir = os.path.join(out_dir, f".city={city}.tmp")
+    old_dir = os.path.join(out_dir, f".city={city}.old")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    reader = pd.read_csv(
+        raw_path,
+        usecols=columns_needed,
+        dtype=COLUMN_DTYPES,
+        parse_dates=['date_time'],
+        chunksize=chunksize,
+    )
+
+    total_rows = 0
+    storm_rows = 0
+    missing = pd.Series(0, index=columns_needed + ['thunderstorm'])
+
+    try:
+        for part, chunk in enumerate(reader):
+            chunk = add_thunderstorm_label(chunk[columns_needed])
+
+            total_rows += len(chunk)
+            storm_rows += int(chunk['thunderstorm'].sum())
+            missing += chunk.isnull().sum()
+
+            # One file per (city, year) present in this chunk
+            for year, group in chunk.groupby(chunk['date_time'].dt.year, sort=False):
+                partition_dir = os.path.join(tmp_dir, f"year={year}")
+                os.makedirs(partition_dir, exist_ok=True)
+                group.to_parquet(
+                    os.path.join(partition_dir, f"part-{part:05d}.parquet"),
+                    index=False,
+                    compression='zstd',
+                )
 
-# Create target variable: Thunderstorm indicator
-# High precipitation + high humidity + low pressure = likely thunderstorm
-df_clean['thunderstorm'] = (
-    (df_clean['precipMM'] > 5) & 
-    (df_clean['humidity'] > 70) & 
-    (df_clean['pressure'] < 1010)
-).astype(int)
+            print(f"  ✅ Chunk {part + 1}: {total_rows:,} rows cleaned")
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
 
-# Check for missing values
-print("\n📊 Missing values:")
-print(df_clean.isnull().sum())
+    # Swap the new partition in, then drop the old one
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(city_dir):
+        os.replace(city_dir, old_dir)
+    os.replace(tmp_dir, city_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
 
-# Basic statistics
-print("\n📈 Dataset Statistics:")
-print(df_clean.describe())
+    print("\n📊 Missing values:")
+    print(missing)
 
+    print(f"\n✅ Cleaned dataset written to {out_dir}")
+    print(f"Total rows: {total_rows}")
+    print(f"Thunderstorm cases: {storm_rows}")
+    if total_rows:
+        print(f"Thunderstorm percentage: {(storm_rows / total_rows * 100):.2f}%")
 
-# Save cleaned data
-df_clean.to_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_clean.csv', index=False)
+    return total_rows
 
-print("\n✅ Cleaned data saved to data/processed/pune_clean.csv")
-print(f"Total rows: {len(df_clean)}")
-print(f"Thunderstorm cases: {df_clean['thunderstorm'].sum()}")
-print(f"Thunderstorm percentage: {(df_clean['thunderstorm'].sum() / len(df_clean) * 100):.2f}%")
\ No newline at end of file
+if __name__ == "__main__":
+    # python src/data_cleaning.py [--stream [raw.csv] [city]]
+    if '--stream' in sys.argv:
+        args = [a for a in sys.argv[1:] if a != '--stream']
+        clean_streaming(*args[:2])
+    else:
+        clean_csv()
@@ -1,55 +1,111 @@
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from supabase import create_client
+import json
 import os
+import sys
+import time
 from dotenv import load_dotenv
+from storage import get_store
+from metrics import API_FETCH_SECONDS, API_FETCH_ERRORS
+from spool import Spool, Flusher, drain
 
 load_dotenv()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
+# Point this at a local stub (see owm_stub.py) for offline runs and benchmarks
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+
 DEFAULT_LOCATION = {
     "city": "Pimpri-Chinchwad",
     "lat": 18.6298,
     "lon": 73.7997
 }
 
-# Initialize Supabase client
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Upper bound on in-flight API requests during a multi-location cycle
+MAX_WORKERS = int(os.getenv("COLLECTION_WORKERS", "16"))
 
-def fetch_weather_data():
-    """Fetch current weather data from OpenWeatherMap API"""
-    
-    url = f"https://api.openweathermap.org/data/2.5/weather"
+# Readings go to the local spool first; the store is fed from it (see spool.py).
+# Both are opened on first use so importing this module stays cheap.
+_spool = None
+flusher = None
+
+def build_session(pool_size=MAX_WORKERS):
+    """Create an HTTP session whose connection pool can serve every worker"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_location(location, session=requests):
+    """Fetch current weather for one location and return a weather_data record"""
     params = {
-        'lat': DEFAULT_LOCATION['lat'],
-        'lon': DEFAULT_LOCATION['lon'],
+        'lat': location['lat'],
+        'lon': location['lon'],
         'appid': OPENWEATHER_API_KEY,
         'units': 'metric'
     }
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Extract weather parameters
-        weather_record = {
-            'timestamp': datetime.now().isoformat(),
-            'temperature': data['main']['temp'],
-            'humidity': data['main']['humidity'],
-            'pressure': data['main']['pressure'],
-            'wind_speed': data['wind']['speed'],
-            'cloud_cover': data['clouds']['all'],
-            'location': DEFAULT_LOCATION['city'],
-            'latitude': DEFAULT_LOCATION['lat'],
-            'longitude': DEFAULT_LOCATION['lon']
-        }
+        with API_FETCH_SECONDS.time():
+            response = session.get(OPENWEATHER_URL, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+    except Exception:
+        API_FETCH_ERRORS.inc()
+        raise
+    
+    # Extract weather parameters
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'temperature': data['main']['temp'],
+        'humidity': data['main']['humidity'],
+        'pressure': data['main']['pressure'],
+        'wind_speed': data['wind']['speed'],
+        'cloud_cover': data['clouds']['all'],
+        'precipitation': data.get('rain', {}).get('1h', 0.0) + data.get('snow', {}).get('1h', 0.0),
+        'location': location['city'],
+        'latitude': location['lat'],
+        'longitude': location['lon']
+    }
+
+def get_spool():
+    global _spool
+    if _spool is None:
+        _spool = Spool()
+    return _spool
+
+def start_flusher():
+    """Drain the spool from a background thread (long-running collectors)"""
+    global flusher
+    if flusher is None or not flusher.is_alive():
+        flusher = Flusher(get_spool(), get_store())
+        flusher.start()
+    return flusher
+
+def save_records(records):
+    """Spool readings durably, then hand them to the flusher or flush them inline"""
+    spool = get_spool()
+    spool.append('weather_data', records)
+    if flusher is not None and flusher.is_alive():
+        flusher.notify()
+        return
+    try:
+        drain(spool, get_store())
+    except Exception as e:
+        print(f"⚠️ Store unavailable ({e}), {spool.pending()} readings kept in the spool for replay")
+
+def fetch_weather_data():
+    """Fetch current weather data from OpenWeatherMap API"""
+    
+    try:
+        weather_record = fetch_location(DEFAULT_LOCATION)
         
-        # Insert into Supabase
-        result = supabase.table('weather_data').insert(weather_record).execute()
+        # Spool, then insert into the store
+        save_records(weather_record)
         print(f"✅ Weather data saved successfully at {weather_record['timestamp']}")
         print(f"Temperature: {weather_record['temperature']}°C, Humidity: {weather_record['humidity']}%")
         
@@ -59,5 +115,51 @@ def fetch_weather_data():
         print(f"❌ Error fetching weather data: {e}")
         return None
 
+def fetch_weather_data_batch(locations, max_workers=MAX_WORKERS, session=None):
+    """Fetch many locations concurrently and spool them for one bulk insert
+    
+    Returns the list of records that were fetched successfully. Locations that
+    fail are reported and skipped so one bad point doesn't lose the cycle.
+    Long-running callers can pass their own session to keep connections warm.
+    """
+    start = time.perf_counter()
+    workers = max(1, min(max_workers, len(locations)))
+    records = []
+    failed = 0
+    
+    own_session = session is None
+    session = session or build_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(loc, pool.submit(fetch_location, loc, session)) for loc in locations]
+            for loc, future in futures:
+                try:
+                    records.append(future.result())
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ Error fetching weather data for {loc['city']}: {e}")
+    finally:
+        if own_session:
+            session.close()
+    fetch_time = time.perf_counter() - start
+    
+    if records:
+        save_records(records)
+    
+    total_time = time.perf_counter() - start
+    print(f"✅ Collected {len(records)}/{len(locations)} locations "
+          f"({failed} failed) in {total_time:.2f}s (fetch {fetch_time:.2f}s)")
+    
+    return records
+
+def load_locations(path):
+    """Load a JSON list of {"city", "lat", "lon"} locations"""
+    with open(path) as f:
+        return json.load(f)
+
 if __name__ == "__main__":
-    fetch_weather_data()
\ No newline at end of file
+    # python src/data_collection.py [locations.json]
+    if len(sys.argv) > 1:
+        fetch_weather_data_batch(load_locations(sys.argv[1]))
+    else:
+        fetch_weather_data()
@@ -1,16 +1,22 @@
 import pandas as pd
 
-# Load the CSV file
-df = pd.read_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/raw/pune.csv')
-# Check first few rows
-print("📊 Dataset Preview:")
-print(df.head())
+RAW_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/raw/pune.csv'
 
-print("\n📋 Dataset Info:")
-print(df.info())
+def main(raw_path=RAW_PATH):
+    # Load the CSV file
+    df = pd.read_csv(raw_path)
+    # Check first few rows
+    print("📊 Dataset Preview:")
+    print(df.head())
 
-print("\n📈 Dataset Shape:")
-print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
+    print("\n📋 Dataset Info:")
+    print(df.info())
 
-print("\n🔤 Column Names:")
-print(df.columns.tolist())
\ No newline at end of file
+    print("\n📈 Dataset Shape:")
+    print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}")
+
+    print("\n🔤 Column Names:")
+    print(df.columns.tolist())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Time-bucket downsampling for long chart ranges
+
+Charts only have a few hundred pixels per series, so plotting more points
+than that costs payload and render time without showing anything new. These
+helpers size buckets to the chart width and reduce each bucket to
+count/min/mean/max. They work on live store rows (through
+store.fetch_buckets) and on the cleaned historical Parquet archive. lttb()
+is available when a single representative line is preferred over a
+min/max band.
+"""
+import numpy as np
+import pandas as pd
+
+from data_cleaning import CLEAN_DATASET_DIR
+
+CHART_POINTS = 600          # target points per series, roughly the subplot width in px
+MIN_BUCKET_SECONDS = 3600   # data is hourly, so never bucket finer than that
+NICE_BUCKETS = [3600, 2 * 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 2 * 86400,
+                7 * 86400, 14 * 86400, 30 * 86400, 91 * 86400, 365 * 86400]
+
+# Archive (pune.csv schema) columns -> dashboard/weather_data names and unit factors
+ARCHIVE_COLUMNS = {
+    'temperature': ('tempC', 1.0),
+    'humidity': ('humidity', 1.0),
+    'pressure': ('pressure', 1.0),
+    'wind_speed': ('windspeedKmph', 1 / 3.6),  # km/h -> m/s like the live feed
+}
+
+
+def bucket_seconds_for(start, end, target_points=CHART_POINTS):
+    """Smallest 'nice' bucket width that keeps (end - start) within target_points buckets"""
+    span = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds()
+    needed = max(span / target_points, MIN_BUCKET_SECONDS)
+    for seconds in NICE_BUCKETS:
+        if seconds >= needed:
+            return seconds
+    return int(np.ceil(needed / NICE_BUCKETS[-1])) * NICE_BUCKETS[-1]
+
+
+def bucket_frame(df, time_column, columns, bucket_seconds):
+    """Aggregate a frame into fixed-width time buckets with count and min/mean/max per column"""
+    times = pd.to_datetime(df[time_column], format='ISO8601', utc=True).dt.tz_convert(None)
+    seconds = times.to_numpy().astype('datetime64[s]').astype('int64')
+    bucket = (seconds // bucket_seconds) * bucket_seconds
+    grouped = pd.DataFrame({c: df[c].to_numpy() for c in columns}).groupby(bucket, sort=True)
+
+    out = pd.DataFrame({'bucket': pd.to_datetime(grouped.size().index, unit='s'),
+                        'count': grouped.size().to_numpy()})
+    for c in columns:
+        out[f'{c}_min'] = grouped[c].min().to_numpy()
+        out[f'{c}_mean'] = grouped[c].mean().to_numpy()
+        out[f'{c}_max'] = grouped[c].max().to_numpy()
+    return out
+
+
+def archive_buckets(start, end, bucket_seconds, city='pune', dataset_dir=CLEAN_DATASET_DIR):
+    """Bucketed history from the cleaned Parquet archive, reading only the years and columns needed"""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(dataset_dir, format='parquet', partitioning='hive')
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    years = list(range(start.year, end.year + 1))
+    source_columns = [src for src, _ in ARCHIVE_COLUMNS.values()]
+    table = dataset.to_table(
+        columns=['date_time'] + source_columns,
+        filter=(ds.field('city') == city) & ds.field('year').isin(years)
+        & (ds.field('date_time') >= start) & (ds.field('date_time') <= end),
+    )
+    raw = table.to_pandas()
+    df = pd.DataFrame({'timestamp': raw['date_time']})
+    for name, (src, factor) in ARCHIVE_COLUMNS.items():
+        df[name] = raw[src].astype('float64') * factor
+    return bucket_frame(df, 'timestamp', list(ARCHIVE_COLUMNS), bucket_seconds)
+
+
+def archive_range(city='pune', dataset_dir=CLEAN_DATASET_DIR):
+    """(first, last) timestamps available in the archive for a city"""
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(dataset_dir, format='parquet', partitioning='hive')
+    times = dataset.to_table(columns=['date_time'], filter=ds.field('city') == city)['date_time']
+    bounds = pc.min_max(times).as_py()
+    return pd.Timestamp(bounds['min']), pd.Timestamp(bounds['max'])
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: pick n_out points that preserve the visual shape"""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    xs = x.astype('int64') if np.issubdtype(x.dtype, np.datetime64) else x.astype('float64')
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((xs[a] - avg_x) * (y[lo:hi] - y[a]) - (xs[a] - xs[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
@@ -0,0 +1,510 @@
+"""Single-pass, out-of-core statistics for the EDA report
+
+Everything eda_visualization.py prints comes from one streaming pass over
+the cleaned data. Each chunk is folded into mergeable accumulators:
+
+- Moments: count/mean/M2/min/max per column (Welford, merged with Chan's formula)
+- Comoment: streaming covariance of each parameter with the thunderstorm label
+- QuantileSketch: exact value counts while a column has few distinct values,
+  a t-digest after that, for medians, quartiles and IQR outlier counts
+- thunderstorm counts by year/month/hour and per-class sums for conditional means
+
+Partitions (the Parquet files written by data_cleaning.py --stream, or byte
+ranges of a CSV file) are reduced in parallel and the partial results
+merged, so the statistics take memory bounded by the chunk size and worker
+count rather than the dataset.
+
+Duplicate rows are the exception, since finding them exactly needs every
+row: each row's 8-byte hash is spilled to a temporary directory, split into
+DUPLICATE_BUCKETS files by hash, and the buckets are deduplicated one at a
+time. That costs 8 bytes of temporary disk per row and 8 / DUPLICATE_BUCKETS
+bytes of memory per row (about 125 MB for a billion rows).
+"""
+import glob
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+TIME_COLUMN = 'date_time'
+TARGET = 'thunderstorm'
+
+CHUNK_ROWS = 250_000
+PARTITION_BYTES = 64 * 2**20   # CSV files are split into byte ranges of this size
+DUPLICATE_BUCKETS = 64         # row hashes are spilled to disk in this many buckets
+MAX_DISTINCT = 4096   # exact quantiles up to this many distinct values per column
+COMPRESSION = 1000    # t-digest delta, roughly compression / 2 centroids
+
+
+class Moments:
+    """Mergeable count, mean, sum of squared deviations, min and max"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x):
+        if len(x) == 0:
+            return
+        chunk = Moments()
+        chunk.n = len(x)
+        chunk.mean = x.mean()
+        chunk.m2 = np.square(x - chunk.mean).sum()
+        chunk.min, chunk.max = x.min(), x.max()
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.n = n
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+
+class Comoment:
+    """Mergeable covariance of x with y over rows where both are present"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c = 0.0
+
+    def update(self, x, y):
+        if len(x) == 0:
+            return
+        chunk = Comoment()
+        chunk.n = len(x)
+        chunk.mean_x, chunk.mean_y = x.mean(), y.mean()
+        dx, dy = x - chunk.mean_x, y - chunk.mean_y
+        chunk.m2_x, chunk.m2_y, chunk.c = (dx * dx).sum(), (dy * dy).sum(), (dx * dy).sum()
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        dx, dy = other.mean_x - self.mean_x, other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.c += other.c + dx * dy * weight
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    @property
+    def corr(self):
+        denom = np.sqrt(self.m2_x * self.m2_y)
+        return self.c / denom if denom > 0 else np.nan
+
+
+class QuantileSketch:
+    """Mergeable quantiles: exact (value, count) pairs, or a t-digest past max_distinct
+
+    Weather readings are mostly integers or one-decimal values, so the exact
+    mode usually holds and quartiles match pandas' linear interpolation. A
+    column with more distinct values is compressed into t-digest centroids
+    (k1 scale, so the tails keep small clusters).
+    """
+
+    def __init__(self, max_distinct=MAX_DISTINCT, compression=COMPRESSION):
+        self.max_distinct = max_distinct
+        self.compression = compression
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, x):
+        if len(x) == 0:
+            return
+        values, counts = np.unique(x, return_counts=True)
+        self._combine(values, counts.astype('float64'), True, values[0], values[-1])
+
+    def merge(self, other):
+        if len(other.values):
+            self._combine(other.values, other.weights, other.exact, other.min, other.max)
+
+    def _combine(self, values, weights, exact, lo, hi):
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind='mergesort')
+        values, weights = values[order], weights[order]
+        self.min, self.max = min(self.min, lo), max(self.max, hi)
+
+        self.exact = self.exact and exact
+        if self.exact:
+            starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+            values, weights = values[starts], np.add.reduceat(weights, starts)
+            self.exact = len(values) <= self.max_distinct
+        if not self.exact:
+            values, weights = self._compress(values, weights)
+        self.values, self.weights = values, weights
+
+    def _compress(self, values, weights):
+        # Cluster sorted centroids so each cluster spans at most one unit of the k1 scale
+        q = (np.cumsum(weights) - weights) / weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        cluster = np.floor(k - k[0])
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        w = np.add.reduceat(weights, starts)
+        return np.add.reduceat(values * weights, starts) / w, w
+
+    @property
+    def n(self):
+        return self.weights.sum()
+
+    def _ranks(self):
+        # Rank of each centroid's middle, anchored by the observed min and max
+        cum = np.cumsum(self.weights)
+        ranks = np.concatenate([[0.0], cum - self.weights / 2, [cum[-1]]])
+        return ranks, np.concatenate([[self.min], self.values, [self.max]])
+
+    def quantile(self, q):
+        if not len(self.values):
+            return np.nan
+        n = self.n
+        h = (n - 1) * q
+        if self.exact:
+            cum = np.cumsum(self.weights)
+            lo = self.values[np.searchsorted(cum, np.floor(h), side='right')]
+            hi = self.values[np.searchsorted(cum, np.ceil(h), side='right')]
+            return lo + (h - np.floor(h)) * (hi - lo)
+        ranks, values = self._ranks()
+        return np.interp(h + 0.5, ranks, values)
+
+    def count_outside(self, lower, upper):
+        """Number of values below lower or above upper (estimated in t-digest mode)"""
+        if self.exact:
+            return int(self.weights[(self.values < lower) | (self.values > upper)].sum())
+        ranks, values = self._ranks()
+        below = np.interp(lower, values, ranks) if lower > self.min else 0.0
+        above = self.n - np.interp(upper, values, ranks) if upper < self.max else 0.0
+        return int(round(below + above))
+
+
+def _as_float(column):
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.astype('datetime64[ns]').to_numpy().astype('int64').astype('float64')
+    return column.to_numpy(dtype='float64', na_value=np.nan)
+
+
+class EDAStats:
+    """Every statistic in the EDA report, built chunk by chunk and mergeable"""
+
+    def __init__(self):
+        self.rows = 0
+        self.duplicates = 0
+        self.columns = []
+        self.nulls = {}
+        self.moments = {}
+        self.sketches = {}
+        self.comoments = {}
+        self.class_moments = {}
+        # [rows, thunderstorms] per calendar year, month (1-12) and hour of day
+        self.by_year = {}
+        self.by_month = np.zeros((13, 2), dtype='int64')
+        self.by_hour = np.zeros((24, 2), dtype='int64')
+
+    @property
+    def parameters(self):
+        return [c for c in self.columns if c not in (TIME_COLUMN, TARGET)]
+
+    def _init_columns(self, columns):
+        self.columns = list(columns)
+        for c in self.columns:
+            self.nulls[c] = 0
+            self.moments[c] = Moments()
+            self.sketches[c] = QuantileSketch()
+        for c in self.parameters:
+            self.comoments[c] = Comoment()
+            self.class_moments[c] = (Moments(), Moments())
+
+    def update(self, chunk):
+        if not self.columns:
+            self._init_columns(chunk.columns)
+        self.rows += len(chunk)
+
+        arrays = {}
+        for c in self.columns:
+            values = _as_float(chunk[c])
+            present = ~np.isnan(values) if c != TIME_COLUMN else chunk[c].notna().to_numpy()
+            arrays[c] = (values, present)
+            self.nulls[c] += int(len(values) - present.sum())
+            self.moments[c].update(values[present])
+            self.sketches[c].update(values[present])
+
+        if TARGET not in arrays:
+            return
+        target, has_target = arrays[TARGET]
+        for c in self.parameters:
+            values, present = arrays[c]
+            both = present & has_target
+            self.comoments[c].update(values[both], target[both])
+            for label, moments in enumerate(self.class_moments[c]):
+                moments.update(values[both & (target == label)])
+
+        if TIME_COLUMN in chunk:
+            times = chunk[TIME_COLUMN]
+            keep = times.notna().to_numpy()
+            storm = (has_target & (target == 1))[keep].astype('int64')
+            years = times.dt.year.to_numpy()[keep].astype('int64')
+            first = years.min() if len(years) else 0
+            rows = np.bincount(years - first)
+            storms = np.bincount(years - first, weights=storm).astype('int64')
+            for offset in np.flatnonzero(rows).tolist():
+                counts = self.by_year.setdefault(first + offset, np.zeros(2, dtype='int64'))
+                counts += [rows[offset], storms[offset]]
+            for table, part, size in ((self.by_month, times.dt.month, 13), (self.by_hour, times.dt.hour, 24)):
+                part = part.to_numpy()[keep].astype('int64')
+                table[:, 0] += np.bincount(part, minlength=size)
+                table[:, 1] += np.bincount(part, weights=storm, minlength=size).astype('int64')
+
+    def merge(self, other):
+        if not other.columns:
+            return self
+        if not self.columns:
+            self._init_columns(other.columns)
+        self.rows += other.rows
+        self.duplicates += other.duplicates
+        for c in self.columns:
+            self.nulls[c] += other.nulls[c]
+            self.moments[c].merge(other.moments[c])
+            self.sketches[c].merge(other.sketches[c])
+        for c in self.parameters:
+            self.comoments[c].merge(other.comoments[c])
+            for mine, theirs in zip(self.class_moments[c], other.class_moments[c]):
+                mine.merge(theirs)
+        for year, counts in other.by_year.items():
+            self.by_year[year] = self.by_year.get(year, 0) + counts
+        self.by_month += other.by_month
+        self.by_hour += other.by_hour
+        return self
+
+    # -- results -------------------------------------------------------------
+
+    def mean(self, column):
+        return self.moments[column].mean
+
+    def std(self, column):
+        return self.moments[column].std
+
+    def median(self, column):
+        return self.sketches[column].quantile(0.5)
+
+    def describe(self):
+        """Same rows as DataFrame.describe() (count, mean, std, min, quartiles, max)"""
+        table = {}
+        for c in self.columns:
+            m, sketch = self.moments[c], self.sketches[c]
+            stats = {'count': m.n, 'mean': m.mean, 'min': m.min, '25%': sketch.quantile(0.25),
+                     '50%': sketch.quantile(0.5), '75%': sketch.quantile(0.75), 'max': m.max}
+            if c == TIME_COLUMN:
+                stats = {k: v if k == 'count' else pd.Timestamp(int(round(v))).round('s')
+                         for k, v in stats.items()}
+                stats['std'] = np.nan
+            else:
+                stats['std'] = m.std
+            table[c] = stats
+        # pandas puts std last once a datetime column is described alongside numbers
+        order = ['count', 'mean', 'min', '25%', '50%', '75%', 'max', 'std'] if TIME_COLUMN in table \
+            else ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame(table).reindex(order)
+
+    def iqr_outliers(self, column):
+        """(outlier count, lower bound, upper bound) by the 1.5 * IQR rule"""
+        sketch = self.sketches[column]
+        q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+        lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        return sketch.count_outside(lower, upper), lower, upper
+
+    def correlations(self):
+        """Pearson correlation of each parameter with the thunderstorm label"""
+        return pd.Series({c: self.comoments[c].corr for c in self.parameters})
+
+    def storms_by(self, unit):
+        """Thunderstorm counts by 'year', 'month' or 'hour', for every period with data"""
+        if unit == 'year':
+            index = sorted(self.by_year)
+            table = np.array([self.by_year[y] for y in index], dtype='int64').reshape(-1, 2)
+        else:
+            table = self.by_month if unit == 'month' else self.by_hour
+            index = np.flatnonzero(table[:, 0])
+            table = table[index]
+        return pd.Series(table[:, 1], index=pd.Index(index, name=unit), name=TARGET)
+
+    def class_mean(self, column, label):
+        return self.class_moments[column][label].mean if self.class_moments[column][label].n else np.nan
+
+    @property
+    def missing_values(self):
+        return sum(self.nulls.values())
+
+    @property
+    def completeness(self):
+        cells = self.rows * len(self.columns)
+        return (1 - self.missing_values / cells) * 100 if cells else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Partitioned, parallel pass
+# ---------------------------------------------------------------------------
+
+def _line_start(file, offset):
+    """Offset of the first line of a binary file starting at or after offset"""
+    if offset <= 0:
+        return 0
+    file.seek(offset - 1)
+    file.readline()
+    return file.tell()
+
+
+class CSVRange(io.RawIOBase):
+    """A CSV file's header line followed by the lines starting in [start, end)
+
+    Ranges cut at arbitrary byte offsets tile the file exactly: every line
+    belongs to the range its first byte falls in. Fields must not contain
+    line breaks, which holds for the cleaned weather data.
+    """
+
+    def __init__(self, path, start, end):
+        self.file = open(path, 'rb')
+        self.header = self.file.readline()
+        self.pos = _line_start(self.file, max(start, len(self.header)))
+        self.end = _line_start(self.file, end)
+        self.file.seek(self.pos)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.header:
+            n = min(len(buffer), len(self.header))
+            buffer[:n], self.header = self.header[:n], self.header[n:]
+            return n
+        data = self.file.read(max(0, min(len(buffer), self.end - self.pos)))
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def source_partitions(source, partition_bytes=PARTITION_BYTES):
+    """Split a CSV file, a Parquet file or a Parquet dataset directory into partitions
+
+    A partition is a list of (path, start, end) parts: a Parquet file is one
+    part (start and end None) and a CSV file is cut into byte ranges of about
+    partition_bytes, so even a single CSV is reduced in parallel.
+    """
+    if os.path.isdir(source):
+        files = sorted(glob.glob(os.path.join(source, '**', '*.parquet'), recursive=True))
+        return [[(path, None, None)] for path in files]
+    if source.endswith('.parquet'):
+        return [[(source, None, None)]]
+    size = os.path.getsize(source)
+    return [[(source, start, min(start + partition_bytes, size))]
+            for start in range(0, max(size, 1), partition_bytes)]
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, start=None, end=None):
+    """Stream a CSV or Parquet file (or the CSV lines starting in [start, end)) as DataFrames of at most chunk_rows rows"""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+    source = path if start is None else io.BufferedReader(CSVRange(path, start, end))
+    with pd.read_csv(source, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            if not len(chunk):
+                continue
+            if TIME_COLUMN in chunk:
+                chunk[TIME_COLUMN] = pd.to_datetime(chunk[TIME_COLUMN])
+            yield chunk
+
+
+def spill_hashes(hashes, spill_dir, partition):
+    """Append row hashes to one file per hash bucket, so duplicates always share a bucket"""
+    buckets = hashes % DUPLICATE_BUCKETS
+    order = np.argsort(buckets, kind='stable')
+    counts = np.bincount(buckets.astype('int64'), minlength=DUPLICATE_BUCKETS)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    for bucket in np.flatnonzero(counts).tolist():
+        with open(os.path.join(spill_dir, f"{bucket:03d}-{partition:05d}.bin"), 'ab') as f:
+            hashes[order[offsets[bucket]:offsets[bucket + 1]]].tofile(f)
+
+
+def count_duplicates(spill_dir):
+    """Rows whose hash repeats, one bucket in memory at a time"""
+    duplicates = 0
+    for bucket in range(DUPLICATE_BUCKETS):
+        files = glob.glob(os.path.join(spill_dir, f"{bucket:03d}-*.bin"))
+        if files:
+            hashes = np.concatenate([np.fromfile(path, dtype='uint64') for path in files])
+            duplicates += len(hashes) - len(np.unique(hashes))
+    return duplicates
+
+
+def row_hashes(chunk):
+    """Row hashes that don't depend on the dtypes read_csv inferred for this chunk
+
+    An int column reads as float64 in any chunk holding a NaN, so numbers are
+    hashed as float64 and nulls hash alike whatever their column's dtype.
+    """
+    columns = {}
+    for name, column in chunk.items():
+        if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+            hashes = pd.util.hash_array(column.to_numpy('float64', na_value=np.nan))
+        else:
+            hashes = pd.util.hash_pandas_object(column, index=False).to_numpy()
+        columns[name] = np.where(column.isna().to_numpy(), np.uint64(0), hashes)
+    return pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy()
+
+
+def partition_stats(parts, spill_dir, partition, chunk_rows=CHUNK_ROWS):
+    """Reduce one partition to EDAStats, spilling its row hashes to spill_dir for count_duplicates"""
+    stats = EDAStats()
+    for path, start, end in parts:
+        for chunk in read_chunks(path, chunk_rows, start, end):
+            stats.update(chunk)
+            spill_hashes(row_hashes(chunk), spill_dir, partition)
+    return stats
+
+
+def compute_stats(source, workers=None, chunk_rows=CHUNK_ROWS, partition_bytes=PARTITION_BYTES):
+    """One pass over every partition of source, in parallel, merged into one EDAStats"""
+    partitions = source_partitions(source, partition_bytes)
+    if not partitions:
+        raise FileNotFoundError(f"No data found at {source}")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(partitions)))
+
+    n = len(partitions)
+    with tempfile.TemporaryDirectory(prefix='thundercast-eda-') as spill_dir:
+        if workers == 1:
+            results = [partition_stats(parts, spill_dir, i, chunk_rows) for i, parts in enumerate(partitions)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(partition_stats, partitions, [spill_dir] * n, range(n), [chunk_rows] * n))
+
+        stats = EDAStats()
+        for result in results:
+            stats.merge(result)
+        stats.duplicates = count_duplicates(spill_dir)
+    return stats
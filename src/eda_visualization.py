@@ -1,92 +1,94 @@
 import pandas as pd
 import numpy as np
-
-# Load cleaned data
-df = pd.read_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_clean.csv')
-df['date_time'] = pd.to_datetime(df['date_time'])
-
-print("=" * 80)
-print("📊 EXPLORATORY DATA ANALYSIS (EDA)")
-print("=" * 80)
-
-# 1. BASIC STATISTICS
-print("\n1️⃣ DESCRIPTIVE STATISTICS")
-print("-" * 80)
-print(df.describe())
-
-# 2. DATA DISTRIBUTION
-print("\n2️⃣ DATA DISTRIBUTION")
-print("-" * 80)
-print(f"Mean Temperature: {df['tempC'].mean():.2f}°C")
-print(f"Median Temperature: {df['tempC'].median():.2f}°C")
-print(f"Std Dev Temperature: {df['tempC'].std():.2f}°C")
-print(f"\nMean Humidity: {df['humidity'].mean():.2f}%")
-print(f"Median Humidity: {df['humidity'].median():.2f}%")
-print(f"Std Dev Humidity: {df['humidity'].std():.2f}%")
-
-# 3. OUTLIER DETECTION
-print("\n3️⃣ OUTLIER DETECTION (IQR Method)")
-print("-" * 80)
-
-def detect_outliers(data, column):
-    Q1 = data[column].quantile(0.25)
-    Q3 = data[column].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    outliers = data[(data[column] < lower_bound) | (data[column] > upper_bound)]
-    return len(outliers), lower_bound, upper_bound
-
-for col in ['tempC', 'humidity', 'pressure', 'windspeedKmph']:
-    outlier_count, lower, upper = detect_outliers(df, col)
-    print(f"{col}: {outlier_count} outliers (Range: {lower:.2f} to {upper:.2f})")
-
-# 4. CORRELATION ANALYSIS
-print("\n4️⃣ CORRELATION WITH THUNDERSTORM")
-print("-" * 80)
-correlation = df[['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover', 'precipMM']].corrwith(df['thunderstorm'])
-print(correlation.sort_values(ascending=False))
-
-# 5. TEMPORAL PATTERNS
-print("\n5️⃣ TEMPORAL PATTERNS")
-print("-" * 80)
-df['year'] = df['date_time'].dt.year
-df['month'] = df['date_time'].dt.month
-df['hour'] = df['date_time'].dt.hour
-
-print("\nThunderstorms by Year:")
-print(df.groupby('year')['thunderstorm'].sum())
-
-print("\nThunderstorms by Month:")
-print(df.groupby('month')['thunderstorm'].sum())
-
-print("\nThunderstorms by Hour of Day:")
-print(df.groupby('hour')['thunderstorm'].sum().sort_values(ascending=False).head(5))
-
-# 6. THUNDERSTORM CONDITIONS
-print("\n6️⃣ AVERAGE CONDITIONS DURING THUNDERSTORMS")
-print("-" * 80)
-storm_data = df[df['thunderstorm'] == 1]
-no_storm_data = df[df['thunderstorm'] == 0]
-
-print(f"\n{'Parameter':<20} {'Thunderstorm':>15} {'No Thunderstorm':>18} {'Difference':>15}")
-print("-" * 70)
-
-params = ['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover', 'precipMM']
-for param in params:
-    storm_mean = storm_data[param].mean()
-    no_storm_mean = no_storm_data[param].mean()
-    diff = storm_mean - no_storm_mean
-    print(f"{param:<20} {storm_mean:>15.2f} {no_storm_mean:>18.2f} {diff:>15.2f}")
-
-# 7. DATA QUALITY CHECK
-print("\n7️⃣ DATA QUALITY METRICS")
-print("-" * 80)
-print(f"Total Records: {len(df)}")
-print(f"Duplicate Records: {df.duplicated().sum()}")
-print(f"Missing Values: {df.isnull().sum().sum()}")
-print(f"Data Completeness: {((1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100):.2f}%")
-
-print("\n" + "=" * 80)
-print("✅ EDA COMPLETE!")
-print("=" * 80)
\ No newline at end of file
+import os
+import sys
+import time
+from data_cleaning import CLEAN_PATH, CLEAN_DATASET_DIR
+from eda_engine import compute_stats
+
+# Partitioned archive from data_cleaning.py --stream, else the single cleaned CSV
+PUNE_DATASET_DIR = os.path.join(CLEAN_DATASET_DIR, 'city=pune')
+
+def main(source=None, workers=None):
+    """Print the EDA report from one streaming pass over the cleaned data"""
+    source = source or (PUNE_DATASET_DIR if os.path.isdir(PUNE_DATASET_DIR) else CLEAN_PATH)
+
+    start = time.perf_counter()
+    stats = compute_stats(source, workers)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 80)
+    print("📊 EXPLORATORY DATA ANALYSIS (EDA)")
+    print("=" * 80)
+
+    # 1. BASIC STATISTICS
+    print("\n1️⃣ DESCRIPTIVE STATISTICS")
+    print("-" * 80)
+    print(stats.describe())
+
+    # 2. DATA DISTRIBUTION
+    print("\n2️⃣ DATA DISTRIBUTION")
+    print("-" * 80)
+    print(f"Mean Temperature: {stats.mean('tempC'):.2f}°C")
+    print(f"Median Temperature: {stats.median('tempC'):.2f}°C")
+    print(f"Std Dev Temperature: {stats.std('tempC'):.2f}°C")
+    print(f"\nMean Humidity: {stats.mean('humidity'):.2f}%")
+    print(f"Median Humidity: {stats.median('humidity'):.2f}%")
+    print(f"Std Dev Humidity: {stats.std('humidity'):.2f}%")
+
+    # 3. OUTLIER DETECTION
+    print("\n3️⃣ OUTLIER DETECTION (IQR Method)")
+    print("-" * 80)
+
+    for col in ['tempC', 'humidity', 'pressure', 'windspeedKmph']:
+        outlier_count, lower, upper = stats.iqr_outliers(col)
+        print(f"{col}: {outlier_count} outliers (Range: {lower:.2f} to {upper:.2f})")
+
+    # 4. CORRELATION ANALYSIS
+    print("\n4️⃣ CORRELATION WITH THUNDERSTORM")
+    print("-" * 80)
+    correlation = stats.correlations()
+    print(correlation.sort_values(ascending=False))
+
+    # 5. TEMPORAL PATTERNS
+    print("\n5️⃣ TEMPORAL PATTERNS")
+    print("-" * 80)
+
+    print("\nThunderstorms by Year:")
+    print(stats.storms_by('year'))
+
+    print("\nThunderstorms by Month:")
+    print(stats.storms_by('month'))
+
+    print("\nThunderstorms by Hour of Day:")
+    print(stats.storms_by('hour').sort_values(ascending=False).head(5))
+
+    # 6. THUNDERSTORM CONDITIONS
+    print("\n6️⃣ AVERAGE CONDITIONS DURING THUNDERSTORMS")
+    print("-" * 80)
+
+    print(f"\n{'Parameter':<20} {'Thunderstorm':>15} {'No Thunderstorm':>18} {'Difference':>15}")
+    print("-" * 70)
+
+    params = ['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover', 'precipMM']
+    for param in params:
+        storm_mean = stats.class_mean(param, 1)
+        no_storm_mean = stats.class_mean(param, 0)
+        diff = storm_mean - no_storm_mean
+        print(f"{param:<20} {storm_mean:>15.2f} {no_storm_mean:>18.2f} {diff:>15.2f}")
+
+    # 7. DATA QUALITY CHECK
+    print("\n7️⃣ DATA QUALITY METRICS")
+    print("-" * 80)
+    print(f"Total Records: {stats.rows}")
+    print(f"Duplicate Records: {stats.duplicates}")
+    print(f"Missing Values: {stats.missing_values}")
+    print(f"Data Completeness: {stats.completeness:.2f}%")
+
+    print("\n" + "=" * 80)
+    print(f"✅ EDA COMPLETE! (single pass in {elapsed:.1f}s)")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    # python src/eda_visualization.py [clean.csv | dataset_dir] [workers]
+    main(*sys.argv[1:2], *(int(w) for w in sys.argv[2:3]))
@@ -0,0 +1,147 @@
+"""Incremental, date-partitioned export of the store for BI tools
+
+Each run appends only rows whose id is above the table's watermark in
+_watermark.json, writing them as compressed Parquet (or Arrow IPC) files
+under <table>/date=YYYY-MM-DD/. Part files are named by their id range, so a
+run that dies before saving the watermark rewrites the same files on retry
+instead of duplicating rows. Tableau/Excel users can still get a CSV view of
+the full history, generated from the dataset rather than the database.
+
+    python src/export.py [--arrow] [--csv]
+"""
+import json
+import os
+import sys
+import time
+import pandas as pd
+from storage import column_dtypes, get_store, TIME_COLUMNS
+from fileutil import write_json_atomic
+
+EXPORT_DIR = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/exports'
+WATERMARK_FILE = '_watermark.json'
+EXPORT_TABLES = ['weather_data', 'predictions']
+
+# Rows per store query, and so at most rows per part file
+PAGE_SIZE = 1000
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Timestamp columns, written as datetimes rather than the store's text
+TIMESTAMP_COLUMNS = ('timestamp', 'prediction_time', 'forecast_time')
+
+
+def load_watermarks(export_dir=EXPORT_DIR):
+    path = os.path.join(export_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _partition_dates(values):
+    """Calendar date of each timestamp (offsets converted to UTC first)"""
+    times = pd.to_datetime(values, format='ISO8601', utc=True).dt.tz_convert(None)
+    return times, times.dt.strftime('%Y-%m-%d')
+
+
+def write_part(df, path, fmt='parquet'):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == 'arrow':
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression='zstd')
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression='zstd')
+
+
+def export_table(table, export_dir=EXPORT_DIR, store=None, fmt='parquet', page_size=PAGE_SIZE):
+    """Append rows newer than the watermark to <table>/date=.../, returns rows exported"""
+    store = store or get_store()
+    time_column = TIME_COLUMNS[table]
+    watermarks = load_watermarks(export_dir)
+    last_id = watermarks.get(table, 0)
+    total = 0
+
+    while True:
+        rows = store.fetch(table, order_by='id', desc=False, limit=page_size,
+                           since=last_id, since_column='id')
+        if not rows:
+            break
+        # Column types come from the store schema, so a page that is all-null in
+        # some column still writes the same part file schema as the others
+        df = pd.DataFrame(rows)
+        df = df.astype({c: t for c, t in column_dtypes(table).items() if c in df and c not in TIMESTAMP_COLUMNS})
+        for column in TIMESTAMP_COLUMNS:
+            if column in df and column != time_column:
+                df[column] = _partition_dates(df[column])[0]
+        df[time_column], dates = _partition_dates(df[time_column])
+        first, last = int(df['id'].iloc[0]), int(df['id'].iloc[-1])
+
+        for date, part in df.groupby(dates, sort=False):
+            partition_dir = os.path.join(export_dir, table, f"date={date}")
+            os.makedirs(partition_dir, exist_ok=True)
+            write_part(part, os.path.join(partition_dir, f"part-{first:012d}-{last:012d}{FORMATS[fmt]}"), fmt)
+
+        # Files first, then the watermark: a crash in between only repeats this page
+        last_id = last
+        watermarks[table] = last_id
+        write_json_atomic(os.path.join(export_dir, WATERMARK_FILE), watermarks)
+        total += len(df)
+        if len(rows) < page_size:
+            break
+    return total
+
+
+def export_all(export_dir=EXPORT_DIR, store=None, fmt='parquet'):
+    os.makedirs(export_dir, exist_ok=True)
+    counts = {}
+    for table in EXPORT_TABLES:
+        start = time.perf_counter()
+        counts[table] = export_table(table, export_dir, store, fmt)
+        print(f"✅ {table}: {counts[table]:,} new rows exported in {time.perf_counter() - start:.2f}s")
+    return counts
+
+
+def open_dataset(table, export_dir=EXPORT_DIR):
+    """The exported table as a pyarrow dataset (Parquet and Arrow parts both load)
+
+    The schema is the union of every part file's, so parts written before a
+    column was added (or with an all-null column) read as nulls in it.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = os.path.join(export_dir, table)
+    found = {fmt: ds.dataset(root, format=fmt, partitioning='hive', exclude_invalid_files=True)
+             for fmt in ('parquet', 'ipc')}
+    found = {fmt: dataset for fmt, dataset in found.items() if dataset.files}
+    schema = pa.unify_schemas([dataset.schema for dataset in found.values()]
+                              + [f.physical_schema for dataset in found.values() for f in dataset.get_fragments()],
+                              promote_options='permissive')
+    parts = [ds.dataset(root, schema=schema, format=fmt, partitioning='hive', exclude_invalid_files=True)
+             for fmt in found]
+    return ds.dataset(parts) if len(parts) > 1 else parts[0]
+
+
+def write_csv_view(table, export_dir=EXPORT_DIR, csv_path=None):
+    """Stream the whole exported history of a table into one CSV for Tableau"""
+    import pyarrow.csv as pacsv
+
+    csv_path = csv_path or os.path.join(export_dir, f"{table}.csv")
+    dataset = open_dataset(table, export_dir)
+    tmp_path = f"{csv_path}.tmp"
+    with pacsv.CSVWriter(tmp_path, dataset.schema) as writer:
+        for batch in dataset.to_batches():
+            writer.write_batch(batch)
+    os.replace(tmp_path, csv_path)
+    return csv_path
+
+
+if __name__ == "__main__":
+    fmt = 'arrow' if '--arrow' in sys.argv else 'parquet'
+    export_all(fmt=fmt)
+    if '--csv' in sys.argv:
+        for table in EXPORT_TABLES:
+            print(f"✅ Saved: {write_csv_view(table)}")
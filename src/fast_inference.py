@@ -0,0 +1,153 @@
+"""Point-forecast inference for fitted Prophet models without uncertainty sampling
+
+Prophet.predict simulates trend and observation noise for every call to fill
+yhat_lower/yhat_upper (1000 draws by default), which dominates its runtime.
+ProphetPointForecaster copies the fitted parameters out of the model once and
+evaluates the same point forecast as plain vectorized NumPy:
+
+    engine = ProphetPointForecaster.from_prophet(model)
+    forecast = engine.predict(future)                        # ds, yhat
+    forecast = engine.predict(future, interval_width=0.95)   # + yhat_lower/upper
+
+The optional interval only reflects observation noise (sigma_obs), not trend
+changepoint uncertainty, so it is narrower than Prophet's but costs nothing.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 24 * 60 * 60 * 1e9
+
+
+class ProphetPointForecaster:
+    """Vectorized yhat = trend * (1 + multiplicative terms) + additive terms"""
+
+    def __init__(self, growth, k, m, deltas, changepoints_t, start, t_scale, y_scale,
+                 floor, seasonalities, regressors, beta, additive_mask,
+                 multiplicative_mask, sigma_obs, model_version=None):
+        if growth not in ('linear', 'flat'):
+            raise ValueError(f"Unsupported growth {growth!r}; only linear and flat trends are compiled")
+        self.growth = growth
+        self.k = float(k)
+        self.m = float(m)
+        self.deltas = np.asarray(deltas, dtype='float64')
+        self.changepoints_t = np.asarray(changepoints_t, dtype='float64')
+        self.start = pd.Timestamp(start)
+        self.t_scale = pd.Timedelta(t_scale)
+        self.y_scale = float(y_scale)
+        self.floor = float(floor)
+        # [{'name', 'period', 'fourier_order', 'condition_name'}] in design-matrix order
+        self.seasonalities = list(seasonalities)
+        # [{'name', 'mu', 'std'}] in design-matrix order, after the seasonalities
+        self.regressors = list(regressors)
+        self.beta = np.asarray(beta, dtype='float64')
+        self.additive_mask = np.asarray(additive_mask, dtype='float64')
+        self.multiplicative_mask = np.asarray(multiplicative_mask, dtype='float64')
+        self.sigma_obs = float(sigma_obs)
+        self.model_version = model_version
+
+        # Fold the component masks and y scaling into the coefficients once
+        self._start_ns = self.start.value
+        self._t_scale_ns = self.t_scale.value
+        self._beta_add = self.beta * self.additive_mask * self.y_scale
+        self._beta_mult = self.beta * self.multiplicative_mask
+
+    @classmethod
+    def from_prophet(cls, model):
+        """Copy fitted parameters out of a trained prophet.Prophet model"""
+        if model.history is None:
+            raise ValueError("Model has not been fit")
+        if model.train_holiday_names is not None:
+            raise ValueError("Holiday features are not supported by the point forecaster")
+
+        params = model.params
+        component_cols = model.train_component_cols
+        return cls(
+            growth=model.growth,
+            k=np.nanmean(params['k']),
+            m=np.nanmean(params['m']),
+            deltas=np.nanmean(params['delta'], axis=0),
+            changepoints_t=model.changepoints_t,
+            start=model.start,
+            t_scale=model.t_scale,
+            y_scale=model.y_scale,
+            floor=model.y_min if model.scaling == 'minmax' else 0.0,
+            seasonalities=[
+                {
+                    'name': name,
+                    'period': float(props['period']),
+                    'fourier_order': int(props['fourier_order']),
+                    'condition_name': props['condition_name'],
+                }
+                for name, props in model.seasonalities.items()
+            ],
+            regressors=[
+                {'name': name, 'mu': float(props['mu']), 'std': float(props['std'])}
+                for name, props in model.extra_regressors.items()
+            ],
+            beta=np.nanmean(params['beta'], axis=0),
+            additive_mask=component_cols['additive_terms'].to_numpy(),
+            multiplicative_mask=component_cols['multiplicative_terms'].to_numpy(),
+            sigma_obs=np.nanmean(params['sigma_obs']),
+        )
+
+    @property
+    def regressor_names(self):
+        return [r['name'] for r in self.regressors]
+
+    def trend(self, ds_ns):
+        """Trend component on the original y scale"""
+        t = (ds_ns - self._start_ns) / self._t_scale_ns
+        if self.growth == 'flat':
+            scaled = np.full(len(t), self.m)
+        else:
+            # Piecewise linear: each passed changepoint adds delta to the slope
+            passed = self.changepoints_t[None, :] <= t[:, None]
+            k_t = self.k + passed @ self.deltas
+            m_t = self.m - passed @ (self.deltas * self.changepoints_t)
+            scaled = k_t * t + m_t
+        return scaled * self.y_scale + self.floor
+
+    def design_matrix(self, ds_ns, columns):
+        """Fourier seasonality features followed by standardized regressors"""
+        n_cols = sum(2 * s['fourier_order'] for s in self.seasonalities) + len(self.regressors)
+        X = np.empty((len(ds_ns), max(n_cols, 1)))
+        if n_cols == 0:
+            X[:] = 0.0
+            return X
+
+        days = ds_ns / NS_PER_DAY
+        col = 0
+        for season in self.seasonalities:
+            x_T = 2 * np.pi * days
+            for i in range(season['fourier_order']):
+                c = (i + 1) / season['period'] * x_T
+                X[:, col] = np.sin(c)
+                X[:, col + 1] = np.cos(c)
+                col += 2
+            if season['condition_name'] is not None:
+                active = np.asarray(columns[season['condition_name']], dtype=bool)
+                X[~active, col - 2 * season['fourier_order']:col] = 0.0
+        for reg in self.regressors:
+            X[:, col] = (np.asarray(columns[reg['name']], dtype='float64') - reg['mu']) / reg['std']
+            col += 1
+        return X
+
+    def predict_yhat(self, ds, columns):
+        """Point forecast for datetimes `ds` and a mapping of regressor arrays"""
+        ds_ns = np.asarray(pd.to_datetime(ds), dtype='datetime64[ns]').astype('int64')
+        X = self.design_matrix(ds_ns, columns)
+        trend = self.trend(ds_ns)
+        return trend * (1 + X @ self._beta_mult) + X @ self._beta_add
+
+    def predict(self, df, interval_width=None):
+        """Forecast frame with ds and yhat (plus yhat_lower/upper if interval_width is set)"""
+        yhat = self.predict_yhat(df['ds'], df)
+        forecast = pd.DataFrame({'ds': pd.to_datetime(df['ds']).to_numpy(), 'yhat': yhat}, index=df.index)
+        if interval_width is not None:
+            z = NormalDist().inv_cdf(0.5 + interval_width / 2)
+            half_width = z * self.sigma_obs * self.y_scale
+            forecast['yhat_lower'] = yhat - half_width
+            forecast['yhat_upper'] = yhat + half_width
+        return forecast
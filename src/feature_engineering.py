@@ -1,83 +1,270 @@
+"""Feature engineering pipeline shared by training, backfills and live prediction
+
+Features are declared once in FEATURES and evaluated column-wise on NumPy
+arrays, so a 10-year backfill and a 6-row live forecast run the exact same
+code. Usage:
+
+    featured = PIPELINE.transform(clean_df)
+    model_df = to_model_frame(featured)
+"""
 import pandas as pd
 import numpy as np
+from collections import namedtuple
+import json
+import os
+import sys
 
-# Load cleaned data
-df = pd.read_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_clean.csv')
-df['date_time'] = pd.to_datetime(df['date_time'])
+CLEAN_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_clean.csv'
+FEATURED_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_featured.csv'
 
-print("🔧 Starting Feature Engineering...")
+RAW_COLUMNS = ['date_time', 'tempC', 'humidity', 'pressure', 
+               'windspeedKmph', 'cloudcover', 'precipMM', 'thunderstorm']
 
-# 1. TIME-BASED FEATURES
-df['year'] = df['date_time'].dt.year
-df['month'] = df['date_time'].dt.month
-df['day'] = df['date_time'].dt.day
-df['hour'] = df['date_time'].dt.hour
-df['day_of_week'] = df['date_time'].dt.dayofweek  # 0=Monday, 6=Sunday
-df['day_of_year'] = df['date_time'].dt.dayofyear
+# Weather regressors fed to the forecasting model
+REGRESSORS = ['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover', 'precipMM']
+
+# Season mapping, indexed by month number
+SEASON_BY_MONTH = np.array([None, 'winter', 'winter', 'summer', 'summer', 'summer',
+                            'monsoon', 'monsoon', 'monsoon', 'monsoon',
+                            'post_monsoon', 'post_monsoon', 'winter'], dtype=object)
 
-# Season mapping
 def get_season(month):
-    if month in [3, 4, 5]:
-        return 'summer'
-    elif month in [6, 7, 8, 9]:
-        return 'monsoon'
-    elif month in [10, 11]:
-        return 'post_monsoon'
-    else:
-        return 'winter'
+    return SEASON_BY_MONTH[month]
+
+# ---------------------------------------------------------------------------
+# Vectorized building blocks
+# ---------------------------------------------------------------------------
+
+def _window_stack(values, window):
+    """Stack values with their previous window-1 rows (NaN padded), shape (window, n)"""
+    values = np.asarray(values, dtype='float64')
+    stack = np.full((window, len(values)), np.nan)
+    for k in range(min(window, len(values))):
+        stack[k, k:] = values[:len(values) - k]
+    return stack
+
+def lag(values, periods=1):
+    """Previous-row values, NaN for the first `periods` rows"""
+    return _window_stack(values, periods + 1)[periods]
+
+def rolling_mean(values, window):
+    """Trailing mean with min_periods=1, computed per window so it never drifts with history"""
+    stack = _window_stack(values, window)
+    count = np.sum(~np.isnan(stack), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, np.nansum(stack, axis=0) / count, np.nan)
+
+def rolling_std(values, window):
+    """Trailing sample std (ddof=1) with min_periods=1, NaN where fewer than 2 values"""
+    stack = _window_stack(values, window)
+    count = np.sum(~np.isnan(stack), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(stack, axis=0) / count
+        var = np.nansum((stack - mean) ** 2, axis=0) / (count - 1)
+    return np.where(count > 1, np.sqrt(var), np.nan)
+
+def _days(dt):
+    return dt.astype('datetime64[D]')
+
+# ---------------------------------------------------------------------------
+# Feature registry
+# ---------------------------------------------------------------------------
+
+# name: output column; inputs: columns passed to fn (raw or earlier features);
+# lookback: previous rows the feature needs, which sizes the incremental tail
+Feature = namedtuple('Feature', ['name', 'inputs', 'fn', 'lookback'], defaults=[0])
+
+FEATURES = [
+    # 1. TIME-BASED FEATURES
+    Feature('year', ['date_time'], lambda t: t.astype('datetime64[Y]').astype('int64') + 1970),
+    Feature('month', ['date_time'], lambda t: t.astype('datetime64[M]').astype('int64') % 12 + 1),
+    Feature('day', ['date_time'], lambda t: (_days(t) - t.astype('datetime64[M]')).astype('int64') + 1),
+    Feature('hour', ['date_time'], lambda t: (t - _days(t)).astype('timedelta64[h]').astype('int64')),
+    Feature('day_of_week', ['date_time'], lambda t: (_days(t).astype('int64') + 3) % 7),  # 0=Monday, 6=Sunday
+    Feature('day_of_year', ['date_time'], lambda t: (_days(t) - t.astype('datetime64[Y]')).astype('int64') + 1),
+    Feature('season', ['month'], lambda m: SEASON_BY_MONTH[m]),
+
+    # 2. INTERACTION FEATURES
+    Feature('temp_humidity', ['tempC', 'humidity'], lambda t, h: t * h),
+    Feature('pressure_wind', ['pressure', 'windspeedKmph'], lambda p, w: p * w),
+    Feature('humidity_pressure_ratio', ['humidity', 'pressure'], lambda h, p: h / p),
+
+    # 3. LAG FEATURES (Previous hour values)
+    Feature('temp_lag_1h', ['tempC'], lag, lookback=1),
+    Feature('humidity_lag_1h', ['humidity'], lag, lookback=1),
+    Feature('pressure_lag_1h', ['pressure'], lag, lookback=1),
+
+    # Change features
+    Feature('temp_change', ['tempC', 'temp_lag_1h'], lambda x, prev: x - prev, lookback=1),
+    Feature('pressure_change', ['pressure', 'pressure_lag_1h'], lambda x, prev: x - prev, lookback=1),
 
-df['season'] = df['month'].apply(get_season)
+    # 4. ROLLING STATISTICS (Moving averages)
+    Feature('temp_rolling_3h', ['tempC'], lambda x: rolling_mean(x, 3), lookback=2),
+    Feature('humidity_rolling_3h', ['humidity'], lambda x: rolling_mean(x, 3), lookback=2),
+    Feature('pressure_rolling_6h', ['pressure'], lambda x: rolling_mean(x, 6), lookback=5),
+    Feature('temp_rolling_std_3h', ['tempC'], lambda x: rolling_std(x, 3), lookback=2),
 
-print("✅ Time-based features created")
+    # 5. CYCLICAL FEATURES (for hour and month)
+    Feature('hour_sin', ['hour'], lambda h: np.sin(2 * np.pi * h / 24)),
+    Feature('hour_cos', ['hour'], lambda h: np.cos(2 * np.pi * h / 24)),
+    Feature('month_sin', ['month'], lambda m: np.sin(2 * np.pi * m / 12)),
+    Feature('month_cos', ['month'], lambda m: np.cos(2 * np.pi * m / 12)),
+]
 
-# 2. INTERACTION FEATURES
-df['temp_humidity'] = df['tempC'] * df['humidity']
-df['pressure_wind'] = df['pressure'] * df['windspeedKmph']
-df['humidity_pressure_ratio'] = df['humidity'] / df['pressure']
+class FeaturePipeline:
+    """Evaluates a feature registry over column arrays in one vectorized pass"""
 
-print("✅ Interaction features created")
+    def __init__(self, features=FEATURES):
+        self.features = list(features)
+        self.lookback = max(f.lookback for f in self.features)
 
-# 3. LAG FEATURES (Previous hour values)
-df['temp_lag_1h'] = df['tempC'].shift(1)
-df['humidity_lag_1h'] = df['humidity'].shift(1)
-df['pressure_lag_1h'] = df['pressure'].shift(1)
+    @property
+    def feature_names(self):
+        return [f.name for f in self.features]
 
-# Change features
-df['temp_change'] = df['tempC'] - df['temp_lag_1h']
-df['pressure_change'] = df['pressure'] - df['pressure_lag_1h']
+    def transform_arrays(self, columns):
+        """Compute every feature from a dict of equal-length arrays, returns a new dict"""
+        columns = dict(columns)
+        columns['date_time'] = np.asarray(columns['date_time'], dtype='datetime64[ns]')
+        for feature in self.features:
+            columns[feature.name] = feature.fn(*(np.asarray(columns[c]) for c in feature.inputs))
+        return columns
 
-print("✅ Lag and change features created")
+    def transform(self, df):
+        """Return df with every registered feature column added"""
+        columns = {c: df[c].to_numpy() for c in df.columns}
+        columns['date_time'] = pd.to_datetime(df['date_time']).to_numpy()
+        out = self.transform_arrays(columns)
+        return pd.DataFrame(out, index=df.index)
 
-# 4. ROLLING STATISTICS (Moving averages)
-df['temp_rolling_3h'] = df['tempC'].rolling(window=3, min_periods=1).mean()
-df['humidity_rolling_3h'] = df['humidity'].rolling(window=3, min_periods=1).mean()
-df['pressure_rolling_6h'] = df['pressure'].rolling(window=6, min_periods=1).mean()
+    def transform_tail(self, tail, new_rows):
+        """Features for new_rows only, given the preceding `lookback` rows of history"""
+        window = pd.concat([tail, new_rows], ignore_index=True)
+        return self.transform(window).iloc[len(tail):]
 
-df['temp_rolling_std_3h'] = df['tempC'].rolling(window=3, min_periods=1).std()
+PIPELINE = FeaturePipeline()
 
-print("✅ Rolling statistics features created")
+def add_features(df):
+    """Add time, interaction, lag, rolling and cyclical features to a clean frame"""
+    return PIPELINE.transform(df)
 
-# 5. CYCLICAL FEATURES (for hour and month)
-df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+def to_model_frame(featured):
+    """Prophet training/prediction frame: ds, y (when labelled) and the regressors"""
+    model_df = pd.DataFrame({'ds': featured['date_time'].to_numpy()})
+    if 'thunderstorm' in featured:
+        model_df['y'] = featured['thunderstorm'].to_numpy()
+    for col in REGRESSORS:
+        model_df[col] = featured[col].to_numpy()
+    return model_df
 
-print("✅ Cyclical features created")
+def weather_records_to_frame(records):
+    """Map weather_data rows (API units) onto the clean training schema
+    
+    Timestamps come back as naive UTC, which is what Prophet expects for `ds`.
+    """
+    df = pd.DataFrame(records)
+    return pd.DataFrame({
+        'date_time': pd.to_datetime(df['timestamp'], format='ISO8601', utc=True).dt.tz_convert(None).to_numpy(),
+        'tempC': df['temperature'].astype('float64').to_numpy(),
+        'humidity': df['humidity'].astype('float64').to_numpy(),
+        'pressure': df['pressure'].astype('float64').to_numpy(),
+        'windspeedKmph': df['wind_speed'].astype('float64').to_numpy() * 3.6,
+        'cloudcover': df['cloud_cover'].astype('float64').to_numpy(),
+        'precipMM': df['precipitation'].astype('float64').to_numpy() if 'precipitation' in df else 0.0,
+    })
 
-# 6. DROP NaN rows created by lag/rolling features
-df = df.dropna()
+# ---------------------------------------------------------------------------
+# Featured dataset (full recompute and incremental append)
+# ---------------------------------------------------------------------------
 
-print(f"\n📊 Feature Engineering Summary:")
-print(f"Total features: {df.shape[1]}")
-print(f"Total rows after cleaning: {df.shape[0]}")
-print(f"\nNew features added:")
-new_features = [col for col in df.columns if col not in ['date_time', 'tempC', 'humidity', 'pressure', 
-                                                           'windspeedKmph', 'cloudcover', 'precipMM', 'thunderstorm']]
-for i, feat in enumerate(new_features, 1):
-    print(f"{i}. {feat}")
+def state_path_for(featured_path):
+    return os.path.splitext(featured_path)[0] + '.state.json'
 
-# Save engineered data
-df.to_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_featured.csv', index=False)
+def save_tail_state(df, featured_path=FEATURED_PATH):
+    """Persist the last rows of history needed to continue lag/rolling features
+    
+    Every raw column is kept with its dtype, so new rows are featured in a
+    window with the same dtypes a full recompute sees (int stays int).
+    """
+    tail = df[RAW_COLUMNS].tail(PIPELINE.lookback)
+    state = {
+        'dtypes': {col: str(tail[col].dtype) for col in RAW_COLUMNS[1:]},
+        'date_time': tail['date_time'].astype(str).tolist(),
+        **{col: tail[col].tolist() for col in RAW_COLUMNS[1:]},
+    }
+    tmp_path = state_path_for(featured_path) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path_for(featured_path))
 
-print("\n✅ Feature-engineered data saved to data/processed/pune_featured.csv")
\ No newline at end of file
+def load_tail_state(featured_path=FEATURED_PATH):
+    path = state_path_for(featured_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    dtypes = state.pop('dtypes', {})
+    tail = pd.DataFrame(state).astype(dtypes)
+    tail['date_time'] = pd.to_datetime(tail['date_time'])
+    return tail
+
+def build_featured_dataset(clean_path=CLEAN_PATH, featured_path=FEATURED_PATH):
+    """Full recompute over the whole clean history"""
+    # Load cleaned data
+    df = pd.read_csv(clean_path)
+    df['date_time'] = pd.to_datetime(df['date_time'])
+
+    print("🔧 Starting Feature Engineering...")
+
+    featured = PIPELINE.transform(df)
+    print(f"✅ {len(PIPELINE.features)} registered features computed")
+
+    # 6. DROP NaN rows created by lag/rolling features
+    featured = featured.dropna()
+
+    print(f"\n📊 Feature Engineering Summary:")
+    print(f"Total features: {featured.shape[1]}")
+    print(f"Total rows after cleaning: {featured.shape[0]}")
+    print(f"\nNew features added:")
+    for i, feat in enumerate(PIPELINE.feature_names, 1):
+        print(f"{i}. {feat}")
+
+    # Save engineered data
+    featured.to_csv(featured_path, index=False)
+    save_tail_state(df, featured_path)
+
+    print("\n✅ Feature-engineered data saved to data/processed/pune_featured.csv")
+    return featured
+
+def append_features(new_rows, featured_path=FEATURED_PATH):
+    """Compute features for newly arrived clean rows and append them to the featured dataset
+    
+    Only the persisted tail state is read, so the cost is O(new rows). The
+    appended rows are identical to what a full recompute would produce.
+    """
+    new_rows = new_rows[RAW_COLUMNS].copy()
+    new_rows['date_time'] = pd.to_datetime(new_rows['date_time'])
+
+    tail = load_tail_state(featured_path)
+    if tail is None or not os.path.exists(featured_path):
+        raise FileNotFoundError(f"No featured dataset/state at {featured_path}; run a full recompute first")
+
+    new_rows = new_rows[new_rows['date_time'] > tail['date_time'].iloc[-1]]
+    if new_rows.empty:
+        print("ℹ️ No new rows to append")
+        return new_rows
+
+    featured = PIPELINE.transform_tail(tail, new_rows).dropna()
+
+    featured.to_csv(featured_path, mode='a', header=False, index=False)
+    save_tail_state(pd.concat([tail, new_rows], ignore_index=True), featured_path)
+
+    print(f"✅ Appended {len(featured)} featured rows to {featured_path}")
+    return featured
+
+if __name__ == "__main__":
+    # python src/feature_engineering.py [--append new_clean_rows.csv]
+    if '--append' in sys.argv:
+        append_features(pd.read_csv(sys.argv[sys.argv.index('--append') + 1]))
+    else:
+        build_featured_dataset()
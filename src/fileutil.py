@@ -0,0 +1,11 @@
+"""Small file helpers shared by modules that must not pull in each other's dependencies"""
+import json
+import os
+
+
+def write_json_atomic(path, payload):
+    """Write JSON via a temp file + rename so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,216 @@
+"""Hyperparameter search with successive halving
+
+    python src/hyperparameter_search.py [featured.csv] [--backend prophet] [--candidates 27] [--eta 3]
+                                        [--min-days 180] [--holdout-days 365] [--workers N]
+
+Samples distinct configs from the backend's SEARCH_SPACE and scores them by
+Brier score on the last --holdout-days of data. Every candidate is first fitted
+on only the --min-days before the holdout. The best 1/eta survive to the next
+rung, which trains on eta times more history, and so on until the survivors
+are fitted on the whole history. Fits run in parallel on the training process
+pool and are cached like backtest folds (backtesting.evaluate), so an
+interrupted or repeated search only fits what is missing.
+
+The winner is written to data/models/best_config.json. Production training
+(model_training.py, retraining.py) uses it whenever the backend matches.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from backtesting import BACKTEST_DIR, Fold, effective_config, evaluate
+from feature_engineering import FEATURED_PATH, REGRESSORS
+from fileutil import write_json_atomic
+from model_artifact import MODELS_DIR
+from model_training import BEST_CONFIG_FILE, DEFAULT_BACKEND, load_training_frame
+from models import BACKENDS
+
+N_CANDIDATES = 27
+ETA = 3
+MIN_DAYS = 180
+HOLDOUT_DAYS = 365
+MIN_REGRESSORS = 3
+
+# Engineered feature groups the logistic backend can switch on over the raw regressors
+FEATURE_GROUPS = {
+    'interactions': ['temp_humidity', 'pressure_wind', 'humidity_pressure_ratio'],
+    'lags': ['temp_lag_1h', 'humidity_lag_1h', 'pressure_lag_1h', 'temp_change', 'pressure_change'],
+    'rolling': ['temp_rolling_3h', 'humidity_rolling_3h', 'pressure_rolling_6h', 'temp_rolling_std_3h'],
+    'cyclical': ['hour_sin', 'hour_cos', 'month_sin', 'month_cos'],
+}
+
+SEARCH_SPACE = {
+    'prophet': {
+        'changepoint_prior_scale': [0.001, 0.01, 0.05, 0.1, 0.5],
+        'seasonality_prior_scale': [0.1, 1.0, 10.0],
+        'seasonality_mode': ['additive', 'multiplicative'],
+        'daily_seasonality': [True, False, 8],      # bool = Prophet's default order, int = Fourier order
+        'weekly_seasonality': [True, False],
+        'yearly_seasonality': [True, False, 5, 20],
+    },
+    'logistic': {
+        'l2': [0.01, 0.1, 1.0, 10.0, 100.0],
+    },
+}
+
+
+def regressor_subsets(min_size=MIN_REGRESSORS):
+    """Every subset of the weather regressors with at least min_size members, largest first"""
+    return [list(combo) for size in range(len(REGRESSORS), min_size - 1, -1)
+            for combo in itertools.combinations(REGRESSORS, size)]
+
+
+def feature_sets():
+    """Raw regressors plus every combination of the engineered feature groups"""
+    groups = list(FEATURE_GROUPS)
+    return [REGRESSORS + [f for g in combo for f in FEATURE_GROUPS[g]]
+            for size in range(len(groups), -1, -1) for combo in itertools.combinations(groups, size)]
+
+
+def sample_candidates(backend, n, seed=0):
+    """n distinct configs drawn from the search space; the backend's default config is always one"""
+    rng = random.Random(seed)
+    space = SEARCH_SPACE[backend]
+    subset_key, subsets = ('regressors', regressor_subsets()) if backend == 'prophet' else ('features', feature_sets())
+    total = math.prod(len(v) for v in space.values()) * len(subsets)
+
+    candidates = [effective_config(backend)]
+    seen = {json.dumps(candidates[0], sort_keys=True)}
+    while len(candidates) < min(n, total):
+        config = {name: rng.choice(values) for name, values in space.items()}
+        config[subset_key] = rng.choice(subsets)
+        config = effective_config(backend, config)
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            candidates.append(config)
+    return candidates
+
+
+def rung_budgets(history_days, min_days=MIN_DAYS, eta=ETA):
+    """Training window (days) per rung: min_days, min_days * eta, ... and finally the whole history"""
+    budgets = []
+    days = min_days
+    while days < history_days:
+        budgets.append(days)
+        days *= eta
+    return budgets + [history_days]
+
+
+def successive_halving(featured, backend=DEFAULT_BACKEND, candidates=None, eta=ETA, min_days=MIN_DAYS,
+                       holdout_days=HOLDOUT_DAYS, workers=None, cache_dir=os.path.join(BACKTEST_DIR, 'cache'),
+                       seed=0):
+    """Run the search, returns (ranked final-rung results, per-rung summaries)"""
+    candidates = candidates or sample_candidates(backend, N_CANDIDATES, seed)
+    times = featured['date_time']
+    cutoff = (times.max() - pd.Timedelta(days=holdout_days)).floor('D')
+    end = times.max() + pd.Timedelta(hours=1)
+    history_days = (cutoff - times.min().floor('D')).days
+    if history_days <= 0:
+        raise ValueError(f"Need more than {holdout_days} days of data to hold out {holdout_days} days")
+    budgets = rung_budgets(history_days, min(min_days, history_days), eta)
+
+    survivors = list(range(len(candidates)))
+    rungs = []
+    while True:
+        rung, days = len(rungs), budgets[len(rungs)]
+        fold = Fold(f'rung{rung}-{days}d', cutoff - pd.Timedelta(days=days), cutoff, end)
+        start = time.perf_counter()
+        results = evaluate(featured, [(fold, backend, candidates[i]) for i in survivors], cache_dir, workers,
+                           label=f"Rung {rung}: {len(survivors)} {backend} candidates on {days} days")
+        for i, result in zip(survivors, results):
+            result['candidate'] = i
+        ranked = sorted(results, key=lambda r: r['brier'] if not np.isnan(r.get('brier', np.nan)) else np.inf)
+        rungs.append({'rung': rung, 'train_days': days, 'candidates': len(survivors),
+                      'best_brier': ranked[0].get('brier'), 'seconds': round(time.perf_counter() - start, 1)})
+        print(f"   best Brier {ranked[0].get('brier', float('nan')):.5f} (candidate {ranked[0]['candidate']})")
+
+        if days == history_days:
+            break
+        keep = max(1, math.ceil(len(survivors) / eta))
+        survivors = [r['candidate'] for r in ranked[:keep] if 'error' not in r] or [ranked[0]['candidate']]
+        if len(survivors) == 1:
+            # Nothing left to compare: go straight to the full-history fit
+            budgets[len(rungs):] = [history_days]
+    return ranked, rungs
+
+
+def save_best_config(backend, config, result, rungs, models_dir=MODELS_DIR):
+    path = os.path.join(models_dir, BEST_CONFIG_FILE)
+    os.makedirs(models_dir, exist_ok=True)
+    write_json_atomic(path, {
+        'backend': backend,
+        'config': config,
+        'brier': result['brier'],
+        'auc': result['auc'],
+        'searched_at': datetime.now(timezone.utc).isoformat(),
+        'rungs': rungs,
+    })
+    return path
+
+
+def search(featured, backend=DEFAULT_BACKEND, n_candidates=N_CANDIDATES, eta=ETA, min_days=MIN_DAYS,
+           holdout_days=HOLDOUT_DAYS, workers=None, cache_dir=os.path.join(BACKTEST_DIR, 'cache'),
+           seed=0, models_dir=MODELS_DIR):
+    """Search, print the leaderboard and persist the best config, returns it"""
+    candidates = sample_candidates(backend, n_candidates, seed)
+    print(f"🔎 Searching {len(candidates)} {backend} configs (eta={eta}, holdout {holdout_days} days)")
+    start = time.perf_counter()
+    ranked, rungs = successive_halving(featured, backend, candidates, eta, min_days, holdout_days,
+                                       workers, cache_dir)
+    total_fits = sum(r['candidates'] for r in rungs)
+    # Cost in training days fitted, against fitting every candidate on the whole history
+    fitted_days = sum(r['candidates'] * r['train_days'] for r in rungs)
+    exhaustive_days = len(candidates) * rungs[-1]['train_days']
+
+    print(f"\n{'rung':>4} {'train days':>11} {'candidates':>11} {'best Brier':>11} {'seconds':>8}")
+    print("-" * 49)
+    for r in rungs:
+        print(f"{r['rung']:>4} {r['train_days']:>11,} {r['candidates']:>11} {r['best_brier']:>11.5f} {r['seconds']:>8.1f}")
+
+    best = ranked[0]
+    if 'error' in best:
+        raise RuntimeError(f"Every candidate failed on the final rung, e.g. {best['error']}")
+    config = candidates[best['candidate']]
+    path = save_best_config(backend, config, best, rungs, models_dir)
+    print(f"\n✅ {total_fits} fits in {time.perf_counter() - start:.1f}s, "
+          f"{fitted_days / exhaustive_days:.0%} of the training data of full fits for every candidate")
+    print(f"🏆 Best: Brier {best['brier']:.5f}, AUC {best['auc']:.3f}")
+    for name, value in config.items():
+        print(f"   {name}: {value}")
+    print(f"💾 Saved to {path}")
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter search")
+    parser.add_argument('featured', nargs='?', default=FEATURED_PATH)
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument('--candidates', type=int, default=N_CANDIDATES)
+    parser.add_argument('--eta', type=int, default=ETA, help="keep the best 1/eta of candidates per rung")
+    parser.add_argument('--min-days', type=int, default=MIN_DAYS, help="training window of the first rung")
+    parser.add_argument('--holdout-days', type=int, default=HOLDOUT_DAYS)
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="where best_config.json is written")
+    parser.add_argument('--cache-dir', default=os.path.join(BACKTEST_DIR, 'cache'))
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    featured = load_training_frame(args.featured)
+    search(featured, args.backend, args.candidates, args.eta, args.min_days, args.holdout_days, args.workers,
+           None if args.no_cache else args.cache_dir, args.seed, args.models_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
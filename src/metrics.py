@@ -0,0 +1,295 @@
+"""In-process metrics: counters, gauges and latency histograms
+
+Every ThunderCast metric is declared here and updated where the work
+happens:
+
+    with API_FETCH_SECONDS.time():
+        response = session.get(...)
+    STORE_WRITE_ROWS.labels('weather_data').observe(len(rows))
+    CACHE_REQUESTS.labels('forecast', 'hit').inc()
+
+Histograms use fixed buckets, so an observation is one bisect plus three
+updates under a per-series lock (about a microsecond); that is cheap enough
+to leave on everywhere. Processes expose the registry in Prometheus text
+format at /metrics and as JSON at /metrics.json, either through serve() or
+from an existing HTTP handler via render_prometheus()/snapshot().
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Seconds; Prometheus' defaults plus finer buckets for millisecond-scale calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ROW_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+REGISTRY = []
+
+
+class _Timer:
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _CounterSeries:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+
+class _HistogramSeries:
+    def __init__(self, buckets):
+        self.lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Context manager observing the wall time of its block"""
+        return _Timer(self)
+
+
+class Metric:
+    """A named metric family; series are created per label values on first use"""
+
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def series(self):
+        """[(labels dict, series)] in creation order"""
+        return [(dict(zip(self.labelnames, key)), s) for key, s in list(self._series.items())]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+
+class Gauge(Metric):
+    """Value read from a callback at scrape time (e.g. spool depth)"""
+
+    type = 'gauge'
+
+    def __init__(self, name, help, fn):
+        self.fn = fn
+        super().__init__(name, help)
+
+    def _new_series(self):
+        return None
+
+    def value(self):
+        try:
+            return float(self.fn())
+        except Exception:
+            return float('nan')
+
+
+def _register(metric):
+    REGISTRY[:] = [m for m in REGISTRY if m.name != metric.name]
+    REGISTRY.append(metric)
+    return metric
+
+
+def counter(name, help, labelnames=()):
+    return _register(Counter(name, help, labelnames))
+
+
+def histogram(name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def gauge(name, help, fn):
+    """Register (or replace) a callback gauge"""
+    return _register(Gauge(name, help, fn))
+
+
+# ---------------------------------------------------------------------------
+# ThunderCast metrics
+# ---------------------------------------------------------------------------
+
+API_FETCH_SECONDS = histogram('thundercast_api_fetch_seconds', "OpenWeatherMap request latency")
+API_FETCH_ERRORS = counter('thundercast_api_fetch_errors_total', "Failed OpenWeatherMap requests")
+STORE_WRITE_SECONDS = histogram('thundercast_store_write_seconds', "Store insert/upsert latency", ['table'])
+STORE_WRITE_ROWS = histogram('thundercast_store_write_rows', "Rows per store insert/upsert", ['table'],
+                             buckets=ROW_BUCKETS)
+MODEL_LOAD_SECONDS = histogram('thundercast_model_load_seconds', "Model artifact load time")
+PREDICT_SECONDS = histogram('thundercast_predict_seconds', "Model predict call latency", ['path'])
+DASHBOARD_QUERY_SECONDS = histogram('thundercast_dashboard_query_seconds',
+                                    "Dashboard store queries (cache misses only)", ['query'])
+CACHE_REQUESTS = counter('thundercast_cache_requests_total', "Cache lookups", ['cache', 'result'])
+PIPELINE_STAGE_SECONDS = histogram('thundercast_pipeline_stage_seconds', "Pipeline stage wall time", ['stage'])
+PIPELINE_STAGE_FAILURES = counter('thundercast_pipeline_stage_failures_total', "Failed pipeline stages", ['stage'])
+
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_prometheus():
+    """The registry in Prometheus text exposition format"""
+    lines = []
+    for metric in list(REGISTRY):
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        if isinstance(metric, Gauge):
+            lines.append(f"{metric.name} {metric.value()}")
+            continue
+        for labels, series in metric.series():
+            if isinstance(metric, Counter):
+                lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(series.value)}")
+                continue
+            with series.lock:
+                counts, total, count = list(series.counts), series.sum, series.count
+            cumulative = 0
+            for bound, n in zip(list(metric.buckets) + ['+Inf'], counts):
+                cumulative += n
+                le = bound if bound == '+Inf' else _format_value(bound)
+                lines.append(f"{metric.name}_bucket{_format_labels(labels, {'le': le})} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def snapshot():
+    """The registry as plain data: counters/gauges as values, histograms as count/sum/mean/buckets"""
+    out = {}
+    for metric in list(REGISTRY):
+        if isinstance(metric, Gauge):
+            out[metric.name] = {'type': 'gauge', 'value': metric.value()}
+            continue
+        values = []
+        for labels, series in metric.series():
+            if isinstance(metric, Counter):
+                values.append({'labels': labels, 'value': series.value})
+                continue
+            with series.lock:
+                counts, total, count = list(series.counts), series.sum, series.count
+            values.append({'labels': labels, 'count': count, 'sum': total,
+                           'mean': total / count if count else None,
+                           'buckets': dict(zip([str(b) for b in metric.buckets] + ['+Inf'], counts))})
+        out[metric.name] = {'type': metric.type, 'values': values}
+    return out
+
+
+def metrics_response(path):
+    """(content type, body) for /metrics or /metrics.json, None for other paths"""
+    if path == '/metrics':
+        return 'text/plain; version=0.0.4', render_prometheus().encode()
+    if path == '/metrics.json':
+        return 'application/json', json.dumps(snapshot()).encode()
+    return None
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        response = metrics_response(self.path.split('?')[0])
+        if response is None:
+            self.send_error(404)
+            return
+        content_type, body = response
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_servers = {}
+
+
+def serve(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics and /metrics.json from a daemon thread (once per port)"""
+    if port in _servers:
+        return _servers[port]
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    _servers[port] = server
+    print(f"📈 Metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,90 @@
+"""Compact, versioned model artifacts
+
+A trained model is stored as a directory holding only what prediction needs:
+
+    data/models/
+        current.json                    -> {"model_version": "prophet-20260205140537"}
+        prophet-20260205140537/
+            manifest.json               format, version, model_type, trend/seasonality/regressor metadata
+            params.npz                  k, m, deltas, changepoints_t, beta, masks, sigma_obs
+        logistic-20260301090000/
+            manifest.json               format, version, model_type, features, intercept
+            params.npz                  coef, mean, scale
+
+No training history and no pickled library objects, so artifacts are small,
+load in milliseconds and survive Prophet/pandas upgrades. load_artifact()
+rebuilds the StormModel backend named by model_type (see models.py).
+"""
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+from fast_inference import ProphetPointForecaster
+from fileutil import write_json_atomic
+from metrics import MODEL_LOAD_SECONDS
+from models import ProphetModel, StormModel, get_backend
+
+MODELS_DIR = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/models'
+ARTIFACT_FORMAT = 1
+CURRENT_FILE = 'current.json'
+
+
+def new_model_version(prefix='prophet'):
+    """Version tag written to predictions.model_version, e.g. prophet-20260205140537"""
+    return f"{prefix}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+
+
+def save_artifact(model, root=MODELS_DIR, version=None, metadata=None):
+    """Save a fitted StormModel (or a fitted Prophet / ProphetPointForecaster) and return its directory"""
+    if not isinstance(model, StormModel):
+        engine = model if isinstance(model, ProphetPointForecaster) else ProphetPointForecaster.from_prophet(model)
+        model = ProphetModel(engine=engine)
+    version = version or new_model_version(model.model_type)
+    path = os.path.join(root, version)
+    os.makedirs(path, exist_ok=True)
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'model_version': version,
+        'model_type': model.model_type,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        **model.save(path),
+        'python': platform.python_version(),
+        'metadata': metadata or {},
+    }
+    write_json_atomic(os.path.join(path, 'manifest.json'), manifest)
+    return path
+
+
+def load_artifact(path):
+    """Rebuild a predict-capable StormModel from an artifact directory"""
+    with MODEL_LOAD_SECONDS.time():
+        return _load_artifact(path)
+
+
+def _load_artifact(path):
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest['format'] > ARTIFACT_FORMAT:
+        raise ValueError(f"Artifact format {manifest['format']} is newer than supported ({ARTIFACT_FORMAT})")
+
+    model = get_backend(manifest.get('model_type', 'prophet')).load(path, manifest)
+    model.model_version = manifest['model_version']
+    model.metadata = manifest.get('metadata', {})
+    return model
+
+
+def publish(version, root=MODELS_DIR):
+    """Atomically point current.json at a saved version"""
+    write_json_atomic(os.path.join(root, CURRENT_FILE), {'model_version': version})
+
+
+def current_version(root=MODELS_DIR):
+    with open(os.path.join(root, CURRENT_FILE)) as f:
+        return json.load(f)['model_version']
+
+
+def load_current(root=MODELS_DIR):
+    """Load whichever artifact current.json points at"""
+    return load_artifact(os.path.join(root, current_version(root)))
@@ -1,86 +1,203 @@
 import pandas as pd
 import numpy as np
-from prophet import Prophet
-import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import argparse
+import logging
 import os
-
-# Load featured data
-df = pd.read_csv('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/pune_featured.csv')
-df['date_time'] = pd.to_datetime(df['date_time'])
-
-print("🤖 Starting Prophet Model Training...")
-
-# Prepare data for Prophet
-# Prophet needs columns named 'ds' (datetime) and 'y' (target variable)
-prophet_df = pd.DataFrame({
-    'ds': df['date_time'],
-    'y': df['thunderstorm']  # Target: thunderstorm probability
-})
-
-# Add regressors (extra features)
-prophet_df['tempC'] = df['tempC']
-prophet_df['humidity'] = df['humidity']
-prophet_df['pressure'] = df['pressure']
-prophet_df['windspeedKmph'] = df['windspeedKmph']
-prophet_df['cloudcover'] = df['cloudcover']
-prophet_df['precipMM'] = df['precipMM']
-
-print(f"📊 Training data shape: {prophet_df.shape}")
-print(f"Date range: {prophet_df['ds'].min()} to {prophet_df['ds'].max()}")
-
-# Initialize Prophet model
-model = Prophet(
-    daily_seasonality=True,
-    weekly_seasonality=True,
-    yearly_seasonality=True,
-    changepoint_prior_scale=0.05,
-    interval_width=0.95
-)
-
-# Add regressors
-model.add_regressor('tempC')
-model.add_regressor('humidity')
-model.add_regressor('pressure')
-model.add_regressor('windspeedKmph')
-model.add_regressor('cloudcover')
-model.add_regressor('precipMM')
-
-print("\n🔧 Model configuration:")
-print(f"- Daily seasonality: Enabled")
-print(f"- Weekly seasonality: Enabled")
-print(f"- Yearly seasonality: Enabled")
-print(f"- Regressors: 6 weather parameters")
-
-# Train the model
-print("\n⏳ Training model... (this may take 2-3 minutes)")
-model.fit(prophet_df)
-
-print("✅ Model training complete!")
-
-# Create models directory
-os.makedirs('D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/models', exist_ok=True)
-
-# Save the trained model
-model_path = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/models/prophet_model.pkl'
-with open(model_path, 'wb') as f:
-    pickle.dump(model, f)
-
-print(f"\n💾 Model saved to: {model_path}")
-
-# Make sample prediction
-print("\n🔮 Testing model with sample prediction...")
-future = model.make_future_dataframe(periods=24, freq='H')  # Next 24 hours
-
-# Add regressor values for future (using last known values as example)
-last_values = prophet_df.iloc[-1]
-for col in ['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover', 'precipMM']:
-    future[col] = last_values[col]
-
-forecast = model.predict(future)
-
-print("\n📈 Sample predictions (next 6 hours):")
-print(forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(6))
-
-print("\n" + "="*80)
-print("✅ MODEL TRAINING COMPLETE!")
-print("="*80)
\ No newline at end of file
+import time
+import json
+from feature_engineering import FEATURED_PATH, PIPELINE, REGRESSORS
+from model_artifact import MODELS_DIR, new_model_version, save_artifact, publish
+from models import DEFAULT_BACKEND, PROPHET_CONFIG, BACKENDS, get_backend
+
+# Featured dataset for each location in a multi-location run
+LOCATION_FEATURED_PATH = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/processed/{city}_featured.csv'
+
+DEFAULT_CONFIG = PROPHET_CONFIG
+
+# Written by hyperparameter_search.py, read by production training runs
+BEST_CONFIG_FILE = 'best_config.json'
+
+# Native thread pools that would otherwise each grab every core in every worker
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'NUMEXPR_NUM_THREADS', 'STAN_NUM_THREADS']
+
+def tuned_config(backend=DEFAULT_BACKEND, models_dir=MODELS_DIR):
+    """The searched config for this backend from best_config.json, None to use the defaults"""
+    path = os.path.join(models_dir, BEST_CONFIG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        best = json.load(f)
+    return best['config'] if best['backend'] == backend else None
+
+def fit_model(featured, config=None, backend=DEFAULT_BACKEND, **fit_kwargs):
+    """Build and fit a model, returns (model, fit seconds)"""
+    model = get_backend(backend)(config)
+    start = time.perf_counter()
+    model.fit(featured, **fit_kwargs)
+    return model, time.perf_counter() - start
+
+def load_training_frame(featured_path=FEATURED_PATH):
+    """Load the featured dataset with parsed timestamps"""
+    df = pd.read_csv(featured_path)
+    df['date_time'] = pd.to_datetime(df['date_time'])
+    return df
+
+def save_model(model, featured, models_dir=MODELS_DIR, **metadata):
+    """Save the fitted parameters as a versioned artifact and make it current"""
+    model_version = new_model_version(model.model_type)
+    model_path = save_artifact(model, models_dir, model_version, metadata={
+        'training_rows': len(featured),
+        'training_start': str(featured['date_time'].min()),
+        'training_end': str(featured['date_time'].max()),
+        **metadata,
+    })
+    publish(model_version, models_dir)
+    return model_version, model_path
+
+def sample_future(featured, periods=24):
+    """Featured frame for the hours after the data, carrying the last readings forward"""
+    history = featured[['date_time'] + REGRESSORS]
+    last = history.iloc[-1]
+    future = pd.DataFrame({'date_time': pd.date_range(last['date_time'] + pd.Timedelta(hours=1),
+                                                      periods=periods, freq='h')})
+    for col in REGRESSORS:
+        future[col] = last[col]
+    return PIPELINE.transform_tail(history.tail(PIPELINE.lookback), future)
+
+def train_single(backend=DEFAULT_BACKEND):
+    """Train the default Pune model"""
+    print(f"🤖 Starting {backend} model training...")
+
+    featured = load_training_frame()
+
+    print(f"📊 Training data shape: {featured.shape}")
+    print(f"Date range: {featured['date_time'].min()} to {featured['date_time'].max()}")
+
+    if backend == 'prophet' and tuned_config(backend) is None:
+        print("\n🔧 Model configuration:")
+        print(f"- Daily seasonality: Enabled")
+        print(f"- Weekly seasonality: Enabled")
+        print(f"- Yearly seasonality: Enabled")
+        print(f"- Regressors: 6 weather parameters")
+        print("\n⏳ Training model... (this may take 2-3 minutes)")
+    else:
+        print("\n⏳ Training model...")
+
+    config = tuned_config(backend)
+    if config is not None:
+        print(f"🔧 Using the searched config from {BEST_CONFIG_FILE}")
+
+    # Train the model
+    model, fit_seconds = fit_model(featured, config, backend)
+
+    print(f"✅ Model training complete! ({fit_seconds:.1f}s)")
+
+    model_version, model_path = save_model(model, featured, fit_seconds=round(fit_seconds, 2),
+                                           tuned=config is not None)
+
+    print(f"\n💾 Model {model_version} saved to: {model_path}")
+
+    # Make sample prediction (using last known values as example)
+    print("\n🔮 Testing model with sample prediction...")
+    future = sample_future(featured, periods=24)  # Next 24 hours
+    forecast = pd.DataFrame({'ds': future['date_time'].to_numpy(),
+                             'probability': model.predict_proba(future)})
+
+    print("\n📈 Sample predictions (next 6 hours):")
+    print(forecast.tail(6))
+
+    print("\n" + "="*80)
+    print("✅ MODEL TRAINING COMPLETE!")
+    print("="*80)
+
+# ---------------------------------------------------------------------------
+# Multi-location training
+# ---------------------------------------------------------------------------
+
+def _init_worker(cores):
+    """Pin a pool worker to one core and keep native libraries single-threaded"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = '1'
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    try:
+        core = cores.get_nowait()
+        os.sched_setaffinity(0, {core})
+    except Exception:
+        pass  # affinity is best effort (not available on Windows/macOS)
+
+def training_pool(workers):
+    """Spawned process pool whose workers each get one core and single-threaded native libraries"""
+    # Spawned workers inherit these before numpy/cmdstan are imported
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, '1')
+    ctx = multiprocessing.get_context('spawn')
+    cores = ctx.Queue()
+    for core in range(os.cpu_count() or 1):
+        cores.put(core)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(cores,))
+
+def train_location(city, featured_template=LOCATION_FEATURED_PATH, models_dir=MODELS_DIR, config=None,
+                   backend=DEFAULT_BACKEND):
+    """Fit and save one location's model; never raises so one bad city can't abort the batch"""
+    featured_path = featured_template.format(city=city)
+    result = {'city': city, 'status': 'failed', 'fit_seconds': None, 'model_version': None, 'error': None}
+    try:
+        featured = load_training_frame(featured_path)
+        model, fit_seconds = fit_model(featured, config or tuned_config(backend, models_dir), backend)
+        model_version, _ = save_model(model, featured, os.path.join(models_dir, city),
+                                      city=city, fit_seconds=round(fit_seconds, 2))
+        result.update(status='ok', fit_seconds=fit_seconds, model_version=model_version, rows=len(featured))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def train_locations(cities, workers=None, models_dir=MODELS_DIR, config=None,
+                    featured_template=LOCATION_FEATURED_PATH, backend=DEFAULT_BACKEND):
+    """Fit one model per city across a process pool, returns per-city results"""
+    workers = workers or os.cpu_count()
+    workers = max(1, min(workers, len(cities)))
+
+    print(f"🤖 Training {len(cities)} {backend} location models on {workers} workers...")
+    start = time.perf_counter()
+    results = []
+    with training_pool(workers) as pool:
+        futures = {pool.submit(train_location, city, featured_template, models_dir, config, backend): city for city in cities}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # worker process died
+                result = {'city': futures[future], 'status': 'failed', 'fit_seconds': None,
+                          'model_version': None, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if result['status'] == 'ok':
+                print(f"  ✅ {result['city']}: {result['model_version']} in {result['fit_seconds']:.1f}s")
+            else:
+                print(f"  ❌ {result['city']}: {result['error']}")
+
+    total = time.perf_counter() - start
+    ok = [r for r in results if r['status'] == 'ok']
+    fit_total = sum(r['fit_seconds'] for r in ok)
+    print(f"\n✅ {len(ok)}/{len(cities)} models trained in {total:.1f}s wall "
+          f"({fit_total:.1f}s of fitting, {fit_total / total if total else 0:.1f}x parallel speedup)")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train ThunderCast models")
+    parser.add_argument('--locations', nargs='+', help="train one model per city from {city}_featured.csv")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument('--search', action='store_true',
+                        help="run the hyperparameter search first and train with its best config")
+    args = parser.parse_args()
+
+    if args.search:
+        from hyperparameter_search import search
+        search(load_training_frame(), args.backend, workers=args.workers)
+
+    if args.locations:
+        train_locations(args.locations, args.workers, backend=args.backend)
+    else:
+        train_single(args.backend)
@@ -0,0 +1,230 @@
+"""Thunderstorm model backends behind one interface
+
+Every backend is trained on, and scores, featured frames from
+feature_engineering.py (a DataFrame or a dict of column arrays with
+`date_time` and the registered features):
+
+    model = get_backend('logistic')().fit(featured)      # 'thunderstorm' is the label
+    p = model.predict_proba(future)                      # P(thunderstorm) per row, 0..1
+    manifest_fields = model.save(artifact_dir)
+    model = LogisticModel.load(artifact_dir, manifest)
+
+model_artifact.py wraps save/load with versioning and current.json, so
+prediction code only ever sees `load_current(...).predict_proba(...)`.
+
+    prophet   Prophet regression on the 0/1 label with the weather regressors,
+              clipped to [0, 1]. Minutes to fit; scored by ProphetPointForecaster.
+    logistic  L2-regularized logistic regression on the engineered features,
+              fitted with Newton's method in NumPy. Seconds to fit on years of
+              hourly data and a single matrix-vector product to score.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import REGRESSORS, to_model_frame
+from fast_inference import ProphetPointForecaster
+
+DEFAULT_BACKEND = os.getenv("THUNDERCAST_MODEL", "prophet")
+
+PROPHET_CONFIG = {
+    'daily_seasonality': True,
+    'weekly_seasonality': True,
+    'yearly_seasonality': True,
+    'changepoint_prior_scale': 0.05,
+    'regressors': REGRESSORS,
+}
+
+# Numeric columns of the feature registry the classifier uses (year, day and season are left out)
+CLASSIFIER_FEATURES = REGRESSORS + [
+    'temp_humidity', 'pressure_wind', 'humidity_pressure_ratio',
+    'temp_lag_1h', 'humidity_lag_1h', 'pressure_lag_1h', 'temp_change', 'pressure_change',
+    'temp_rolling_3h', 'humidity_rolling_3h', 'pressure_rolling_6h', 'temp_rolling_std_3h',
+    'hour_sin', 'hour_cos', 'month_sin', 'month_cos',
+]
+
+LOGISTIC_CONFIG = {
+    'l2': 1.0,          # penalty on the standardized coefficients
+    'max_iter': 50,
+    'tol': 1e-8,        # stop when the largest Newton step is below this
+    'features': CLASSIFIER_FEATURES,
+}
+
+PARAMS_FILE = 'params.npz'
+PROPHET_ARRAYS = ['deltas', 'changepoints_t', 'beta', 'additive_mask', 'multiplicative_mask']
+
+
+class StormModel:
+    """fit / predict_proba / save / load; subclasses set model_type and the four methods"""
+
+    model_type = None
+
+    def __init__(self, config=None):
+        self.config = dict(config or {})
+        self.model_version = None
+        self.metadata = {}
+
+    def fit(self, featured, **fit_kwargs):
+        """Fit on a featured frame with a 'thunderstorm' column, returns self"""
+        raise NotImplementedError
+
+    def predict_proba(self, featured):
+        """Thunderstorm probability (0..1) for every row of a featured frame or column dict"""
+        raise NotImplementedError
+
+    def save(self, path):
+        """Write the fitted parameters into an artifact directory, returns extra manifest fields"""
+        raise NotImplementedError
+
+    @classmethod
+    def load(cls, path, manifest):
+        raise NotImplementedError
+
+
+class ProphetModel(StormModel):
+    model_type = 'prophet'
+
+    def __init__(self, config=None, engine=None):
+        super().__init__(config or PROPHET_CONFIG)
+        self.engine = engine    # ProphetPointForecaster
+        self.prophet = None     # the fitted prophet.Prophet, only in the process that trained it
+
+    def build(self):
+        """Initialize Prophet with its regressors"""
+        from prophet import Prophet  # heavy (Stan backend), only needed to fit
+
+        params = {k: v for k, v in self.config.items() if k != 'regressors'}
+        model = Prophet(interval_width=0.95, **params)
+        for col in self.config['regressors']:
+            model.add_regressor(col)
+        return model
+
+    def fit(self, featured, **fit_kwargs):
+        # Prophet needs columns named 'ds' (datetime) and 'y' (target variable), plus the regressors
+        self.prophet = self.build()
+        self.prophet.fit(to_model_frame(featured), **fit_kwargs)
+        self.engine = ProphetPointForecaster.from_prophet(self.prophet)
+        return self
+
+    def predict_yhat(self, featured):
+        return self.engine.predict_yhat(featured['date_time'], featured)
+
+    def predict_proba(self, featured):
+        return np.clip(self.predict_yhat(featured), 0.0, 1.0)
+
+    def save(self, path):
+        engine = self.engine
+        np.savez(os.path.join(path, PARAMS_FILE), **{name: getattr(engine, name) for name in PROPHET_ARRAYS})
+        return {
+            'growth': engine.growth,
+            'k': engine.k,
+            'm': engine.m,
+            'start': engine.start.isoformat(),
+            't_scale_ns': int(engine.t_scale.value),
+            'y_scale': engine.y_scale,
+            'floor': engine.floor,
+            'sigma_obs': engine.sigma_obs,
+            'seasonalities': engine.seasonalities,
+            'regressors': engine.regressors,
+        }
+
+    @classmethod
+    def load(cls, path, manifest):
+        with np.load(os.path.join(path, PARAMS_FILE)) as arrays:
+            params = {name: arrays[name] for name in PROPHET_ARRAYS}
+        engine = ProphetPointForecaster(
+            growth=manifest['growth'],
+            k=manifest['k'],
+            m=manifest['m'],
+            start=pd.Timestamp(manifest['start']),
+            t_scale=pd.Timedelta(manifest['t_scale_ns'], unit='ns'),
+            y_scale=manifest['y_scale'],
+            floor=manifest['floor'],
+            seasonalities=manifest['seasonalities'],
+            regressors=manifest['regressors'],
+            sigma_obs=manifest['sigma_obs'],
+            model_version=manifest['model_version'],
+            **params,
+        )
+        return cls(manifest.get('config'), engine)
+
+
+def _sigmoid(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))  # overflow-free logistic
+
+
+class LogisticModel(StormModel):
+    model_type = 'logistic'
+
+    def __init__(self, config=None):
+        super().__init__({**LOGISTIC_CONFIG, **(config or {})})
+        self.features = list(self.config['features'])
+        self.mean = self.scale = self.coef = None
+        self.intercept = 0.0
+        self.iterations = None
+
+    def design_matrix(self, featured):
+        """Standardized feature matrix; missing values (e.g. lags without history) sit at the mean"""
+        n = len(featured['date_time'])
+        X = np.empty((n, len(self.features)))
+        for i, name in enumerate(self.features):
+            X[:, i] = np.asarray(featured[name], dtype='float64')
+        return self._standardize(X) if self.mean is not None else X
+
+    def _standardize(self, X):
+        X -= self.mean
+        X /= self.scale
+        X[np.isnan(X)] = 0.0
+        return X
+
+    def fit(self, featured, **fit_kwargs):
+        y = np.asarray(featured['thunderstorm'], dtype='float64')
+        self.mean = self.scale = None
+        raw = self.design_matrix(featured)
+        self.mean = np.nanmean(raw, axis=0)
+        self.scale = np.nanstd(raw, axis=0)
+        self.scale[self.scale == 0] = 1.0
+        X = np.column_stack([self._standardize(raw), np.ones(len(y))])
+
+        # Newton-Raphson on the penalized log-likelihood (intercept not penalized)
+        penalty = np.full(X.shape[1], self.config['l2'])
+        penalty[-1] = 0.0
+        w = np.zeros(X.shape[1])
+        for iteration in range(1, self.config['max_iter'] + 1):
+            p = _sigmoid(X @ w)
+            gradient = X.T @ (p - y) + penalty * w
+            hessian = (X * (p * (1 - p))[:, None]).T @ X + np.diag(penalty + 1e-9)
+            step = np.linalg.solve(hessian, gradient)
+            w -= step
+            if np.max(np.abs(step)) < self.config['tol']:
+                break
+        self.coef, self.intercept, self.iterations = w[:-1], float(w[-1]), iteration
+        return self
+
+    def predict_proba(self, featured):
+        return _sigmoid(self.design_matrix(featured) @ self.coef + self.intercept)
+
+    def save(self, path):
+        np.savez(os.path.join(path, PARAMS_FILE), coef=self.coef, mean=self.mean, scale=self.scale)
+        return {'features': self.features, 'intercept': self.intercept,
+                'iterations': self.iterations, 'config': {k: v for k, v in self.config.items() if k != 'features'}}
+
+    @classmethod
+    def load(cls, path, manifest):
+        model = cls({**manifest.get('config', {}), 'features': manifest['features']})
+        with np.load(os.path.join(path, PARAMS_FILE)) as arrays:
+            model.coef, model.mean, model.scale = arrays['coef'], arrays['mean'], arrays['scale']
+        model.intercept = manifest['intercept']
+        model.iterations = manifest.get('iterations')
+        return model
+
+
+BACKENDS = {cls.model_type: cls for cls in [ProphetModel, LogisticModel]}
+
+
+def get_backend(name=DEFAULT_BACKEND):
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown model backend {name!r}; expected one of {sorted(BACKENDS)}") from None
@@ -0,0 +1,105 @@
+"""Local stand-in for the OpenWeatherMap current weather and hourly forecast endpoints
+
+Run it and point the collector (and the batch forecaster) at it:
+
+    python src/owm_stub.py 8081 0.2
+    OPENWEATHER_URL=http://127.0.0.1:8081/data/2.5/weather python src/data_collection.py locations.json
+    OPENWEATHER_FORECAST_URL=http://127.0.0.1:8081/data/3.0/onecall python src/batch_prediction.py locations.json
+
+Paths ending in /onecall answer with a One Call style `hourly` forecast
+(48 hours), everything else with current weather.
+
+The optional second argument adds a fixed per-request latency (seconds) so
+concurrent collection can be benchmarked without touching the real API.
+"""
+import json
+import math
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def current_weather(lat, lon, now=None):
+    """Build a plausible current weather payload for a coordinate"""
+    now = time.time() if now is None else now
+    hour = (now / 3600 + lon / 15) % 24
+    daily = math.sin(2 * math.pi * (hour - 9) / 24)
+    return {
+        'coord': {'lat': lat, 'lon': lon},
+        'main': {
+            'temp': round(26 + 6 * daily, 2),
+            'humidity': int(60 - 20 * daily),
+            'pressure': int(1010 - 3 * daily),
+        },
+        'wind': {'speed': round(2.5 + 1.5 * abs(daily), 2)},
+        'clouds': {'all': int(40 + 30 * math.cos(lat + lon))},
+        'dt': int(now),
+    }
+
+
+def hourly_forecast(lat, lon, hours=48, now=None):
+    """One Call style payload: `hourly` entries from the current hour on"""
+    now = time.time() if now is None else now
+    first = int(now // 3600 * 3600)
+    hourly = []
+    for h in range(hours):
+        current = current_weather(lat, lon, first + h * 3600)
+        entry = {
+            'dt': current['dt'],
+            'temp': current['main']['temp'],
+            'humidity': current['main']['humidity'],
+            'pressure': current['main']['pressure'],
+            'wind_speed': current['wind']['speed'],
+            'clouds': current['clouds']['all'],
+        }
+        rain = round(max(0.0, math.sin(lat * 7 + lon * 3 + h / 5)) ** 4 * 6, 2)
+        if rain:
+            entry['rain'] = {'1h': rain}
+        hourly.append(entry)
+    return {'lat': lat, 'lon': lon, 'timezone_offset': 0, 'hourly': hourly}
+
+
+def make_handler(latency=0.0):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            try:
+                lat = float(query['lat'][0])
+                lon = float(query['lon'][0])
+            except (KeyError, ValueError):
+                self.send_error(400, "lat and lon are required")
+                return
+
+            if latency:
+                time.sleep(latency)
+
+            if url.path.endswith('/onecall'):
+                payload = hourly_forecast(lat, lon)
+            else:
+                payload = current_weather(lat, lon)
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port=8081, latency=0.0):
+    """Start the stub server in the foreground"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency))
+    print(f"🌦️ OpenWeatherMap stub listening on http://127.0.0.1:{port} (latency {latency}s)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8081
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    serve(port, latency)
@@ -0,0 +1,235 @@
+"""In-process pipeline: collection -> features -> prediction -> reports/export
+
+The standalone scripts each re-import pandas, rebuild their clients, re-read
+their inputs and write them back out for the next script. Here the same steps
+run as stages of a dependency DAG inside one long-lived process: stages hand
+each other in-memory results, and the store, HTTP session, recent history and
+loaded model live in a PipelineContext that survives between runs. A stage
+starts as soon as its dependencies finish, so independent stages (reports and
+export) run concurrently. Every run records per-stage wall times.
+
+    pipeline = build_pipeline([DEFAULT_LOCATION])
+    pipeline.run()        # scheduler.py calls this every hour
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from batch_prediction import batch_prediction_rows, build_batch_frame, fetch_forecasts
+from data_collection import DEFAULT_LOCATION, build_session, fetch_weather_data_batch
+from model_artifact import MODELS_DIR, current_version, load_artifact
+from spool import ingest_key
+from storage import get_store
+from metrics import PIPELINE_STAGE_SECONDS, PIPELINE_STAGE_FAILURES, PREDICT_SECONDS
+
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+# Fill future regressors from the hourly forecast feed instead of the latest readings
+FORECAST_FEED = os.getenv("PIPELINE_FORECAST_FEED", "0") == "1"
+
+# Recent readings kept in memory per location (enough for the 7-day report)
+HISTORY_ROWS = 168
+FORECAST_HOURS = 6
+
+
+class Stage:
+    """A named step; fn(context, inputs) gets {dependency name: its result}"""
+
+    def __init__(self, name, fn, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+
+
+class Pipeline:
+    """Runs stages in dependency order, concurrently where the DAG allows"""
+
+    def __init__(self, stages, context=None, workers=PIPELINE_WORKERS):
+        self.stages = {stage.name: stage for stage in stages}
+        self.context = context
+        self.workers = workers
+        self.order = self._topological_order()
+        self.last_run = None
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through '{name}'")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def run(self):
+        """Run every stage once, returns {stage: result}
+
+        A failed stage is reported and its dependents are skipped; stages
+        that don't depend on it still run.
+        """
+        start = time.perf_counter()
+        results, timings, status = {}, {}, {}
+        remaining = list(self.order)
+        running = {}
+
+        def launch(pool):
+            for name in list(remaining):
+                deps = self.stages[name].deps
+                if any(status.get(d) in ('failed', 'skipped') for d in deps):
+                    status[name] = 'skipped'
+                    remaining.remove(name)
+                elif all(status.get(d) == 'ok' for d in deps):
+                    remaining.remove(name)
+                    running[pool.submit(self._run_stage, name, {d: results[d] for d in deps})] = name
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stage') as pool:
+            launch(pool)
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    ok, value, timings[name] = future.result()
+                    if ok:
+                        results[name], status[name] = value, 'ok'
+                    else:
+                        status[name] = 'failed'
+                        print(f"❌ Stage {name} failed: {value}")
+                launch(pool)
+
+        self.last_run = {
+            'total_seconds': time.perf_counter() - start,
+            'stages': {name: {'status': status.get(name, 'skipped'), 'seconds': timings.get(name)}
+                       for name in self.order},
+        }
+        self.print_timings()
+        return results
+
+    def _run_stage(self, name, inputs):
+        start = time.perf_counter()
+        try:
+            ok, value = True, self.stages[name].fn(self.context, inputs)
+        except Exception as e:
+            ok, value = False, e
+            PIPELINE_STAGE_FAILURES.labels(name).inc()
+        seconds = time.perf_counter() - start
+        PIPELINE_STAGE_SECONDS.labels(name).observe(seconds)
+        return ok, value, seconds
+
+    def print_timings(self):
+        print(f"⏱️ Pipeline run in {self.last_run['total_seconds']:.2f}s")
+        for name, stage in self.last_run['stages'].items():
+            seconds = f"{stage['seconds']:.3f}s" if stage['seconds'] is not None else '-'
+            print(f"   {name:<10} {stage['status']:<8} {seconds:>9}")
+
+
+class PipelineContext:
+    """State kept warm between runs: clients, recent history and the loaded model"""
+
+    def __init__(self, locations, store=None, models_dir=MODELS_DIR, reports_dir=None):
+        self.locations = locations
+        self.store = store or get_store()
+        self.session = build_session(len(locations))
+        self.models_dir = models_dir
+        self.reports_dir = reports_dir  # default: data/visualizations/reports
+        self.history = {}
+        self._engine = None
+
+    def engine(self):
+        """The current model, reloaded only when retraining publishes a new version"""
+        version = current_version(self.models_dir)
+        if self._engine is None or self._engine.model_version != version:
+            self._engine = load_artifact(os.path.join(self.models_dir, version))
+            print(f"✅ Loaded model {version}")
+        return self._engine
+
+    def recent(self, city):
+        """Newest-first weather rows for a location, read from the store only once"""
+        if city not in self.history:
+            self.history[city] = self.store.fetch('weather_data', order_by='timestamp', desc=True,
+                                                  limit=HISTORY_ROWS, location=city)
+        return self.history[city]
+
+    def remember(self, records):
+        """Add new readings to the history, skipping any the store fetch already returned"""
+        for record in records:
+            rows = self.recent(record['location'])
+            key = record.get('ingest_key') or ingest_key(record)
+            if any((row.get('ingest_key') or ingest_key(row)) == key for row in rows):
+                continue
+            rows.insert(0, record)
+            del rows[HISTORY_ROWS:]
+
+
+# ---------------------------------------------------------------------------
+# ThunderCast stages
+# ---------------------------------------------------------------------------
+
+def collect_stage(ctx, inputs):
+    """Fetch and spool the current readings, and add them to the in-memory history"""
+    # Read any missing history before the new readings reach the store
+    for loc in ctx.locations:
+        ctx.recent(loc['city'])
+    records = fetch_weather_data_batch(ctx.locations, session=ctx.session)
+    ctx.remember(records)
+    return records
+
+
+def features_stage(ctx, inputs):
+    """One featured batch for the next hours of every location with readings (or a forecast)"""
+    cities = [loc['city'] for loc in ctx.locations]
+    forecasts = fetch_forecasts(ctx.locations, ctx.session) if FORECAST_FEED else None
+    return build_batch_frame(cities, {city: ctx.recent(city) for city in cities}, forecasts, FORECAST_HOURS)
+
+
+def predict_stage(ctx, inputs):
+    """Forecast every location with one predict call on the warm model and save the predictions"""
+    engine = ctx.engine()
+    batch = inputs['features']
+    predictions = {}
+    if not len(batch['location']):
+        return predictions
+    with PREDICT_SECONDS.labels('pipeline').time():
+        probabilities = engine.predict_proba(batch)
+    rows = batch_prediction_rows(batch, probabilities, engine.model_version)
+    ctx.store.insert('predictions', rows)
+    for row in rows:
+        predictions.setdefault(row['location'], []).append(row)
+    return predictions
+
+
+def report_stage(ctx, inputs):
+    """One report bundle per location, built from the in-memory frames"""
+    from visualizations import VISUALIZATIONS_DIR, build_reports, to_frames  # plotly
+
+    predictions = inputs['predict']
+    frames = {city: to_frames(ctx.recent(city), rows) for city, rows in predictions.items()}
+    out_dir = ctx.reports_dir or os.path.join(VISUALIZATIONS_DIR, 'reports')
+    return build_reports(list(frames), out_dir, frames=frames, workers=1) if frames else []
+
+
+def export_stage(ctx, inputs):
+    from export import export_all
+
+    return export_all(store=ctx.store)
+
+
+def build_pipeline(locations=None, store=None, **context_kwargs):
+    ctx = PipelineContext(locations or [DEFAULT_LOCATION], store, **context_kwargs)
+    return Pipeline([
+        Stage('collect', collect_stage),
+        Stage('features', features_stage, ['collect']),
+        Stage('predict', predict_stage, ['features']),
+        Stage('report', report_stage, ['predict']),
+        Stage('export', export_stage, ['predict']),
+    ], ctx)
@@ -1,97 +1,105 @@
 import pandas as pd
-import pickle
 from datetime import datetime, timezone
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-if not SUPABASE_URL:
-    SUPABASE_URL = "https://bbiphtlpmlieprivkxba.supabase.co"
-    SUPABASE_KEY = ""
-
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Load trained model
-model_path = 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/models/prophet_model.pkl'
-with open(model_path, 'rb') as f:
-    model = pickle.load(f)
-
-print("🔮 ThunderCast Prediction System")
-print("=" * 80)
-
-# Fetch latest weather data
-response = (
-    supabase
-    .table('weather_data')
-    .select('*')
-    .order('timestamp', desc=True)
-    .limit(1)
-    .execute()
-)
-
-if not response.data:
-    print("❌ No weather data available. Run data_collection.py first!")
-    exit()
-
-latest_data = response.data[0]
-
-print("\n📊 Current Weather Conditions:")
-for k in ['timestamp', 'temperature', 'humidity', 'pressure', 'wind_speed', 'cloud_cover']:
-    print(f"{k.capitalize()}: {latest_data[k]}")
-
-# Prepare future dataframe (next 6 hours)
-future_dates = pd.date_range(
-    start=datetime.now(timezone.utc),
-    periods=6,
-    freq='h'
-)
-
-future = pd.DataFrame({
-    'ds': future_dates,
-    'tempC': latest_data['temperature'],
-    'humidity': latest_data['humidity'],
-    'pressure': latest_data['pressure'],
-    'windspeedKmph': latest_data['wind_speed'] * 3.6,
-    'cloudcover': latest_data['cloud_cover'],
-    'precipMM': 0
-})
-
-# Predict
-forecast = model.predict(future)
-
-print("\n⚡ Thunderstorm Predictions (Next 6 Hours):")
-print("-" * 80)
-
-prediction_rows = []
-
-for _, row in forecast.iterrows():
-    probability = max(0, min(100, row['yhat'] * 100))
-    time_label = row['ds'].strftime('%I:%M %p')
-
-    status = (
+from storage import get_store
+from data_collection import DEFAULT_LOCATION
+from feature_engineering import PIPELINE, weather_records_to_frame
+from model_artifact import MODELS_DIR, load_current
+from metrics import PREDICT_SECONDS
+
+def load_engine(models_dir=MODELS_DIR):
+    """Load the current model artifact (any backend, see models.py)"""
+    return load_current(models_dir)
+
+def build_future(history, periods=6, start=None):
+    """Model input for the next `periods` hours
+    
+    `history` is a list of weather_data rows, newest first. The latest reading
+    is carried forward as the regressor values, and the raw rows run through
+    the same feature pipeline used for training so lag/rolling features see
+    the real preceding hours. Returns the featured frame every backend scores.
+    """
+    latest = history[0]
+    future_dates = pd.date_range(
+        start=start or datetime.now(timezone.utc),
+        periods=periods,
+        freq='h'
+    )
+
+    past = weather_records_to_frame(history[::-1])
+    future = weather_records_to_frame([{**latest, 'timestamp': ts.isoformat()} for ts in future_dates])
+
+    return PIPELINE.transform_tail(past.tail(PIPELINE.lookback), future)
+
+def to_probability(p):
+    """Model probability (0..1) as a clamped 0-100% value"""
+    return max(0, min(100, p * 100))
+
+def risk_status(probability):
+    return (
         "🔴 HIGH RISK" if probability > 70 else
         "🟡 MODERATE RISK" if probability > 40 else
         "🟢 LOW RISK"
     )
 
-    print(f"{time_label}: {probability:.1f}% {status}")
+def prediction_rows_for(times, probabilities, location, model_version):
+    """Turn forecast times and model probabilities into rows for the predictions table"""
+    prediction_time = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            'prediction_time': prediction_time,
+            'forecast_time': pd.Timestamp(ds).tz_localize('UTC').isoformat(),
+            'thunderstorm_probability': float(to_probability(p)),
+            'location': location,
+            'model_version': model_version
+        }
+        for ds, p in zip(times, probabilities)
+    ]
+
+def main(location=DEFAULT_LOCATION['city']):
+    store = get_store()
+    engine = load_engine()
+
+    print("🔮 ThunderCast Prediction System")
+    print("=" * 80)
+
+    # Fetch latest weather data (plus enough history for lag/rolling features) of this location only
+    weather_rows = store.fetch('weather_data', order_by='timestamp', desc=True, limit=PIPELINE.lookback + 1,
+                               location=location)
+
+    if not weather_rows:
+        print(f"❌ No weather data available for {location}. Run data_collection.py first!")
+        return None
+
+    latest_data = weather_rows[0]
+
+    print("\n📊 Current Weather Conditions:")
+    for k in ['timestamp', 'temperature', 'humidity', 'pressure', 'wind_speed', 'cloud_cover']:
+        print(f"{k.capitalize()}: {latest_data[k]}")
+
+    # Prepare future dataframe (next 6 hours)
+    future = build_future(weather_rows, periods=6)
+
+    # Predict
+    with PREDICT_SECONDS.labels('cli').time():
+        probabilities = engine.predict_proba(future)
+
+    print("\n⚡ Thunderstorm Predictions (Next 6 Hours):")
+    print("-" * 80)
+
+    for ds, p in zip(future['date_time'], probabilities):
+        probability = to_probability(p)
+        time_label = ds.strftime('%I:%M %p')
+        print(f"{time_label}: {probability:.1f}% {risk_status(probability)}")
+
+    prediction_rows = prediction_rows_for(future['date_time'], probabilities, latest_data['location'],
+                                          engine.model_version)
 
-    prediction_rows.append({
-        'prediction_time': datetime.now(timezone.utc).isoformat(),
-        'forecast_time': row['ds'].isoformat(),
-        'thunderstorm_probability': float(probability),
-        'location': latest_data['location'],
-        'model_version': 'prophet_v1'
-    })
+    # 🔥 Batch insert (FAST + SAFE)
+    store.insert('predictions', prediction_rows)
 
-# 🔥 Batch insert (FAST + SAFE)
-supabase.table('predictions').insert(prediction_rows).execute()
+    print("\n✅ Predictions saved to database!")
+    print("=" * 80)
+    return prediction_rows
 
-print("\n✅ Predictions saved to database!")
-print("=" * 80)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Long-lived prediction service: warm model, micro-batched predicts, LRU cache
+
+    python src/prediction_service.py 8000
+    curl 'http://127.0.0.1:8000/forecast?location=Pimpri-Chinchwad&horizon=24'
+    curl 'http://127.0.0.1:8000/forecast?location=X&horizon=6&tempC=31&humidity=82&pressure=1004&windspeedKmph=12&cloudcover=90&precipMM=3'
+    curl 'http://127.0.0.1:8000/metrics'        # Prometheus text; /metrics.json for JSON
+
+The model is loaded at startup and swapped for the new one when retraining
+publishes another version to current.json (checked at most every
+MODEL_CHECK_SECONDS). Concurrent requests that arrive within BATCH_WINDOW
+seconds are coalesced into a single vectorized predict call, and responses
+are cached by (model version, location, horizon, forecast hour, regressor
+values).
+A location's latest readings are kept for HISTORY_TTL seconds, so repeated
+requests are answered without a store query. A new reading is picked up at
+most HISTORY_TTL seconds after it was saved.
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import PIPELINE, REGRESSORS
+from model_artifact import MODELS_DIR, current_version, load_artifact
+from prediction import build_future, risk_status, to_probability
+from storage import get_store
+from metrics import CACHE_REQUESTS, PREDICT_SECONDS, metrics_response
+
+BATCH_WINDOW = 0.005   # seconds to wait for more requests before predicting
+MAX_BATCH = 256        # requests per predict call
+CACHE_SIZE = 4096
+MAX_HORIZON = 168
+HISTORY_TTL = 60       # seconds a location's readings are reused before the store is queried again
+MODEL_CHECK_SECONDS = 5  # how often current.json is checked for a newly published model
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache, entries optionally expiring after ttl seconds"""
+
+    def __init__(self, maxsize=CACHE_SIZE, name='forecast', ttl=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+                self.data.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.labels(self.name, 'hit').inc()
+                return entry[1]
+            self.misses += 1
+            CACHE_REQUESTS.labels(self.name, 'miss').inc()
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl if self.ttl is not None else None, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+
+class MicroBatcher:
+    """Coalesces concurrently submitted frames into one predict call per model"""
+
+    def __init__(self, predict_batch, max_wait=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.predict_batch = predict_batch
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.requests = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, columns, engine):
+        """Queue a dict of equal-length featured column arrays for engine, returns a Future of probabilities"""
+        future = Future()
+        self.queue.put((columns, engine, future))
+        return future
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Requests queued around a model swap are scored by the model they were keyed with
+            groups = {}
+            for columns, engine, future in self._collect():
+                groups.setdefault(id(engine), (engine, []))[1].append((columns, future))
+            for engine, batch in groups.values():
+                self._predict(engine, batch)
+
+    def _predict(self, engine, batch):
+        frames = [columns for columns, _ in batch]
+        try:
+            combined = {k: np.concatenate([f[k] for f in frames]) for k in frames[0]}
+            probabilities = self.predict_batch(engine, combined)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        offset = 0
+        for columns, future in batch:
+            n = len(columns['date_time'])
+            future.set_result(probabilities[offset:offset + n])
+            offset += n
+
+
+class PredictionService:
+    """Serves thunderstorm forecasts for arbitrary locations and horizons"""
+
+    def __init__(self, engine=None, store=None, models_dir=MODELS_DIR):
+        # A model passed in is served as is; otherwise follow current.json in models_dir
+        self.models_dir = None if engine is not None else models_dir
+        self.engine = engine
+        self.model_load_time = 0.0
+        self._engine_lock = threading.Lock()
+        self._next_model_check = 0.0
+        self.current_engine()
+        self.store = store
+        self.cache = LRUCache()
+        self.histories = LRUCache(name='history', ttl=HISTORY_TTL)
+        self.batcher = MicroBatcher(self._predict_batch)
+
+    def current_engine(self):
+        """The model current.json names, reloaded when retraining publishes a new version"""
+        if self.models_dir is None or time.monotonic() < self._next_model_check:
+            return self.engine
+        with self._engine_lock:
+            if time.monotonic() >= self._next_model_check:
+                version = current_version(self.models_dir)
+                if self.engine is None or self.engine.model_version != version:
+                    try:
+                        load_start = time.perf_counter()
+                        self.engine = load_artifact(os.path.join(self.models_dir, version))
+                        self.model_load_time = time.perf_counter() - load_start
+                        print(f"✅ Loaded model {version}")
+                    except Exception:
+                        if self.engine is None:
+                            raise
+                        print(f"⚠️ Couldn't load model {version}, still serving {self.engine.model_version}")
+                self._next_model_check = time.monotonic() + MODEL_CHECK_SECONDS
+        return self.engine
+
+    def _predict_batch(self, engine, columns):
+        with PREDICT_SECONDS.labels('service').time():
+            return engine.predict_proba(columns)
+
+    def _history(self, location):
+        """Newest-first readings of a location, queried at most once per HISTORY_TTL"""
+        rows = self.histories.get(location)
+        if rows is not None:
+            return rows
+        store = self.store or get_store()
+        rows = store.fetch('weather_data', order_by='timestamp', desc=True,
+                           limit=PIPELINE.lookback + 1, location=location)
+        if not rows:
+            raise LookupError(f"No weather data for location {location!r}")
+        self.histories.put(location, rows)
+        return rows
+
+    def build_frame(self, location, horizon, start, regressors=None, history=None):
+        """Featured column arrays for one request, from explicit regressors or the latest observations"""
+        if regressors is None:
+            frame = build_future(history or self._history(location), periods=horizon, start=start)
+            return {c: frame[c].to_numpy() for c in frame.columns}
+        raw = {'date_time': pd.date_range(start=start, periods=horizon, freq='h').tz_convert(None).to_numpy()}
+        for col in REGRESSORS:
+            raw[col] = np.full(horizon, float(regressors[col]))
+        return PIPELINE.transform_arrays(raw)
+
+    def forecast(self, location, horizon=6, regressors=None):
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f"horizon must be between 1 and {MAX_HORIZON}")
+        start = pd.Timestamp.now(tz='UTC').floor('h')
+        engine = self.current_engine()
+
+        history = None
+        if regressors is not None:
+            key = (engine.model_version, location, horizon, start,
+                   tuple(round(float(regressors[c]), 2) for c in REGRESSORS))
+        else:
+            history = self._history(location)
+            key = (engine.model_version, location, horizon, start, history[0]['timestamp'])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        frame = self.build_frame(location, horizon, start, regressors, history)
+        probabilities = self.batcher.submit(frame, engine).result()
+
+        result = {
+            'location': location,
+            'horizon': horizon,
+            'model_version': engine.model_version,
+            'forecast': [
+                {
+                    'forecast_time': pd.Timestamp(ds).tz_localize('UTC').isoformat(),
+                    'thunderstorm_probability': round(float(to_probability(p)), 2),
+                    'risk': risk_status(to_probability(p)),
+                }
+                for ds, p in zip(frame['date_time'], probabilities)
+            ],
+        }
+        self.cache.put(key, result)
+        return result
+
+    def stats(self):
+        return {
+            'model_version': self.current_engine().model_version,
+            'model_load_seconds': round(self.model_load_time, 3),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'history_hits': self.histories.hits,
+            'history_misses': self.histories.misses,
+            'batches': self.batcher.batches,
+            'batched_requests': self.batcher.requests,
+        }
+
+
+def make_handler(service):
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            if url.path == '/health':
+                self._send(200, {'status': 'ok'})
+                return
+            if url.path == '/stats':
+                self._send(200, service.stats())
+                return
+            metrics = metrics_response(url.path)
+            if metrics is not None:
+                content_type, body = metrics
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if url.path != '/forecast':
+                self._send(404, {'error': 'not found'})
+                return
+
+            try:
+                location = query['location']
+                horizon = int(query.get('horizon', 6))
+                regressors = None
+                if any(c in query for c in REGRESSORS):
+                    regressors = {c: float(query[c]) for c in REGRESSORS}
+            except KeyError as e:
+                self._send(400, {'error': f"missing parameter {e}"})
+                return
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+
+            try:
+                self._send(200, service.forecast(location, horizon, regressors))
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+            except LookupError as e:
+                self._send(404, {'error': str(e)})
+            except Exception as e:
+                # A store or model failure must still answer, not drop the connection
+                print(f"❌ Forecast for {location!r} failed: {e!r}")
+                self._send(500, {'error': 'internal error'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ForecastHandler
+
+
+def serve(port=8000, service=None):
+    """Load the model once and serve forecasts until interrupted"""
+    service = service or PredictionService()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(service))
+    print(f"🔮 ThunderCast prediction service on http://127.0.0.1:{port} "
+          f"(model loaded in {service.model_load_time:.2f}s)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
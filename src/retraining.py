@@ -0,0 +1,163 @@
+"""Scheduled sliding-window retraining with warm-started optimization
+
+Each run refits the model on the most recent RETRAIN_WINDOW_DAYS of the
+featured dataset, extended with every reading collected into the store since
+the archive ends (read page by page, so the hosted API's row cap doesn't cut
+it short). Those are labelled with the same rule as the archive
+(data_cleaning.add_thunderstorm_label), so readings stored before
+precipitation was collected are left out.
+
+For Prophet, the optimizer starts from the current model's fitted parameters
+instead of Prophet's default init, so it converges in far fewer iterations;
+the logistic backend just refits in seconds. The new artifact is saved next
+to the old ones and current.json is swapped atomically, so prediction.py
+picks it up on its next run. Fit time and optimizer iterations are appended
+to retrain_log.jsonl in the models directory.
+
+    python src/retraining.py [--compare-cold] [--backend logistic] [--archive-only]
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data_cleaning import add_thunderstorm_label
+from data_collection import DEFAULT_LOCATION
+from feature_engineering import FEATURED_PATH, PIPELINE, REGRESSORS, weather_records_to_frame
+from model_artifact import MODELS_DIR, CURRENT_FILE, load_current
+from model_training import fit_model, save_model, tuned_config
+from models import BACKENDS, DEFAULT_BACKEND
+from storage import fetch_pages, get_store
+
+RETRAIN_WINDOW_DAYS = int(os.getenv("RETRAIN_WINDOW_DAYS", "730"))
+RETRAIN_LOG = 'retrain_log.jsonl'
+
+ITERATION_LINE = re.compile(r'^\s*(\d+)\s+-?[\d.]+(e[-+]?\d+)?\s')
+
+
+WINDOW_COLUMNS = ['date_time', 'thunderstorm'] + REGRESSORS + PIPELINE.feature_names
+
+
+def load_live_rows(store, location, since=None):
+    """Featured, labelled rows built from the readings collected into the store after `since`
+
+    Readings are placed on the archive's hourly grid (the last reading of each
+    hour wins) before the lag and rolling features are computed.
+    """
+    records = [r for rows in fetch_pages(store, 'weather_data', 'timestamp', since=since, location=location)
+               for r in rows if r.get('precipitation') is not None]
+    if not records:
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
+    clean = weather_records_to_frame(records)
+    clean['date_time'] = clean['date_time'].dt.floor('h')
+    clean = add_thunderstorm_label(clean.drop_duplicates('date_time', keep='last').reset_index(drop=True))
+    return PIPELINE.transform(clean).dropna()[WINDOW_COLUMNS].reset_index(drop=True)
+
+
+def load_window(featured_path=FEATURED_PATH, window_days=RETRAIN_WINDOW_DAYS, store=None,
+                location=DEFAULT_LOCATION['city']):
+    """The last `window_days` of the featured dataset plus, given a store, the live readings after it"""
+    df = pd.read_csv(featured_path, usecols=WINDOW_COLUMNS)
+    df['date_time'] = pd.to_datetime(df['date_time'])
+    if store is not None:
+        live = load_live_rows(store, location, since=df['date_time'].max())
+        if len(live):
+            print(f"📥 {len(live)} live hours of {location} added from the store")
+            df = pd.concat([df, live], ignore_index=True)
+    cutoff = df['date_time'].max() - pd.Timedelta(days=window_days)
+    return df[df['date_time'] > cutoff].reset_index(drop=True)
+
+
+def warm_start_params(previous):
+    """Stan init values taken from a previously fitted Prophet model"""
+    engine = previous.engine
+    return {
+        'k': engine.k,
+        'm': engine.m,
+        'sigma_obs': engine.sigma_obs,
+        'delta': engine.deltas,
+        'beta': engine.beta,
+    }
+
+
+def optimizer_iterations(model):
+    """Iterations the optimizer ran for the last fit (Stan's parsed from its console output)"""
+    if model.model_type != 'prophet':
+        return getattr(model, 'iterations', None)
+    try:
+        stdout_file = model.prophet.stan_backend.stan_fit.runset.stdout_files[0]
+        with open(stdout_file) as f:
+            iterations = [int(m.group(1)) for m in map(ITERATION_LINE.match, f) if m]
+        return iterations[-1] if iterations else None
+    except (AttributeError, IndexError, OSError):
+        return None
+
+
+def _log(models_dir, entry):
+    with open(os.path.join(models_dir, RETRAIN_LOG), 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def retrain(featured_path=FEATURED_PATH, models_dir=MODELS_DIR, window_days=RETRAIN_WINDOW_DAYS,
+            config=None, compare_cold=False, backend=DEFAULT_BACKEND, store=None, live=True):
+    """Refit on the recent window, warm-started from the current Prophet model, and publish it"""
+    print(f"🔁 Retraining the {backend} model on the last {window_days} days...")
+    featured = load_window(featured_path, window_days, (store or get_store()) if live else None)
+    config = config or tuned_config(backend, models_dir)
+
+    previous = None
+    if os.path.exists(os.path.join(models_dir, CURRENT_FILE)):
+        previous = load_current(models_dir)
+
+    warm = backend == 'prophet' and previous is not None and previous.model_type == 'prophet'
+    init = warm_start_params(previous) if warm else None
+    try:
+        fit_kwargs = {'init': init} if init else {}
+        model, fit_seconds = fit_model(featured, config, backend, **fit_kwargs)
+    except Exception as e:
+        # Parameter shapes change if the config or changepoint count changed
+        print(f"⚠️ Warm start failed ({e}), falling back to a cold fit")
+        init = None
+        model, fit_seconds = fit_model(featured, config, backend)
+    iterations = optimizer_iterations(model)
+
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'window_days': window_days,
+        'backend': backend,
+        'rows': len(featured),
+        'warm_start_from': previous.model_version if init else None,
+        'fit_seconds': round(fit_seconds, 3),
+        'iterations': iterations,
+    }
+
+    if compare_cold:
+        cold_model, cold_seconds = fit_model(featured, config, backend)
+        entry['cold_fit_seconds'] = round(cold_seconds, 3)
+        entry['cold_iterations'] = optimizer_iterations(cold_model)
+
+    model_version, model_path = save_model(
+        model, featured, models_dir,
+        window_days=window_days, warm_start_from=entry['warm_start_from'],
+        fit_seconds=entry['fit_seconds'], iterations=iterations,
+    )
+    entry['model_version'] = model_version
+    _log(models_dir, entry)
+
+    start_label = "warm" if init else "cold"
+    print(f"✅ Model {model_version} published ({start_label} fit: {fit_seconds:.1f}s, {iterations} iterations)")
+    if compare_cold:
+        print(f"   Cold fit for comparison: {entry['cold_fit_seconds']:.1f}s, {entry['cold_iterations']} iterations")
+    return entry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refit the model on the recent window and publish it")
+    parser.add_argument('--compare-cold', action='store_true', help="also time a cold fit for comparison")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument('--archive-only', action='store_true', help="train on the featured archive alone")
+    args = parser.parse_args()
+    retrain(compare_cold=args.compare_cold, backend=args.backend, live=not args.archive_only)
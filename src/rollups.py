@@ -0,0 +1,223 @@
+"""Incrementally maintained hourly/daily/monthly weather rollups
+
+Each (grain, location, bucket) row of weather_rollups holds the reading
+count, thunderstorm count and, for every metric, the count of readings that
+have it plus their sum, sum of squares, min and max. Those all merge by
+addition or min/max, so a batch of new readings is rolled up on its own and
+upserted into the existing buckets, and summaries over any range cost one
+row per bucket instead of one per reading.
+
+Live readings carry no label; they are counted as thunderstorms by the same
+rule that labels the archive (data_cleaning.add_thunderstorm_label), which
+treats a reading without precipitation as no storm.
+
+    python src/rollups.py --backfill [clean.csv] [location]   # historical archive
+    python src/rollups.py --rebuild                           # from weather_data
+"""
+import numpy as np
+import pandas as pd
+import sys
+import time
+from storage import fetch_pages, get_store, ROLLUP_METRICS, ROLLUP_GRAINS
+from data_cleaning import CLEAN_PATH, CHUNK_SIZE, add_thunderstorm_label
+
+# Bucket start for each grain
+GRAIN_FREQ = {'hour': 'h', 'day': 'D', 'month': 'M'}
+
+# Cleaned archive (pune_clean.csv) columns -> weather_data names and unit factors
+CLEAN_COLUMNS = {
+    'temperature': ('tempC', 1.0),
+    'humidity': ('humidity', 1.0),
+    'pressure': ('pressure', 1.0),
+    'wind_speed': ('windspeedKmph', 1 / 3.6),  # km/h -> m/s like the live feed
+    'cloud_cover': ('cloudcover', 1.0),
+}
+
+BACKFILL_LOCATION = 'Pune'
+
+
+def bucket_start(times, grain):
+    """Floor timestamps to the start of their hour/day/month bucket"""
+    if grain == 'month':
+        return times.dt.to_period('M').dt.start_time
+    return times.dt.floor(GRAIN_FREQ[grain])
+
+
+def naive_utc(value):
+    """Timestamp without offset; values with one are converted to UTC first"""
+    ts = pd.Timestamp(value)
+    return ts.tz_convert(None) if ts.tz is not None else ts
+
+
+def live_thunderstorms(df):
+    """0/1 thunderstorm labels for weather_data readings, 0 where precipitation is missing"""
+    if 'precipitation' not in df:
+        return 0
+    clean = pd.DataFrame({'precipMM': df['precipitation'].to_numpy(dtype='float64'),
+                          'humidity': df['humidity'].to_numpy(dtype='float64'),
+                          'pressure': df['pressure'].to_numpy(dtype='float64')})
+    return add_thunderstorm_label(clean)['thunderstorm'].to_numpy()
+
+
+def rollup_frame(df, grains=ROLLUP_GRAINS):
+    """Partial rollup rows for a frame of weather_data-shaped readings
+
+    Needs 'timestamp', 'location' and the ROLLUP_METRICS columns. A
+    'thunderstorm' 0/1 column is counted when present; otherwise readings with
+    'precipitation' are labelled from it (see live_thunderstorms). Timestamps
+    with an offset are converted to naive UTC, which is how naive timestamps
+    are stored by the database.
+    """
+    if len(df) == 0:
+        return []
+    times = pd.to_datetime(df['timestamp'], format='ISO8601')
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert(None)
+
+    work = pd.DataFrame({
+        'location': df['location'].fillna('').to_numpy(),
+        'thunderstorm': df['thunderstorm'].to_numpy() if 'thunderstorm' in df else live_thunderstorms(df),
+    })
+    spec = {'count': ('thunderstorm', 'size'), 'thunderstorms': ('thunderstorm', 'sum')}
+    for m in ROLLUP_METRICS:
+        values = df[m].to_numpy(dtype='float64')
+        work[m] = values
+        work[f'{m}_sq'] = values * values
+        spec[f'{m}_count'] = (m, 'count')
+        spec[f'{m}_sum'] = (m, 'sum')
+        spec[f'{m}_sumsq'] = (f'{m}_sq', 'sum')
+        spec[f'{m}_min'] = (m, 'min')
+        spec[f'{m}_max'] = (m, 'max')
+
+    rows = []
+    for grain in grains:
+        work['bucket'] = bucket_start(times, grain).to_numpy()
+        rolled = work.groupby(['location', 'bucket'], sort=False).agg(**spec).reset_index()
+        # Only the aggregated buckets get formatted, and NaN (all-missing metric) becomes NULL
+        columns = {'grain': [grain] * len(rolled),
+                   'location': rolled['location'].tolist(),
+                   'bucket': np.datetime_as_string(rolled['bucket'].to_numpy(), unit='s').tolist()}
+        for c in rolled.columns[2:]:
+            values = rolled[c]
+            columns[c] = values.tolist() if not values.isna().any() else \
+                values.astype(object).where(values.notna(), None).tolist()
+        rows.extend(dict(zip(columns, values)) for values in zip(*columns.values()))
+    return rows
+
+
+def rollup_rows(records):
+    """Partial rollup rows for a list of weather_data records"""
+    return rollup_frame(pd.DataFrame(records))
+
+
+def update_rollups(records, store=None):
+    """Fold freshly inserted weather_data records into the rollup tables"""
+    store = store or get_store()
+    if isinstance(records, dict):
+        records = [records]
+    store.upsert_rollups(rollup_rows(records))
+
+
+def clean_to_readings(df, location=BACKFILL_LOCATION):
+    """Map cleaned archive rows to weather_data-shaped readings with their label"""
+    out = pd.DataFrame({'timestamp': df['date_time'], 'location': location})
+    for name, (src, factor) in CLEAN_COLUMNS.items():
+        out[name] = df[src].astype('float64') * factor
+    out['thunderstorm'] = df['thunderstorm'].to_numpy()
+    return out
+
+
+def backfill_rollups(clean_path=CLEAN_PATH, location=BACKFILL_LOCATION, store=None, chunksize=CHUNK_SIZE):
+    """Replace a location's rollups with ones built from the cleaned archive CSV"""
+    store = store or get_store()
+    print(f"📦 Backfilling rollups for {location} from {clean_path}...")
+    start = time.perf_counter()
+    store.clear_rollups(location)
+
+    usecols = ['date_time', 'thunderstorm'] + [src for src, _ in CLEAN_COLUMNS.values()]
+    total = 0
+    for chunk in pd.read_csv(clean_path, usecols=usecols, chunksize=chunksize):
+        # Buckets split across chunks are merged by the upsert
+        store.upsert_rollups(rollup_frame(clean_to_readings(chunk, location)))
+        total += len(chunk)
+    print(f"✅ {total:,} readings rolled up in {time.perf_counter() - start:.1f}s")
+    return total
+
+
+def rebuild_rollups(store=None, batch_rows=CHUNK_SIZE // 10):
+    """Recompute every rollup from weather_data, e.g. for rows collected before rollups existed
+
+    weather_data is read page by page in id order (so the hosted API's row
+    cap never truncates it, however many locations share a day) and rolled
+    up once per batch_rows readings.
+    """
+    store = store or get_store()
+    store.clear_rollups()
+    print("📦 Rebuilding rollups from weather_data...")
+    start = time.perf_counter()
+    columns = 'id,timestamp,location,precipitation,' + ','.join(ROLLUP_METRICS)
+    total, pending = 0, []
+    for rows in fetch_pages(store, 'weather_data', 'id', columns=columns):
+        pending.extend(rows)
+        if len(pending) >= batch_rows:
+            store.upsert_rollups(rollup_frame(pd.DataFrame(pending)))
+            total, pending = total + len(pending), []
+    if pending:
+        store.upsert_rollups(rollup_frame(pd.DataFrame(pending)))
+        total += len(pending)
+    if not total:
+        print("⚠️ weather_data is empty, nothing to roll up")
+        return 0
+    print(f"✅ {total:,} readings rolled up in {time.perf_counter() - start:.1f}s")
+    return total
+
+
+def grain_for(hours):
+    """Coarsest grain that still gives a summary over `hours` a few dozen buckets"""
+    if hours is not None and hours <= 168:
+        return 'hour'
+    if hours is not None and hours <= 8760:
+        return 'day'
+    return 'month'
+
+
+def load_rollups(grain, since=None, until=None, location=None, store=None):
+    """Rollup rows as a frame with a parsed 'bucket' column"""
+    store = store or get_store()
+    if since is not None:
+        since = bucket_start(pd.Series([naive_utc(since)]), grain)[0].isoformat()
+    df = pd.DataFrame(store.fetch_rollups(grain, since=since, until=until, location=location))
+    if not df.empty:
+        df['bucket'] = pd.to_datetime(df['bucket'])
+    return df
+
+
+def summarize(rollups, metrics=ROLLUP_METRICS):
+    """Combine rollup rows into count, mean, std, min and max per metric
+
+    Sums skip missing values, so each metric is averaged over its own count.
+    """
+    summary = {'count': int(rollups['count'].sum()), 'thunderstorms': int(rollups['thunderstorms'].sum())}
+    for m in metrics:
+        n = rollups[f'{m}_count'].sum()
+        total, total_sq = rollups[f'{m}_sum'].sum(), rollups[f'{m}_sumsq'].sum()
+        mean = total / n if n else np.nan
+        var = (total_sq - total * mean) / (n - 1) if n > 1 else np.nan
+        summary[m] = {
+            'count': int(n),
+            'mean': mean,
+            'std': np.sqrt(max(var, 0.0)),
+            'min': rollups[f'{m}_min'].min(),
+            'max': rollups[f'{m}_max'].max(),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == '--backfill':
+        backfill_rollups(*args[1:3])
+    elif args and args[0] == '--rebuild':
+        rebuild_rollups()
+    else:
+        print(__doc__)
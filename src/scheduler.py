@@ -1,20 +1,72 @@
 from apscheduler.schedulers.blocking import BlockingScheduler
-from data_collection import fetch_weather_data
+from data_collection import DEFAULT_LOCATION, get_spool, load_locations, start_flusher
+from pipeline import build_pipeline
+from retraining import retrain, RETRAIN_WINDOW_DAYS
+import metrics
 import logging
+import os
+import sys
 
-logging.basicConfig(level=logging.INFO)
+# Sliding-window retraining cadence (warm-started from the current model)
+RETRAIN_INTERVAL_HOURS = int(os.getenv("RETRAIN_INTERVAL_HOURS", "24"))
 
-scheduler = BlockingScheduler()
+def retrain_job():
+    """Scheduled retrain; a failed fit keeps the current model in service"""
+    try:
+        retrain()
+    except Exception as e:
+        print(f"❌ Retraining failed, keeping current model: {e}")
 
-# Schedule to run every hour
-scheduler.add_job(fetch_weather_data, 'interval', hours=1)
+pipeline = None
 
-print("⏰ Weather data collection scheduler started!")
-print("Collecting data every 1 hour...")
-print("Press Ctrl+C to stop")
+def pipeline_job():
+    """Hourly collect -> features -> predict -> report/export run"""
+    try:
+        pipeline.run()
+    except Exception as e:
+        print(f"❌ Pipeline run failed: {e}")
 
-# Run immediately on start
-fetch_weather_data()
+def main(locations=None):
+    """Run the hourly pipeline and periodic retraining until interrupted"""
+    global pipeline
+    logging.basicConfig(level=logging.INFO)
+    locations = locations or [DEFAULT_LOCATION]
 
-# Start scheduler
-scheduler.start()
\ No newline at end of file
+    # One long-lived pipeline: store, HTTP session, history and model stay warm between runs
+    pipeline = build_pipeline(locations)
+
+    scheduler = BlockingScheduler()
+
+    # Schedule to run every hour
+    scheduler.add_job(pipeline_job, 'interval', hours=1, max_instances=1, coalesce=True)
+
+    # Refit on recent history and swap the artifact in atomically
+    scheduler.add_job(retrain_job, 'interval', hours=RETRAIN_INTERVAL_HOURS, max_instances=1, coalesce=True)
+
+    print("⏰ Weather data collection scheduler started!")
+    print(f"Running the pipeline for {len(locations)} location(s) every 1 hour...")
+    print(f"Retraining on the last {RETRAIN_WINDOW_DAYS} days every {RETRAIN_INTERVAL_HOURS} hours...")
+    print("Press Ctrl+C to stop")
+
+    # Drain the spool to the store in the background (retries with backoff while it's down)
+    flusher = start_flusher()
+
+    # /metrics (Prometheus) and /metrics.json on METRICS_PORT, default 9108
+    spool = get_spool()
+    metrics.gauge('thundercast_spool_pending', "Readings waiting in the spool", spool.pending)
+    metrics.gauge('thundercast_spool_oldest_age_seconds', "Age of the oldest spooled reading", spool.oldest_age)
+    metrics.gauge('thundercast_flusher_failures', "Failed spool flush attempts since start", lambda: flusher.failures)
+    metrics.serve()
+
+    # Run immediately on start
+    pipeline_job()
+
+    # Start scheduler
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        flusher.stop()
+
+if __name__ == "__main__":
+    # python src/scheduler.py [locations.json]
+    main(load_locations(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,172 @@
+"""Durable write-ahead spool between the collector and the store
+
+Every reading is committed to a local SQLite (WAL, synchronous=FULL) spool
+before anything touches the network, so a store outage or a crash never
+loses it. A flusher drains the spool in large batches with exponential
+backoff while the store is failing. Each record carries an ingest_key
+(location|timestamp) and the store skips keys it already has, so replaying
+a batch after a crash between "stored" and "acknowledged" is harmless.
+The insert and the rollup update are one atomic step (store.ingest_readings:
+a single SQLite transaction, or a rolled_up flag set with the Postgres merge),
+so rollups stay exact under replay too.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from rollups import rollup_rows
+
+SPOOL_PATH = os.getenv("THUNDERCAST_SPOOL", 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/spool.db')
+
+FLUSH_BATCH = 500        # records per store call
+FLUSH_INTERVAL = 5.0     # seconds between drains when the spool is idle
+MAX_BACKOFF = 300.0      # seconds, cap for retry delay while the store is down
+
+SPOOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    ingest_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL
+);
+"""
+
+
+def ingest_key(record):
+    """Idempotency key of a weather reading"""
+    return f"{record['location']}|{record['timestamp']}"
+
+
+class Spool:
+    """Append-only local queue of records waiting for the store"""
+
+    def __init__(self, path=SPOOL_PATH):
+        if path == ':memory:':
+            # Each thread opens its own connection; an in-memory spool would also not survive a crash
+            raise ValueError("Spool needs a database file, not ':memory:'")
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().executescript(SPOOL_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')  # a committed append survives power loss
+            self._local.conn = conn
+        return conn
+
+    def append(self, table, records):
+        """Durably queue records (stamping their ingest_key), returns how many were new"""
+        if isinstance(records, dict):
+            records = [records]
+        now = time.time()
+        rows = []
+        for record in records:
+            record.setdefault('ingest_key', ingest_key(record))
+            rows.append((table, record['ingest_key'], json.dumps(record), now))
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO spool (table_name, ingest_key, payload, enqueued_at) "
+                             "VALUES (?, ?, ?, ?)", rows)
+            return conn.total_changes - before
+
+    def peek(self, limit=FLUSH_BATCH):
+        """Oldest queued records as (seq, table, record)"""
+        rows = self._connect().execute(
+            "SELECT seq, table_name, payload FROM spool ORDER BY seq LIMIT ?", [limit])
+        return [(seq, table, json.loads(payload)) for seq, table, payload in rows]
+
+    def ack(self, seqs):
+        """Drop records the store has confirmed"""
+        conn = self._connect()
+        with conn:
+            conn.executemany("DELETE FROM spool WHERE seq = ?", [(s,) for s in seqs])
+
+    def pending(self):
+        return self._connect().execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+
+    def oldest_age(self):
+        """Seconds the oldest queued record has been waiting (0 when empty)"""
+        row = self._connect().execute("SELECT MIN(enqueued_at) FROM spool").fetchone()
+        return time.time() - row[0] if row[0] is not None else 0.0
+
+
+def flush_once(spool, store, batch_size=FLUSH_BATCH):
+    """Push one batch to the store and acknowledge it, returns records flushed"""
+    batch = spool.peek(batch_size)
+    if not batch:
+        return 0
+    by_table = {}
+    for seq, table, record in batch:
+        by_table.setdefault(table, []).append(record)
+    for table, records in by_table.items():
+        if table == 'weather_data':
+            store.ingest_readings(records, rollup_rows)
+        else:
+            store.upsert(table, records, 'ingest_key')
+    spool.ack([seq for seq, _, _ in batch])
+    return len(batch)
+
+
+def drain(spool, store, batch_size=FLUSH_BATCH):
+    """Flush until the spool is empty; raises on the first store error (records stay queued)"""
+    total = 0
+    while True:
+        flushed = flush_once(spool, store, batch_size)
+        total += flushed
+        if flushed < batch_size:
+            return total
+
+
+class Flusher(threading.Thread):
+    """Background thread that keeps draining the spool, backing off while the store fails"""
+
+    def __init__(self, spool, store, batch_size=FLUSH_BATCH, interval=FLUSH_INTERVAL, max_backoff=MAX_BACKOFF):
+        super().__init__(name='spool-flusher', daemon=True)
+        self.spool = spool
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.flushed = 0
+        self.failures = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def notify(self):
+        """Flush now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def run(self):
+        delay = self.interval
+        while not self._stopping.is_set():
+            failing = False
+            try:
+                self.flushed += drain(self.spool, self.store, self.batch_size)
+                delay = self.interval
+            except Exception as e:
+                failing = True
+                self.failures += 1
+                delay = min(self.max_backoff, max(delay, self.interval) * 2) * random.uniform(0.8, 1.2)
+                print(f"⚠️ Store unavailable ({e}), {self.spool.pending()} readings spooled, "
+                      f"retrying in {delay:.0f}s")
+            # New readings wake an idle flusher, but don't cut a backoff short
+            (self._stopping if failing else self._wake).wait(delay)
+            self._wake.clear()
+
+    def stop(self, timeout=30):
+        """Stop the thread after one last drain attempt"""
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+        try:
+            self.flushed += drain(self.spool, self.store, self.batch_size)
+        except Exception as e:
+            print(f"⚠️ {self.spool.pending()} readings left in the spool ({e})")
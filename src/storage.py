@@ -0,0 +1,420 @@
+"""Storage backends for the weather_data and predictions tables
+
+Every pipeline module talks to the store through the same few calls:
+
+    store = get_store()
+    store.insert('weather_data', records)
+    new = store.upsert('weather_data', records, 'ingest_key')   # skips keys already stored
+    new = store.ingest_readings(records, rollup_rows)           # upsert + rollup merge, replay-safe
+    rows = store.fetch('weather_data', order_by='timestamp', limit=24)
+    new_rows = store.fetch('weather_data', order_by='id', desc=False, since=last_id, since_column='id')
+    for rows in fetch_pages(store, 'weather_data', 'id'): ...    # every row, a page per query
+    buckets = store.fetch_buckets('weather_data', ['temperature'], 86400, since=...)
+    store.upsert_rollups(rows); rollups = store.fetch_rollups('day', since=...)
+
+THUNDERCAST_STORE selects the backend: 'supabase' (default) or 'sqlite' for a
+local embedded database at THUNDERCAST_DB, which lets the whole pipeline run
+on-box without a network.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from dotenv import load_dotenv
+from metrics import STORE_WRITE_SECONDS, STORE_WRITE_ROWS
+
+load_dotenv()
+
+# Credentials come from the environment (or .env) only, never from the source tree
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+STORE_BACKEND = os.getenv("THUNDERCAST_STORE", "supabase")
+SQLITE_PATH = os.getenv("THUNDERCAST_DB", 'D:/Project-02-ThunderCast Smart Storm Prediction Engine/data/thundercast.db')
+
+# Rows per query when paging through a table; the hosted API returns at most
+# 1,000 rows per request by default, so one unpaged fetch can silently truncate
+FETCH_PAGE = 1000
+
+# Column used for time-range filters on each table
+TIME_COLUMNS = {
+    'weather_data': 'timestamp',
+    'predictions': 'forecast_time',
+}
+
+# Metrics kept in weather_rollups, each as {metric}_count/_sum/_sumsq/_min/_max
+# ({metric}_count counts the readings where the metric is present)
+ROLLUP_METRICS = ['temperature', 'humidity', 'pressure', 'wind_speed', 'cloud_cover']
+ROLLUP_GRAINS = ['hour', 'day', 'month']
+
+# Columns of the tables the pipeline writes, as SQLite declarations. The SQLite
+# tables and the export's column types (column_dtypes) are both built from these
+TABLE_COLUMNS = {
+    'weather_data': {
+        'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+        'timestamp': 'TEXT DEFAULT CURRENT_TIMESTAMP',
+        'temperature': 'REAL',
+        'humidity': 'REAL',
+        'pressure': 'REAL',
+        'wind_speed': 'REAL',
+        'cloud_cover': 'REAL',
+        'precipitation': 'REAL',
+        'location': 'TEXT',
+        'latitude': 'REAL',
+        'longitude': 'REAL',
+        'ingest_key': 'TEXT',
+    },
+    'predictions': {
+        'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+        'prediction_time': 'TEXT DEFAULT CURRENT_TIMESTAMP',
+        'forecast_time': 'TEXT',
+        'thunderstorm_probability': 'REAL',
+        'location': 'TEXT',
+        'model_version': 'TEXT',
+    },
+}
+
+SQLITE_DTYPES = {'INTEGER': 'int64', 'REAL': 'float64', 'TEXT': 'str'}
+
+
+def column_dtypes(table):
+    """pandas dtype of every column of a pipeline table, e.g. {'id': 'int64', 'temperature': 'float64', ...}"""
+    return {column: SQLITE_DTYPES[decl.split()[0]] for column, decl in TABLE_COLUMNS[table].items()}
+
+
+SQLITE_SCHEMA = "".join(
+    f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+    + ",\n    ".join(f"{column} {decl}" for column, decl in columns.items()) + "\n);\n"
+    for table, columns in TABLE_COLUMNS.items()
+) + """
+CREATE INDEX IF NOT EXISTS idx_weather_timestamp ON weather_data (timestamp);
+CREATE INDEX IF NOT EXISTS idx_weather_location ON weather_data (location, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_forecast_time ON predictions (forecast_time);
+CREATE INDEX IF NOT EXISTS idx_predictions_location ON predictions (location, forecast_time);
+
+CREATE TABLE IF NOT EXISTS weather_rollups (
+    grain TEXT NOT NULL,
+    location TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    thunderstorms INTEGER NOT NULL DEFAULT 0,
+    %s,
+    PRIMARY KEY (grain, location, bucket)
+);
+""" % ',\n    '.join(column for m in ROLLUP_METRICS for column in
+                     [f"{m}_count INTEGER NOT NULL DEFAULT 0"]
+                     + [f"{m}_{stat} REAL" for stat in ('sum', 'sumsq', 'min', 'max')])
+
+# Columns added after a table was first created, applied to existing databases as
+# (table, column, declaration, value for the existing rows or None)
+SQLITE_MIGRATIONS = [
+    ('weather_data', 'ingest_key', 'TEXT', None),
+    ('weather_data', 'precipitation', 'REAL', None),
+    # Older rollups counted readings only; every metric was assumed present
+    *[('weather_rollups', f'{m}_count', 'INTEGER NOT NULL DEFAULT 0', 'count') for m in ROLLUP_METRICS],
+]
+SQLITE_POST_MIGRATION = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_weather_ingest_key ON weather_data (ingest_key);
+"""
+
+# Merging a partial rollup into an existing bucket: counts and sums add, min/max combine
+ROLLUP_MERGE = ', '.join(
+    ['count = count + excluded.count', 'thunderstorms = thunderstorms + excluded.thunderstorms']
+    + [f"{m}_{stat} = {m}_{stat} + excluded.{m}_{stat}" for m in ROLLUP_METRICS for stat in ('count', 'sum', 'sumsq')]
+    + [f"{m}_{stat} = COALESCE({stat.upper()}({m}_{stat}, excluded.{m}_{stat}), {m}_{stat}, excluded.{m}_{stat})"
+       for m in ROLLUP_METRICS for stat in ('min', 'max')]
+)
+
+
+def _to_text(value):
+    """Normalize datetimes to ISO strings so they sort and compare as text"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class SupabaseStore:
+    """Store backed by the hosted Supabase (PostgreSQL) tables"""
+
+    def __init__(self, url=SUPABASE_URL, key=SUPABASE_KEY):
+        if not url or not key:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in the environment or .env "
+                               "(or set THUNDERCAST_STORE=sqlite for the local store)")
+        from supabase import create_client
+        self.client = create_client(url, key)
+
+    def insert(self, table, rows):
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return
+        rows = [{k: _to_text(v) for k, v in row.items()} for row in rows]
+        STORE_WRITE_ROWS.labels(table).observe(len(rows))
+        with STORE_WRITE_SECONDS.labels(table).time():
+            self.client.table(table).insert(rows).execute()
+
+    def upsert(self, table, rows, key):
+        # Needs a unique constraint on key; with ignore_duplicates only new rows come back
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return []
+        rows = [{k: _to_text(v) for k, v in row.items()} for row in rows]
+        STORE_WRITE_ROWS.labels(table).observe(len(rows))
+        with STORE_WRITE_SECONDS.labels(table).time():
+            return self.client.table(table).upsert(rows, on_conflict=key, ignore_duplicates=True).execute().data
+
+    def fetch(self, table, columns='*', order_by=None, desc=True, limit=None,
+              since=None, until=None, location=None, since_column=None):
+        query = self.client.table(table).select(columns)
+        time_column = TIME_COLUMNS[table]
+        if since is not None:
+            query = query.gt(since_column or time_column, _to_text(since))
+        if until is not None:
+            query = query.lte(time_column, _to_text(until))
+        if location is not None:
+            query = query.eq('location', location)
+        if order_by:
+            query = query.order(order_by, desc=desc)
+        if limit:
+            query = query.limit(limit)
+        return query.execute().data
+
+    def fetch_buckets(self, table, columns, bucket_seconds, since=None, until=None, location=None):
+        # Aggregation runs in Postgres through the weather_buckets() function (see README)
+        if table != 'weather_data':
+            raise ValueError("Server-side buckets are only available for weather_data")
+        rows = self.client.rpc('weather_buckets', {
+            'bucket_seconds': int(bucket_seconds),
+            'since': _to_text(since),
+            'until': _to_text(until),
+            'loc': location,
+        }).execute().data
+        keep = ['bucket', 'count'] + [f"{c}_{agg}" for c in columns for agg in ('min', 'mean', 'max')]
+        return [{k: row[k] for k in keep} for row in rows]
+
+    def upsert_rollups(self, rows):
+        # Merge-on-conflict runs in Postgres through merge_weather_rollups() (see README)
+        if rows:
+            self.client.rpc('merge_weather_rollups', {'rows': rows}).execute()
+
+    def ingest_readings(self, records, rollups_for):
+        """Upsert weather readings and merge every one not yet rolled up into the rollups
+
+        The REST API can't wrap both writes in one transaction, so rollups are
+        driven by weather_data.rolled_up instead of by what the upsert inserted:
+        merge_weather_rollups() merges and sets the flag in one Postgres
+        transaction. A batch replayed after a failed merge is rolled up then.
+        """
+        if not records:
+            return []
+        self.upsert('weather_data', records, 'ingest_key')
+        keys = [r['ingest_key'] for r in records]
+        pending = (self.client.table('weather_data').select('*')
+                   .in_('ingest_key', keys).eq('rolled_up', False).execute().data)
+        if pending:
+            self.client.rpc('merge_weather_rollups', {
+                'rows': rollups_for(pending),
+                'keys': [r['ingest_key'] for r in pending],
+            }).execute()
+        return pending
+
+    def fetch_rollups(self, grain, since=None, until=None, location=None):
+        query = self.client.table('weather_rollups').select('*').eq('grain', grain)
+        if since is not None:
+            query = query.gte('bucket', _to_text(since))
+        if until is not None:
+            query = query.lte('bucket', _to_text(until))
+        if location is not None:
+            query = query.eq('location', location)
+        return query.order('bucket').execute().data
+
+    def clear_rollups(self, location=None):
+        query = self.client.table('weather_rollups').delete()
+        query = query.eq('location', location) if location is not None else query.neq('grain', '')
+        query.execute()
+
+
+class SQLiteStore:
+    """Embedded on-box store with indexes on timestamp, forecast_time and location"""
+
+    def __init__(self, path=SQLITE_PATH):
+        if path == ':memory:':
+            # Each thread opens its own connection, and every connection would get an empty database
+            raise ValueError("SQLiteStore needs a database file, not ':memory:' (use a temporary file)")
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SQLITE_SCHEMA)
+        for table, column, decl, initial in SQLITE_MIGRATIONS:
+            if column not in {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                with conn:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+                    if initial is not None:
+                        conn.execute(f"UPDATE {table} SET {column} = {initial}")
+        conn.executescript(SQLITE_POST_MIGRATION)
+
+    def _connect(self):
+        # sqlite3 connections are bound to the thread that opened them
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def insert(self, table, rows):
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)})")
+        STORE_WRITE_ROWS.labels(table).observe(len(rows))
+        conn = self._connect()
+        with STORE_WRITE_SECONDS.labels(table).time(), conn:
+            conn.executemany(sql, [[_to_text(row.get(c)) for c in columns] for row in rows])
+
+    def upsert(self, table, rows, key):
+        """Insert rows whose key isn't stored yet, returns the rows actually inserted"""
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return []
+        STORE_WRITE_ROWS.labels(table).observe(len(rows))
+        conn = self._connect()
+        with STORE_WRITE_SECONDS.labels(table).time(), conn:
+            return self._insert_new(conn, table, rows, key)
+
+    def _insert_new(self, conn, table, rows, key):
+        columns = list(rows[0].keys())
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)}) "
+               f"ON CONFLICT ({key}) DO NOTHING RETURNING {key}")
+        return [row for row in rows if conn.execute(sql, [_to_text(row.get(c)) for c in columns]).fetchone()]
+
+    def ingest_readings(self, records, rollups_for):
+        """Upsert weather readings and merge the new ones into the rollups in one transaction
+
+        rollups_for(inserted records) returns the partial rollup rows. If either
+        write fails both roll back, so a replayed batch is inserted and rolled
+        up again together. Returns the records actually inserted.
+        """
+        if not records:
+            return []
+        STORE_WRITE_ROWS.labels('weather_data').observe(len(records))
+        conn = self._connect()
+        with STORE_WRITE_SECONDS.labels('weather_data').time(), conn:
+            inserted = self._insert_new(conn, 'weather_data', records, 'ingest_key')
+            if inserted:
+                self._merge_rollups(conn, rollups_for(inserted))
+        return inserted
+
+    def _where(self, table, since, until, location, since_column=None):
+        clauses, params = [], []
+        time_column = TIME_COLUMNS[table]
+        if since is not None:
+            clauses.append(f"{since_column or time_column} > ?")
+            params.append(_to_text(since))
+        if until is not None:
+            clauses.append(f"{time_column} <= ?")
+            params.append(_to_text(until))
+        if location is not None:
+            clauses.append("location = ?")
+            params.append(location)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def fetch(self, table, columns='*', order_by=None, desc=True, limit=None,
+              since=None, until=None, location=None, since_column=None):
+        where, params = self._where(table, since, until, location, since_column)
+        sql = f"SELECT {columns} FROM {table}{where}"
+        if order_by:
+            sql += f" ORDER BY {order_by} {'DESC' if desc else 'ASC'}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def fetch_buckets(self, table, columns, bucket_seconds, since=None, until=None, location=None):
+        """Per-bucket count and min/mean/max of each column, aggregated inside SQLite"""
+        b = int(bucket_seconds)
+        bucket = f"CAST(strftime('%s', {TIME_COLUMNS[table]}) AS INTEGER) / {b} * {b}"
+        aggregates = [f"MIN({c}) AS {c}_min, AVG({c}) AS {c}_mean, MAX({c}) AS {c}_max" for c in columns]
+        where, params = self._where(table, since, until, location)
+        sql = (f"SELECT datetime({bucket}, 'unixepoch') AS bucket, COUNT(*) AS count, "
+               f"{', '.join(aggregates)} FROM {table}{where} GROUP BY 1 ORDER BY 1")
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def upsert_rollups(self, rows):
+        """Add partial rollups into weather_rollups, creating buckets that don't exist yet"""
+        conn = self._connect()
+        with conn:
+            self._merge_rollups(conn, rows)
+
+    def _merge_rollups(self, conn, rows):
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        sql = (f"INSERT INTO weather_rollups ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)}) "
+               f"ON CONFLICT (grain, location, bucket) DO UPDATE SET {ROLLUP_MERGE}")
+        conn.executemany(sql, [[_to_text(row.get(c)) for c in columns] for row in rows])
+
+    def fetch_rollups(self, grain, since=None, until=None, location=None):
+        clauses, params = ["grain = ?"], [grain]
+        if since is not None:
+            clauses.append("bucket >= ?")
+            params.append(_to_text(since))
+        if until is not None:
+            clauses.append("bucket <= ?")
+            params.append(_to_text(until))
+        if location is not None:
+            clauses.append("location = ?")
+            params.append(location)
+        sql = f"SELECT * FROM weather_rollups WHERE {' AND '.join(clauses)} ORDER BY bucket"
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def clear_rollups(self, location=None):
+        conn = self._connect()
+        with conn:
+            if location is None:
+                conn.execute("DELETE FROM weather_rollups")
+            else:
+                conn.execute("DELETE FROM weather_rollups WHERE location = ?", [location])
+
+
+def fetch_pages(store, table, key, since=None, page_size=FETCH_PAGE, **filters):
+    """Yield every row after `since` in ascending `key` order, one page_size query at a time
+
+    key must be unique among the selected rows: 'id', or 'timestamp' within
+    one location (ingest keys make those unique). Other fetch() arguments,
+    e.g. columns (which must include key) or location, pass through.
+    """
+    while True:
+        rows = store.fetch(table, order_by=key, desc=False, limit=page_size, since=since, since_column=key, **filters)
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        since = rows[-1][key]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide store selected by THUNDERCAST_STORE"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if STORE_BACKEND == 'sqlite':
+                _store = SQLiteStore()
+            elif STORE_BACKEND == 'supabase':
+                _store = SupabaseStore()
+            else:
+                raise ValueError(f"Unknown THUNDERCAST_STORE backend: {STORE_BACKEND}")
+        return _store
@@ -0,0 +1,161 @@
+"""Synthetic hourly weather in the raw pune.csv schema
+
+    python src/synthetic_data.py out_dir [--years 10] [--locations 4] [--start 2009-01-01] [--seed 0]
+
+Writes one <city>.csv per location with the columns of data/raw/pune.csv.
+Values follow Pune's monthly climatology (dry winter, hot April/May, humid
+and cloudy monsoon with low pressure), a diurnal cycle, multi-day weather
+anomalies and a semidiurnal pressure tide. Rain is drawn from cloud cover and
+humidity, so the derived thunderstorm label is rare overall and concentrated
+in the monsoon, like the real data. Every location gets its own climate
+offsets and random stream; the same seed always gives the same files.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+RAW_COLUMNS = ['date_time', 'maxtempC', 'tempC', 'humidity', 'pressure',
+               'windspeedKmph', 'cloudcover', 'precipMM']
+WEATHER_COLUMNS = RAW_COLUMNS[2:]
+
+CITIES = ['pune', 'mumbai', 'nagpur', 'nashik', 'aurangabad', 'solapur', 'kolhapur', 'satara']
+
+# Monthly means, January..December
+CLIMATE = {
+    'tempC': [21, 23, 27, 30, 30, 27, 25, 24, 25, 25, 23, 21],
+    'humidity': [45, 38, 32, 35, 45, 70, 82, 84, 78, 62, 52, 48],
+    'pressure': [1015, 1013, 1011, 1009, 1006, 1004, 1003, 1004, 1007, 1010, 1013, 1015],
+    'windspeedKmph': [8, 9, 10, 11, 14, 20, 22, 19, 12, 8, 7, 7],
+    'cloudcover': [10, 8, 12, 18, 30, 70, 85, 85, 65, 40, 20, 12],
+    'rain_scale': [1.0, 1.0, 1.2, 1.5, 2.5, 3.0, 3.5, 3.0, 3.0, 2.5, 1.5, 1.0],  # mm, gamma scale
+}
+# Half of the daily temperature range: wide in the dry season, narrow under monsoon cloud
+DIURNAL_TEMP = [7, 8, 8, 7, 6, 3.5, 2.5, 2.5, 3, 5, 6, 7]
+
+ANOMALY_PERSISTENCE = 0.8   # day-to-day autocorrelation of weather anomalies
+
+
+def seasonal(values, month_position):
+    """Smooth periodic interpolation of monthly means (month_position 0 = mid-January)"""
+    values = np.asarray(values, dtype='float64')
+    return np.interp(month_position, np.arange(-1, 13), np.r_[values[-1], values, values[0]])
+
+
+def daily_anomalies(n_days, n_series, rng):
+    """Standardized AR(1) day-to-day anomalies, shape (n_days, n_series)"""
+    shocks = rng.standard_normal((n_days, n_series)) * np.sqrt(1 - ANOMALY_PERSISTENCE ** 2)
+    out = np.empty_like(shocks)
+    state = rng.standard_normal(n_series)
+    for day in range(n_days):
+        state = ANOMALY_PERSISTENCE * state + shocks[day]
+        out[day] = state
+    return out
+
+
+def location_offsets(index, rng):
+    """Per-location climate shifts; the first location is Pune itself"""
+    if index == 0:
+        return {'tempC': 0.0, 'humidity': 0.0, 'pressure': 0.0, 'windspeedKmph': 0.0, 'cloudcover': 0.0}
+    return {
+        'tempC': rng.uniform(-3, 4),
+        'humidity': rng.uniform(-10, 12),
+        'pressure': rng.uniform(-4, 6),   # altitude
+        'windspeedKmph': rng.uniform(-3, 5),
+        'cloudcover': rng.uniform(-10, 10),
+    }
+
+
+def generate_location(start, hours, seed=0, index=0, missing_rate=0.0):
+    """Hourly frame in the raw schema for one location"""
+    rng = np.random.default_rng([seed, index])
+    offsets = location_offsets(index, rng)
+    times = pd.date_range(start, periods=hours, freq='h')
+
+    day_index = ((times - times[0].normalize()) // pd.Timedelta(days=1)).to_numpy()
+    hour = times.hour.to_numpy()
+    month = times.month.to_numpy() - 1
+    month_position = month + (times.day.to_numpy() - 1 + hour / 24) / times.days_in_month.to_numpy() - 0.5
+
+    # Multi-day weather systems: one anomaly per day, interpolated to hours
+    daily = daily_anomalies(int(day_index[-1]) + 2, 5, rng)
+    day_position = day_index + hour / 24
+    anomaly = {name: np.interp(day_position, np.arange(len(daily)), daily[:, i])
+               for i, name in enumerate(['tempC', 'humidity', 'pressure', 'windspeedKmph', 'cloudcover'])}
+    noise = lambda scale: rng.normal(0, scale, hours)
+
+    diurnal = np.sin(2 * np.pi * (hour - 9) / 24)  # peaks mid-afternoon
+    temp_swing = seasonal(DIURNAL_TEMP, month_position) * diurnal
+    monsoon = (seasonal(CLIMATE['cloudcover'], month_position) - 8) / 77  # 0 dry .. 1 wet
+
+    cloud = np.clip(seasonal(CLIMATE['cloudcover'], month_position) + offsets['cloudcover']
+                    + 20 * anomaly['cloudcover'] + noise(8), 0, 100)
+    temp = (seasonal(CLIMATE['tempC'], month_position) + offsets['tempC'] + temp_swing
+            + 1.8 * anomaly['tempC'] - 0.02 * (cloud - 40) + noise(0.6))
+    humidity = np.clip(seasonal(CLIMATE['humidity'], month_position) + offsets['humidity']
+                       - 2.2 * temp_swing + 8 * anomaly['humidity'] + 0.1 * (cloud - 40) + noise(3), 5, 100)
+    pressure = (seasonal(CLIMATE['pressure'], month_position) + offsets['pressure']
+                + 1.2 * np.sin(4 * np.pi * (hour - 10) / 24)  # semidiurnal tide
+                + 1.5 * anomaly['pressure'] - 2.5 * monsoon * np.maximum(anomaly['cloudcover'], 0) + noise(0.4))
+    wind = np.clip(seasonal(CLIMATE['windspeedKmph'], month_position) + offsets['windspeedKmph']
+                   + 3 * diurnal + 4 * anomaly['windspeedKmph'] + noise(2), 0, None)
+
+    # Rain when it's cloudy and humid; afternoon convection makes it heavier
+    rain_chance = 1 / (1 + np.exp(-((cloud - 88) / 5 + (humidity - 90) / 5)))
+    convective = 1 + (hour >= 14) * (hour <= 19) * np.clip((temp - 24) / 6, 0, 1)
+    precip = np.where(rng.random(hours) < rain_chance,
+                      rng.gamma(0.8, seasonal(CLIMATE['rain_scale'], month_position) * convective), 0.0)
+
+    df = pd.DataFrame({
+        'date_time': times,
+        'tempC': np.round(temp),
+        'humidity': np.round(humidity),
+        'pressure': np.round(pressure),
+        'windspeedKmph': np.round(wind),
+        'cloudcover': np.round(cloud),
+        'precipMM': np.round(precip, 1),
+    })
+    day_max = df['tempC'].groupby(day_index).transform('max')
+    df.insert(1, 'maxtempC', day_max)
+
+    if missing_rate:
+        mask = rng.random((hours, len(WEATHER_COLUMNS))) < missing_rate
+        df[WEATHER_COLUMNS] = df[WEATHER_COLUMNS].mask(mask)
+    return df
+
+
+def city_names(n_locations):
+    return [CITIES[i] if i < len(CITIES) else f"synthetic{i:03d}" for i in range(n_locations)]
+
+
+def hours_in(start, years):
+    start = pd.Timestamp(start)
+    return int((start + pd.DateOffset(years=years) - start) / pd.Timedelta(hours=1))
+
+
+def generate(out_dir, years=10, locations=1, start='2009-01-01', seed=0, missing_rate=0.0):
+    """Write <out_dir>/<city>.csv for each location, returns {city: path}"""
+    os.makedirs(out_dir, exist_ok=True)
+    hours = hours_in(start, years)
+    paths = {}
+    for index, city in enumerate(city_names(locations)):
+        path = os.path.join(out_dir, f"{city}.csv")
+        generate_location(start, hours, seed, index, missing_rate).to_csv(path, index=False)
+        paths[city] = path
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic hourly weather CSVs")
+    parser.add_argument('out_dir')
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--locations', type=int, default=1)
+    parser.add_argument('--start', default='2009-01-01')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--missing-rate', type=float, default=0.0, help="fraction of weather values left empty")
+    args = parser.parse_args()
+
+    paths = generate(args.out_dir, args.years, args.locations, args.start, args.seed, args.missing_rate)
+    rows = hours_in(args.start, args.years)
+    print(f"✅ {len(paths)} location(s) x {rows:,} hourly rows written to {args.out_dir}")
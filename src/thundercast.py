@@ -0,0 +1,160 @@
+"""ThunderCast command line
+
+    python src/thundercast.py collect [locations.json]
+    python src/thundercast.py clean [--stream [raw.csv] [city]]
+    python src/thundercast.py features [--append new_clean_rows.csv]
+    python src/thundercast.py train [--backend logistic] [--locations pune mumbai] [--workers N]
+    python src/thundercast.py backtest [featured.csv] [--backend logistic] [--workers N]
+    python src/thundercast.py tune [featured.csv] [--backend prophet] [--candidates 27] [--workers N]
+    python src/thundercast.py predict [locations.json] [--hours 48] [--no-feed]
+    python src/thundercast.py report [location ...]
+    python src/thundercast.py schedule [locations.json]
+
+Only the standard library is imported up front. Each command imports its
+own modules when it runs, so `--help` or `collect` never pay for Prophet,
+plotly or a database client they don't use (see benchmark_startup.py).
+"""
+import argparse
+import sys
+
+
+def collect(args):
+    from data_collection import fetch_weather_data, fetch_weather_data_batch, load_locations
+
+    if args.locations:
+        fetch_weather_data_batch(load_locations(args.locations))
+    else:
+        fetch_weather_data()
+
+
+def clean(args):
+    from data_cleaning import clean_csv, clean_streaming
+
+    if args.stream:
+        clean_streaming(*args.paths[:2])
+    else:
+        clean_csv()
+
+
+def features(args):
+    import pandas as pd
+    from feature_engineering import append_features, build_featured_dataset
+
+    if args.append:
+        append_features(pd.read_csv(args.append))
+    else:
+        build_featured_dataset()
+
+
+def train(args):
+    from model_training import DEFAULT_BACKEND, train_locations, train_single
+
+    backend = args.backend or DEFAULT_BACKEND
+    if args.locations:
+        train_locations(args.locations, args.workers, backend=backend)
+    else:
+        train_single(backend)
+
+
+def backtest(args):
+    from backtesting import main
+
+    return main(args.options)
+
+
+def tune(args):
+    from hyperparameter_search import main
+
+    return main(args.options)
+
+
+def predict(args):
+    if args.locations or args.hours or args.no_feed:
+        from batch_prediction import main
+
+        argv = [args.locations] if args.locations else []
+        argv += ['--hours', str(args.hours)] if args.hours else []
+        return main(argv + (['--no-feed'] if args.no_feed else []))
+    from prediction import main
+
+    main()
+
+
+def report(args):
+    import os
+    from visualizations import VISUALIZATIONS_DIR, build_reports, main
+
+    if args.locations:
+        build_reports(args.locations, os.path.join(VISUALIZATIONS_DIR, 'reports'))
+    else:
+        main()
+
+
+def schedule(args):
+    from data_collection import load_locations
+    from scheduler import main
+
+    main(load_locations(args.locations) if args.locations else None)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='thundercast', description="ThunderCast storm prediction pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('collect', help="fetch current weather into the store")
+    p.add_argument('locations', nargs='?', help="JSON list of {city, lat, lon} (default: Pimpri-Chinchwad)")
+    p.set_defaults(func=collect)
+
+    p = commands.add_parser('clean', help="clean the raw CSV")
+    p.add_argument('--stream', action='store_true', help="chunked clean into a partitioned Parquet dataset")
+    p.add_argument('paths', nargs='*', help="[raw.csv] [city] for --stream")
+    p.set_defaults(func=clean)
+
+    p = commands.add_parser('features', help="build the featured dataset")
+    p.add_argument('--append', metavar='CSV', help="append features for new clean rows only")
+    p.set_defaults(func=features)
+
+    p = commands.add_parser('train', help="train and publish the model")
+    p.add_argument('--locations', nargs='+', help="train one model per city from {city}_featured.csv")
+    p.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    p.add_argument('--backend', choices=['prophet', 'logistic'],
+                   help="model backend (default: THUNDERCAST_MODEL or prophet)")
+    p.set_defaults(func=train)
+
+    # backtest and tune pass their arguments (and --help) through to the script's own parser
+    p = commands.add_parser('backtest', help="rolling-origin backtest with cached fold models", add_help=False)
+    p.set_defaults(func=backtest, forward=True)
+
+    p = commands.add_parser('tune', help="successive-halving hyperparameter search, saves best_config.json",
+                            add_help=False)
+    p.set_defaults(func=tune, forward=True)
+
+    p = commands.add_parser('predict', help="forecast the next 6 hours and save the predictions")
+    p.add_argument('locations', nargs='?',
+                   help="JSON list of {city, lat, lon}: batch forecast every location from the forecast feed")
+    p.add_argument('--hours', type=int, help="batch forecast horizon (default 48)")
+    p.add_argument('--no-feed', action='store_true', help="batch mode without the forecast feed")
+    p.set_defaults(func=predict)
+
+    p = commands.add_parser('report', help="write the HTML report and the BI export")
+    p.add_argument('locations', nargs='*', help="one bundle per location instead of the single report")
+    p.set_defaults(func=report)
+
+    p = commands.add_parser('schedule', help="run the hourly pipeline and retraining until stopped")
+    p.add_argument('locations', nargs='?', help="JSON list of {city, lat, lon}")
+    p.set_defaults(func=schedule)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extras = parser.parse_known_args(argv)
+    if getattr(args, 'forward', False):
+        args.options = extras
+    elif extras:
+        parser.error(f"unrecognized arguments: {' '.join(extras)}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import clean_streaming
+from eda_engine import compute_stats
+
+
+def raw_csv(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        'date_time': pd.date_range('2023-12-30', periods=n, freq='h').astype(str),
+        'tempC': rng.integers(15, 35, n),
+        'humidity': rng.integers(30, 100, n),
+        'pressure': rng.integers(995, 1020, n),
+        'windspeedKmph': rng.integers(0, 30, n),
+        'cloudcover': rng.integers(0, 100, n),
+        'precipMM': rng.gamma(0.3, 2.0, n).round(1),
+        'uvIndex': 5,
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_rerun_replaces_the_city_partition(tmp_path):
+    out_dir = str(tmp_path / 'clean')
+    clean_streaming(raw_csv(tmp_path / 'long.csv', 200), out_dir, 'pune', chunksize=20)
+    assert compute_stats(os.path.join(out_dir, 'city=pune'), workers=1).rows == 200
+
+    clean_streaming(raw_csv(tmp_path / 'short.csv', 90, seed=1), out_dir, 'pune', chunksize=50)
+
+    city_dir = os.path.join(out_dir, 'city=pune')
+    assert sorted(os.listdir(out_dir)) == ['city=pune']
+    assert len(glob.glob(os.path.join(city_dir, '*', '*.parquet'))) == 3
+    assert compute_stats(city_dir, workers=1).rows == 90
+    assert len(pd.read_parquet(city_dir)) == 90
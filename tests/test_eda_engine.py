@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from eda_engine import compute_stats, read_chunks, row_hashes, source_partitions
+
+
+def cleaned_csv(tmp_path, n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'date_time': pd.date_range('2020-01-01', periods=n, freq='h').astype(str),
+        'tempC': rng.integers(15, 40, n),
+        'humidity': rng.integers(20, 100, n).astype('float64'),
+        'pressure': rng.normal(1010, 5, n).round(1),
+        'thunderstorm': rng.integers(0, 2, n),
+    })
+    frame.loc[rng.choice(n, 20, replace=False), 'humidity'] = np.nan
+    frame = pd.concat([frame, frame.iloc[rng.choice(n, 15, replace=False)]], ignore_index=True)
+    path = tmp_path / 'clean.csv'
+    frame.to_csv(path, index=False)
+    return str(path), frame
+
+
+def test_csv_byte_ranges_cover_every_row_once(tmp_path):
+    path, frame = cleaned_csv(tmp_path)
+    partitions = source_partitions(path, partition_bytes=997)
+    assert len(partitions) > 1
+    rows = pd.concat([chunk for parts in partitions for source, start, end in parts
+                      for chunk in read_chunks(source, 64, start, end)], ignore_index=True)
+    expected = frame.assign(date_time=pd.to_datetime(frame['date_time']))
+    pd.testing.assert_frame_equal(rows, expected)
+
+
+def test_partitioned_stats_match_one_partition(tmp_path):
+    path, frame = cleaned_csv(tmp_path)
+    whole = compute_stats(path, workers=1)
+    split = compute_stats(path, workers=2, chunk_rows=50, partition_bytes=1500)
+
+    assert split.rows == whole.rows == len(frame)
+    assert split.duplicates == whole.duplicates == frame.duplicated().sum()
+    assert split.nulls == whole.nulls
+    pd.testing.assert_frame_equal(split.describe(), whole.describe())
+    pd.testing.assert_series_equal(split.storms_by('hour'), whole.storms_by('hour'))
+
+
+def test_duplicates_found_across_chunks_read_with_different_dtypes(tmp_path):
+    path = tmp_path / 'clean.csv'
+    path.write_text('date_time,tempC,humidity,thunderstorm\n'
+                    '2020-01-01 00:00,21,50.0,0\n'
+                    '2020-01-01 01:00,22,,1\n'
+                    '2020-01-01 02:00,,60.0,0\n'
+                    '2020-01-01 00:00,21,50.0,0\n')
+
+    chunks = list(read_chunks(str(path), 2))
+    assert chunks[0]['tempC'].dtype != chunks[1]['tempC'].dtype
+    assert row_hashes(chunks[0])[0] == row_hashes(chunks[1])[1]
+    assert compute_stats(str(path), workers=1, chunk_rows=2).duplicates == 1
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from export import export_table, open_dataset, write_csv_view
+from storage import SQLiteStore
+
+
+def readings(start, n, precipitation):
+    return [{'timestamp': f'2026-07-01T{h:02d}:00:00+00:00', 'temperature': 20.0 + h, 'humidity': 60.0,
+             'pressure': 1010.0, 'wind_speed': 2.0, 'cloud_cover': 40.0, 'precipitation': precipitation,
+             'location': 'Pune', 'ingest_key': f'Pune|{h}'}
+            for h in range(start, start + n)]
+
+
+def test_null_page_then_populated_page_reads_back(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    export_dir = str(tmp_path / 'exports')
+    store.insert('weather_data', readings(0, 4, None))
+    assert export_table('weather_data', export_dir, store, page_size=4) == 4
+    store.insert('weather_data', readings(4, 4, 1.5))
+    assert export_table('weather_data', export_dir, store, page_size=4) == 4
+
+    table = open_dataset('weather_data', export_dir).to_table().to_pandas().sort_values('id')
+    assert table['precipitation'].isna().tolist() == [True] * 4 + [False] * 4
+    assert str(table['precipitation'].dtype) == 'float64'
+
+    csv = pd.read_csv(write_csv_view('weather_data', export_dir))
+    assert len(csv) == 8 and csv['precipitation'].sum() == 6.0
+
+
+def test_arrow_and_parquet_parts_load_together(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    export_dir = str(tmp_path / 'exports')
+    store.insert('weather_data', readings(0, 3, None))
+    export_table('weather_data', export_dir, store, fmt='arrow')
+    store.insert('weather_data', readings(3, 3, 0.5))
+    export_table('weather_data', export_dir, store)
+
+    assert open_dataset('weather_data', export_dir).to_table().num_rows == 6
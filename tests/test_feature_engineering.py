@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from feature_engineering import PIPELINE, RAW_COLUMNS, append_features, build_featured_dataset, get_season
+
+
+def clean_frame(n, seed=0):
+    """Clean-schema hourly rows with integer columns, as read_csv infers them from the archive"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date_time': pd.date_range('2024-06-01', periods=n, freq='h').astype(str),
+        'tempC': rng.integers(18, 38, n),
+        'humidity': rng.integers(30, 100, n),
+        'pressure': rng.integers(995, 1020, n),
+        'windspeedKmph': rng.integers(0, 40, n),
+        'cloudcover': rng.integers(0, 100, n),
+        'precipMM': rng.gamma(0.3, 2.0, n).round(1),
+        'thunderstorm': (rng.random(n) < 0.1).astype(int),
+    })[RAW_COLUMNS]
+
+
+def test_append_matches_full_recompute(tmp_path):
+    clean = clean_frame(500)
+    clean.to_csv(tmp_path / 'full_clean.csv', index=False)
+    clean.iloc[:300].to_csv(tmp_path / 'head_clean.csv', index=False)
+
+    build_featured_dataset(str(tmp_path / 'full_clean.csv'), str(tmp_path / 'full.csv'))
+    build_featured_dataset(str(tmp_path / 'head_clean.csv'), str(tmp_path / 'incremental.csv'))
+    append_features(pd.read_csv(tmp_path / 'full_clean.csv').iloc[300:], str(tmp_path / 'incremental.csv'))
+
+    assert (tmp_path / 'incremental.csv').read_text() == (tmp_path / 'full.csv').read_text()
+
+
+def test_append_in_small_batches_matches_full_recompute(tmp_path):
+    clean = clean_frame(120, seed=1)
+    clean.to_csv(tmp_path / 'full_clean.csv', index=False)
+    clean.iloc[:40].to_csv(tmp_path / 'head_clean.csv', index=False)
+
+    build_featured_dataset(str(tmp_path / 'full_clean.csv'), str(tmp_path / 'full.csv'))
+    build_featured_dataset(str(tmp_path / 'head_clean.csv'), str(tmp_path / 'incremental.csv'))
+    for start in range(40, 120, 3):  # batches shorter than the feature lookback
+        append_features(clean.iloc[start:start + 3], str(tmp_path / 'incremental.csv'))
+
+    assert (tmp_path / 'incremental.csv').read_text() == (tmp_path / 'full.csv').read_text()
+
+
+def pandas_features(df):
+    """The feature definitions as the script wrote them in pandas before the registry"""
+    t = df['date_time']
+    out = pd.DataFrame({
+        'year': t.dt.year, 'month': t.dt.month, 'day': t.dt.day, 'hour': t.dt.hour,
+        'day_of_week': t.dt.dayofweek, 'day_of_year': t.dt.dayofyear,
+    })
+    out['season'] = out['month'].apply(get_season)
+    out['temp_humidity'] = df['tempC'] * df['humidity']
+    out['pressure_wind'] = df['pressure'] * df['windspeedKmph']
+    out['humidity_pressure_ratio'] = df['humidity'] / df['pressure']
+    out['temp_lag_1h'] = df['tempC'].shift(1)
+    out['humidity_lag_1h'] = df['humidity'].shift(1)
+    out['pressure_lag_1h'] = df['pressure'].shift(1)
+    out['temp_change'] = df['tempC'] - out['temp_lag_1h']
+    out['pressure_change'] = df['pressure'] - out['pressure_lag_1h']
+    out['temp_rolling_3h'] = df['tempC'].rolling(window=3, min_periods=1).mean()
+    out['humidity_rolling_3h'] = df['humidity'].rolling(window=3, min_periods=1).mean()
+    out['pressure_rolling_6h'] = df['pressure'].rolling(window=6, min_periods=1).mean()
+    out['temp_rolling_std_3h'] = df['tempC'].rolling(window=3, min_periods=1).std()
+    out['hour_sin'] = np.sin(2 * np.pi * out['hour'] / 24)
+    out['hour_cos'] = np.cos(2 * np.pi * out['hour'] / 24)
+    out['month_sin'] = np.sin(2 * np.pi * out['month'] / 12)
+    out['month_cos'] = np.cos(2 * np.pi * out['month'] / 12)
+    return out
+
+
+def test_registry_matches_pandas_definitions():
+    clean = clean_frame(2000, seed=2).astype({'humidity': 'float64', 'pressure': 'float64'})
+    clean['date_time'] = pd.to_datetime(clean['date_time']) + pd.to_timedelta(np.arange(2000) * 7, unit='h')
+    clean.loc[[5, 6, 7, 300, 1200], 'humidity'] = np.nan
+    clean.loc[[0, 1, 400, 401, 402, 403, 404, 405], 'pressure'] = np.nan
+
+    featured = PIPELINE.transform(clean)
+    expected = pandas_features(clean)
+
+    assert PIPELINE.feature_names == list(expected.columns)
+    for name in PIPELINE.feature_names:
+        pd.testing.assert_series_equal(featured[name], expected[name], check_dtype=False, check_names=False,
+                                       rtol=1e-12, obj=name)
+
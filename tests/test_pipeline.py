@@ -0,0 +1,31 @@
+from pipeline import PipelineContext
+from spool import ingest_key
+from storage import SQLiteStore
+
+
+def reading(hour, location='Pune'):
+    return {'timestamp': f'2026-07-01T{hour:02d}:00:00', 'temperature': 25.0 + hour, 'humidity': 70,
+            'pressure': 1005, 'wind_speed': 3.0, 'cloud_cover': 60, 'location': location}
+
+
+def test_remember_skips_readings_already_fetched_from_the_store(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    ctx = PipelineContext([{'city': 'Pune', 'lat': 18.5, 'lon': 73.8}], store=store)
+    old, new = reading(1), reading(2)
+    for record in (old, new):
+        record['ingest_key'] = ingest_key(record)
+
+    # The new reading reached the store (inline flush) before the first history fetch
+    store.insert('weather_data', [old, new])
+    ctx.remember([new])
+    ctx.remember([new])
+
+    assert [row['timestamp'] for row in ctx.recent('Pune')] == [new['timestamp'], old['timestamp']]
+
+
+def test_remember_adds_new_readings_newest_first(tmp_path):
+    ctx = PipelineContext([{'city': 'Pune', 'lat': 18.5, 'lon': 73.8}], store=SQLiteStore(str(tmp_path / 'store.db')))
+    ctx.remember([reading(1)])
+    ctx.remember([reading(2)])
+
+    assert [row['timestamp'] for row in ctx.recent('Pune')] == [reading(2)['timestamp'], reading(1)['timestamp']]
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from retraining import WINDOW_COLUMNS, load_live_rows
+from spool import ingest_key
+from storage import SQLiteStore
+
+
+class CappedStore(SQLiteStore):
+    """Returns at most 1,000 rows per query, like the hosted API"""
+
+    def fetch(self, *args, limit=None, **kwargs):
+        return super().fetch(*args, limit=min(limit or 1000, 1000), **kwargs)
+
+
+def reading(hour, minute=0, precipitation=0.0, humidity=60.0, pressure=1012.0):
+    day = pd.Timestamp('2026-07-01') + pd.Timedelta(hours=hour, minutes=minute)
+    record = {'timestamp': day.strftime('%Y-%m-%dT%H:%M:00+00:00'),
+              'temperature': 25.0, 'humidity': humidity, 'pressure': pressure, 'wind_speed': 3.0,
+              'cloud_cover': 40.0, 'precipitation': precipitation, 'location': 'Pune'}
+    record['ingest_key'] = ingest_key(record)
+    return record
+
+
+def test_live_rows_are_hourly_and_labelled(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    records = [reading(h) for h in range(60)]
+    records[50] = reading(50, precipitation=9.0, humidity=90.0, pressure=1002.0)
+    records.append(reading(50, minute=40, precipitation=9.5, humidity=92.0, pressure=1001.0))
+    store.upsert('weather_data', records, 'ingest_key')
+    store.insert('weather_data', [dict(reading(59, minute=30), precipitation=None, ingest_key='unlabelled')])
+
+    live = load_live_rows(store, 'Pune')
+
+    assert list(live.columns) == WINDOW_COLUMNS
+    assert live['date_time'].is_unique and (live['date_time'] == live['date_time'].dt.floor('h')).all()
+    assert live['date_time'].max() == pd.Timestamp('2026-07-03 11:00')
+    storms = live.loc[live['thunderstorm'] == 1]
+    assert storms['date_time'].tolist() == [pd.Timestamp('2026-07-03 02:00')]
+    assert storms['humidity'].iloc[0] == 92.0
+
+
+def test_live_rows_start_after_since(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    store.upsert('weather_data', [reading(h) for h in range(60)], 'ingest_key')
+
+    assert load_live_rows(store, 'Pune', since='2026-07-03T12:00:00+00:00').empty
+    assert load_live_rows(store, 'Mumbai').empty
+
+
+def test_live_rows_are_not_cut_at_the_api_row_cap(tmp_path):
+    path = str(tmp_path / 'store.db')
+    SQLiteStore(path).upsert('weather_data', [reading(h) for h in range(2500)], 'ingest_key')
+
+    live = load_live_rows(CappedStore(path), 'Pune')
+    assert live['date_time'].max() == pd.Timestamp('2026-07-01') + pd.Timedelta(hours=2499)
+    pd.testing.assert_frame_equal(live, load_live_rows(SQLiteStore(path), 'Pune'))
+
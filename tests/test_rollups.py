@@ -0,0 +1,79 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from rollups import load_rollups, rebuild_rollups, rollup_rows, summarize
+from storage import ROLLUP_METRICS, SQLiteStore
+
+
+def readings(n):
+    rng = np.random.default_rng(0)
+    records = [{'timestamp': f'2026-07-01T{h % 24:02d}:{h // 24 * 10:02d}:00', 'location': 'Pune',
+                **{m: float(rng.normal(50, 10)) for m in ROLLUP_METRICS}}
+               for h in range(n)]
+    for record in records[::3]:
+        record['humidity'] = None
+    return records
+
+
+def test_means_skip_missing_values(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    records = readings(72)
+    store.upsert_rollups(rollup_rows(records[:40]))
+    store.upsert_rollups(rollup_rows(records[40:]))
+
+    summary = summarize(load_rollups('hour', store=store))
+    frame = pd.DataFrame(records).astype({m: 'float64' for m in ROLLUP_METRICS})
+    assert summary['count'] == 72
+    for m in ROLLUP_METRICS:
+        assert summary[m]['count'] == frame[m].notna().sum()
+        assert np.isclose(summary[m]['mean'], frame[m].mean())
+        assert np.isclose(summary[m]['std'], frame[m].std())
+
+
+def test_existing_rollups_get_metric_counts_from_count(tmp_path):
+    path = str(tmp_path / 'store.db')
+    SQLiteStore(path).upsert_rollups(rollup_rows(readings(24)))
+    conn = sqlite3.connect(path)
+    for m in ROLLUP_METRICS:
+        conn.execute(f"ALTER TABLE weather_rollups DROP COLUMN {m}_count")
+    conn.commit()
+    conn.close()
+
+    rollups = load_rollups('day', store=SQLiteStore(path))
+    assert (rollups['humidity_count'] == rollups['count']).all()
+
+
+class CappedStore(SQLiteStore):
+    """Returns at most 1,000 rows per query, like the hosted API"""
+
+    def fetch(self, *args, limit=None, **kwargs):
+        return super().fetch(*args, limit=min(limit or 1000, 1000), **kwargs)
+
+
+def test_rebuild_reads_every_reading_past_the_row_cap(tmp_path):
+    store = CappedStore(str(tmp_path / 'store.db'))
+    records = [{'timestamp': f'2026-07-01T{h:02d}:00:00', 'location': f'C{c}',
+                **{m: 10.0 for m in ROLLUP_METRICS}} for c in range(300) for h in range(24)]
+    store.insert('weather_data', records)
+
+    assert rebuild_rollups(store, batch_rows=2000) == 7200
+    days = load_rollups('day', store=store)
+    assert len(days) == 300 and (days['count'] == 24).all()
+
+
+def test_live_readings_count_thunderstorms(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    records = readings(24)
+    for record in records:
+        record.update(humidity=60.0, pressure=1012.0, precipitation=0.0)
+    records[3].update(humidity=85.0, pressure=1004.0, precipitation=7.5)
+    records[4].update(humidity=85.0, pressure=1004.0, precipitation=None)
+    store.upsert_rollups(rollup_rows(records))
+
+    assert summarize(load_rollups('day', store=store))['thunderstorms'] == 1
+    store.insert('weather_data', records)
+    rebuild_rollups(store)
+    assert summarize(load_rollups('day', store=store))['thunderstorms'] == 1
+
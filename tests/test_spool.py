@@ -0,0 +1,71 @@
+import pytest
+
+from rollups import rollup_rows
+from spool import Spool, drain
+from storage import SQLiteStore
+
+
+def readings(n, location='Pune'):
+    return [{'timestamp': f'2026-07-01T{h % 24:02d}:{h // 24 * 10:02d}:00', 'temperature': 20.0 + h,
+             'humidity': 60.0 + h % 7, 'pressure': 1000.0 + h % 5, 'wind_speed': 2.0, 'cloud_cover': 50.0,
+             'location': location}
+            for h in range(n)]
+
+
+def rollups(store):
+    return {grain: store.fetch_rollups(grain) for grain in ('hour', 'day', 'month')}
+
+
+def expected_rollups(tmp_path, records):
+    store = SQLiteStore(str(tmp_path / 'expected.db'))
+    store.upsert_rollups(rollup_rows(records))
+    return rollups(store)
+
+
+class FailingRollups(SQLiteStore):
+    """Store whose next `failures` rollup merges fail after the readings were written"""
+
+    failures = 0
+
+    def _merge_rollups(self, conn, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("rollup merge failed")
+        super()._merge_rollups(conn, rows)
+
+
+def test_failed_rollup_update_is_applied_on_replay(tmp_path):
+    store = FailingRollups(str(tmp_path / 'store.db'))
+    spool = Spool(str(tmp_path / 'spool.db'))
+    records = readings(30)
+    spool.append('weather_data', [dict(r) for r in records])
+
+    store.failures = 1
+    with pytest.raises(RuntimeError):
+        drain(spool, store, batch_size=10)
+    assert spool.pending() == 30
+
+    drain(spool, store, batch_size=10)
+    assert spool.pending() == 0
+    assert len(store.fetch('weather_data')) == 30
+    assert rollups(store) == expected_rollups(tmp_path, records)
+
+
+def test_replayed_batch_is_not_rolled_up_twice(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    spool = Spool(str(tmp_path / 'spool.db'))
+    records = readings(30)
+    spool.append('weather_data', [dict(r) for r in records])
+    drain(spool, store)
+
+    # Crash between the store commit and the ack: the same batch comes back
+    spool.append('weather_data', [dict(r) for r in records[10:]])
+    drain(spool, store)
+
+    assert len(store.fetch('weather_data')) == 30
+    assert rollups(store) == expected_rollups(tmp_path, records)
+
+
+def test_spool_rejects_in_memory_database():
+    with pytest.raises(ValueError, match=':memory:'):
+        Spool(':memory:')
@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from storage import SQLiteStore, SupabaseStore, fetch_pages
+
+
+def test_sqlite_rows_are_visible_from_other_threads(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    store.insert('weather_data', {'timestamp': '2026-07-01T00:00:00', 'temperature': 21.0, 'location': 'Pune'})
+    seen = []
+    thread = threading.Thread(target=lambda: seen.extend(store.fetch('weather_data', location='Pune')))
+    thread.start()
+    thread.join()
+    assert [row['temperature'] for row in seen] == [21.0]
+
+
+def test_sqlite_rejects_in_memory_database():
+    with pytest.raises(ValueError, match=':memory:'):
+        SQLiteStore(':memory:')
+
+
+def test_supabase_needs_credentials_from_the_environment():
+    with pytest.raises(RuntimeError, match='SUPABASE_URL and SUPABASE_KEY'):
+        SupabaseStore(url=None, key=None)
+
+
+def test_fetch_pages_returns_every_row_once(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    store.insert('weather_data', [{'timestamp': f'2026-07-01T00:{m:02d}:00', 'temperature': float(m),
+                                   'location': 'Pune' if m % 2 else 'Mumbai'} for m in range(25)])
+
+    pages = list(fetch_pages(store, 'weather_data', 'id', page_size=10))
+    assert [len(rows) for rows in pages] == [10, 10, 5]
+    assert [row['temperature'] for rows in pages for row in rows] == [float(m) for m in range(25)]
+
+    pune = [row for rows in fetch_pages(store, 'weather_data', 'timestamp', page_size=4, location='Pune')
+            for row in rows]
+    assert [row['temperature'] for row in pune] == [float(m) for m in range(1, 25, 2)]